@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Cohort Analytics
+Exports results, courses and feedbacks to per-session Parquet snapshots and
+answers department-level questions from them with vectorized pandas/NumPy,
+so heavy analytics never run against the live database
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from archive import ALL_RESULTS
+from database import get_db_connection
+from grading import PASS_MARK
+from job_queue import job_handler
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots'))
+
+# Rows fetched from MySQL per Parquet row group
+EXPORT_CHUNK_SIZE = 50000
+
+SCORE_BINS = list(range(0, 101, 10))
+
+def _arrow():
+    """Import pyarrow lazily; it is only needed for snapshots"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise RuntimeError('Analytics snapshots require the pyarrow package (pip install pyarrow)')
+
+def _schemas(pa):
+    return {
+        'results': pa.schema([
+            ('id', pa.int64()), ('student_id', pa.string()), ('course_id', pa.int32()),
+            ('score', pa.float64()), ('grade', pa.string()), ('session', pa.string()), ('semester', pa.string())
+        ]),
+        'feedbacks': pa.schema([
+            ('id', pa.string()), ('course_id', pa.int32()), ('lecturer_id', pa.string()), ('rating', pa.int8()),
+            ('semester', pa.string()), ('sentiment_label', pa.string()), ('sentiment_score', pa.float64())
+        ]),
+        'courses': pa.schema([
+            ('id', pa.int32()), ('code', pa.string()), ('title', pa.string()), ('unit', pa.int8()),
+            ('department_id', pa.int32()), ('department_name', pa.string())
+        ])
+    }
+
+EXPORT_QUERIES = {
+    'results': f"""
+        SELECT id, student_id, course_id, CAST(score AS DOUBLE), grade, session, semester
+        FROM {ALL_RESULTS} r
+        WHERE session = %s
+        ORDER BY course_id
+    """,
+    'feedbacks': """
+        SELECT id, course_id, lecturer_id, rating, semester, sentiment_label, CAST(sentiment_score AS DOUBLE)
+        FROM (
+            SELECT id, course_id, lecturer_id, rating, semester, sentiment_label, sentiment_score FROM feedbacks
+            UNION ALL
+            SELECT id, course_id, lecturer_id, rating, semester, sentiment_label, sentiment_score FROM feedbacks_archive
+        ) f
+        WHERE semester LIKE CONCAT(%s, '-%%')
+        ORDER BY course_id
+    """,
+    'courses': """
+        SELECT c.id, c.code, c.title, c.unit, c.department_id, d.name
+        FROM courses c
+        LEFT JOIN departments d ON c.department_id = d.id
+        ORDER BY c.id
+    """
+}
+
+# Tables that are the same for every session
+SESSION_INDEPENDENT = {'courses'}
+
+def snapshot_path(session_year: str) -> str:
+    """Directory holding one session's snapshot"""
+    return os.path.join(SNAPSHOT_DIR, session_year.replace('/', '-'))
+
+def _export_table(conn, pa, schema, query: str, params: tuple, path: str) -> int:
+    """Stream a query into a Parquet file one row group at a time"""
+    cursor = conn.cursor(buffered=False)
+    cursor.execute(query, params)
+    rows_written = 0
+    with pa.parquet.ParquetWriter(path, schema, compression='zstd') as writer:
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
+            rows_written += len(rows)
+        if rows_written == 0:
+            writer.write_table(schema.empty_table())
+    cursor.close()
+    return rows_written
+
+def export_snapshot(session_year: str) -> Dict[str, int]:
+    """
+    Write results, feedbacks and courses for a session to Parquet
+
+    The snapshot is built in a temporary directory and swapped in at the end,
+    so readers never see a half-written session.
+    """
+    pa = _arrow()
+    schemas = _schemas(pa)
+
+    # Snapshot exports are long full scans, so prefer a replica
+    conn = get_db_connection(read_only=True)
+    if not conn:
+        raise RuntimeError('Database connection failed')
+
+    target = snapshot_path(session_year)
+    staging = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(staging, exist_ok=True)
+
+    try:
+        counts = {}
+        for table, query in EXPORT_QUERIES.items():
+            params = () if table in SESSION_INDEPENDENT else (session_year,)
+            counts[table] = _export_table(conn, pa, schemas[table], query, params,
+                                          os.path.join(staging, f"{table}.parquet"))
+
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump({'session': session_year, 'exported_at': datetime.now().isoformat(), 'rows': counts}, f)
+
+        previous = f"{target}.old"
+        if os.path.exists(target):
+            os.replace(target, previous)
+        os.replace(staging, target)
+        shutil.rmtree(previous, ignore_errors=True)
+        _table_cache.clear()
+        return counts
+    finally:
+        conn.close()
+        shutil.rmtree(staging, ignore_errors=True)
+
+def list_snapshots() -> List[Dict[str, any]]:
+    """Describe every exported session"""
+    snapshots = []
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return snapshots
+    for name in sorted(os.listdir(SNAPSHOT_DIR), reverse=True):
+        manifest = os.path.join(SNAPSHOT_DIR, name, 'manifest.json')
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                snapshots.append(json.load(f))
+    return snapshots
+
+_table_cache = {}
+_table_lock = threading.Lock()
+
+def load_table(session_year: str, table: str, columns: Optional[List[str]] = None):
+    """
+    Load a snapshot table as a DataFrame via a memory-mapped Parquet read
+
+    Tables are cached per process until the snapshot file changes.
+    """
+    pa = _arrow()
+    path = os.path.join(snapshot_path(session_year), f"{table}.parquet")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No analytics snapshot for session {session_year}")
+
+    key = (path, os.path.getmtime(path), tuple(columns or ()))
+    with _table_lock:
+        frame = _table_cache.get(key)
+    if frame is None:
+        frame = pa.parquet.read_table(path, columns=columns, memory_map=True).to_pandas()
+        with _table_lock:
+            # Drop frames loaded from an older version of the same file
+            for stale in [k for k in _table_cache if k[0] == path and k[1] != key[1]]:
+                del _table_cache[stale]
+            _table_cache[key] = frame
+    return frame
+
+def score_distribution(session_year: str, course_id: Optional[int] = None) -> Dict[str, any]:
+    """Histogram and quantiles of scores for a session, optionally for one course"""
+    import numpy as np
+
+    results = load_table(session_year, 'results', ['course_id', 'score'])
+    scores = results['score'].to_numpy()
+    if course_id is not None:
+        scores = scores[results['course_id'].to_numpy() == course_id]
+
+    counts, edges = np.histogram(scores, bins=SCORE_BINS)
+    quantiles = np.quantile(scores, [0.1, 0.25, 0.5, 0.75, 0.9]) if scores.size else np.zeros(5)
+    return {
+        'session': session_year,
+        'course_id': course_id,
+        'count': int(scores.size),
+        'mean': round(float(scores.mean()), 2) if scores.size else 0,
+        'stddev': round(float(scores.std()), 2) if scores.size else 0,
+        'pass_rate': round(float((scores >= PASS_MARK).mean() * 100), 1) if scores.size else 0,
+        'histogram': [{'from': int(edges[i]), 'to': int(edges[i + 1]), 'count': int(counts[i])}
+                      for i in range(len(counts))],
+        'quantiles': dict(zip(['p10', 'p25', 'p50', 'p75', 'p90'], [round(float(q), 2) for q in quantiles]))
+    }
+
+def pass_rates(session_year: str) -> Dict[str, List[Dict[str, any]]]:
+    """Pass rates per course and per department for a session"""
+    results = load_table(session_year, 'results', ['course_id', 'score'])
+    courses = load_table(session_year, 'courses', ['id', 'code', 'department_id', 'department_name'])
+
+    frame = results.assign(passed=results['score'] >= PASS_MARK).merge(
+        courses, left_on='course_id', right_on='id', how='left')
+
+    by_course = frame.groupby(['course_id', 'code'], sort=True)['passed'].agg(['size', 'mean']).reset_index()
+    by_department = frame.groupby(['department_id', 'department_name'], sort=True)['passed'].agg(
+        ['size', 'mean']).reset_index()
+
+    return {
+        'courses': [{'course_id': int(row.course_id), 'course_code': row.code, 'students': int(row.size),
+                     'pass_rate': round(float(row.mean) * 100, 1)}
+                    for row in by_course.itertuples(index=False)],
+        'departments': [{'department_id': int(row.department_id), 'department': row.department_name,
+                         'results': int(row.size), 'pass_rate': round(float(row.mean) * 100, 1)}
+                        for row in by_department.itertuples(index=False)]
+    }
+
+def course_comparison(session_year: str) -> List[Dict[str, any]]:
+    """Side-by-side score and feedback statistics for every course in a session"""
+    import pandas as pd
+
+    results = load_table(session_year, 'results', ['course_id', 'score'])
+    feedbacks = load_table(session_year, 'feedbacks', ['course_id', 'rating'])
+    courses = load_table(session_year, 'courses', ['id', 'code', 'title', 'department_name'])
+
+    scores = results.groupby('course_id')['score'].agg(
+        students='size', mean_score='mean', median_score='median', stddev='std')
+    scores['pass_rate'] = (results['score'] >= PASS_MARK).groupby(results['course_id']).mean() * 100
+    ratings = feedbacks.groupby('course_id')['rating'].agg(feedbacks='size', average_rating='mean')
+
+    table = courses.set_index('id').join(scores, how='inner').join(ratings, how='left')
+    table = table.fillna({'feedbacks': 0, 'stddev': 0}).sort_values('mean_score', ascending=False)
+
+    return [{
+        'course_id': int(course_id),
+        'course_code': row.code,
+        'course_title': row.title,
+        'department': row.department_name,
+        'students': int(row.students),
+        'mean_score': round(float(row.mean_score), 2),
+        'median_score': round(float(row.median_score), 2),
+        'stddev': round(float(row.stddev), 2),
+        'pass_rate': round(float(row.pass_rate), 1),
+        'feedbacks': int(row.feedbacks),
+        'average_rating': None if pd.isna(row.average_rating) else round(float(row.average_rating), 2)
+    } for course_id, row in zip(table.index, table.itertuples(index=False))]
+
+@job_handler('analytics.snapshot')
+def snapshot_job(ctx):
+    """Export a session snapshot on a worker"""
+    return export_snapshot(ctx.payload['session'])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export Parquet analytics snapshots')
+    parser.add_argument('sessions', nargs='+', help='Sessions to export, e.g. 2023/2024')
+    args = parser.parse_args()
+
+    for session_year in args.sessions:
+        print(f"📦 Exporting snapshot for {session_year}...")
+        try:
+            counts = export_snapshot(session_year)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ {counts['results']} results, {counts['feedbacks']} feedbacks, {counts['courses']} courses")
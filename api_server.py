@@ -5,39 +5,86 @@ Handles all database operations and provides RESTful API endpoints
 """
 
 import os
+import io
 import json
+import time
+import uuid
 import bcrypt
-import mysql.connector
-from datetime import datetime
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, send_file
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from database import get_db_connection, READ_YOUR_WRITES_WINDOW
+from grading import calculate_grade
+from job_queue import enqueue, get_job, list_jobs, PRIORITY_HIGH, PRIORITY_LOW
+from sentiment_worker import SENTIMENT_AGGREGATES, sentiment_summary
+import analytics
+from archive import ALL_FEEDBACKS, feedbacks_query, fetch_student_results, is_archived, results_query
+from grade_stats import annotate_results, course_stats, invalidate
+from feature_store import record_result
+from reports import REPORT_TYPES, REPORT_FORMATS, get_fresh_artifact, list_reports
+from json_provider import FastJSONProvider
+from rowset import RowSet
+from feedback_buffer import DuplicateFeedback, get_buffer
+from sync import changed_since, current_cursor, cursor_expired, deleted_since, parse_since
+from events import EVENTS_PUBLIC_URL, get_event_server, publish, user_channel
+from feedback_rollups import GRANULARITIES, trend
+from roster_import import ROLES, ROSTER_DIR
+
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.secret_key = os.getenv('SECRET_KEY', 'intellgrade-secret-key-2024')
 CORS(app, supports_credentials=True)
 
-# Database configuration
-DB_CONFIG = {
-    'host': os.getenv('DB_HOST', 'localhost'),
-    'user': os.getenv('DB_USER', 'root'),
-    'password': os.getenv('DB_PASSWORD', ''),
-    'database': os.getenv('DB_NAME', 'intellgrade_db'),
-    'charset': 'utf8mb4',
-    'autocommit': True
-}
-
-def get_db_connection():
-    """Create and return database connection"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except mysql.connector.Error as err:
-        print(f"Database connection error: {err}")
-        return None
+# Filter for results_query()/feedbacks_query(): rows of the courses the lecturer teaches
+LECTURER_COURSES = "course_id IN (SELECT course_id FROM lecturer_courses WHERE lecturer_id = %s)"
+
+def get_read_connection():
+    """Connection for read-only endpoints; uses a replica unless the user wrote recently"""
+    last_write = session.get('last_write_at', 0)
+    return get_db_connection(read_only=time.time() - last_write > READ_YOUR_WRITES_WINDOW)
+
+def mark_write():
+    """Keep this user's reads on the primary until replicas have caught up"""
+    session['last_write_at'] = time.time()
+
+def listing(rows):
+    """Serialize a RowSet as row dictionaries, or as one list per column with ?format=columnar"""
+    return rows.to_columnar() if request.args.get('format') == 'columnar' else rows.to_dicts()
+
+def feedback_trends(lecturer_id=None):
+    """Trend series for ?granularity=&from=&to=&course_id= from the feedback rollups"""
+    granularity = request.args.get('granularity', 'week')
+    if granularity not in GRANULARITIES:
+        return jsonify({'error': f"Granularity must be one of {', '.join(GRANULARITIES)}"}), 400
+    
+    conn = get_read_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = conn.cursor()
+    series = trend(cursor, granularity,
+                   start=request.args.get('from') or None,
+                   end=request.args.get('to') or None,
+                   course_id=request.args.get('course_id', type=int),
+                   lecturer_id=lecturer_id)
+    cursor.close()
+    conn.close()
+    
+    return jsonify({
+        'success': True,
+        'granularity': granularity,
+        'series': [{
+            'bucket': point['bucket'],
+            'total_feedbacks': point['total'],
+            'average_rating': point['average_rating'],
+            'ratings': point['ratings'],
+            'sentiment': sentiment_summary(point)
+        } for point in series]
+    })
 
 def hash_password(password):
     """Hash password using bcrypt"""
@@ -47,66 +94,6 @@ def verify_password(password, hashed):
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
-def calculate_grade(score):
-    """Calculate grade based on score"""
-    if score >= 90: return 'A+'
-    elif score >= 85: return 'A'
-    elif score >= 80: return 'A-'
-    elif score >= 75: return 'B+'
-    elif score >= 70: return 'B'
-    elif score >= 65: return 'B-'
-    elif score >= 60: return 'C+'
-    elif score >= 55: return 'C'
-    elif score >= 50: return 'C-'
-    elif score >= 45: return 'D+'
-    elif score >= 40: return 'D'
-    else: return 'F'
-
-def analyze_sentiment(feedbacks):
-    """Analyze sentiment of feedbacks"""
-    if not feedbacks:
-        return {'positive': 0, 'neutral': 0, 'negative': 0, 'total': 0}
-    
-    positive_words = ['excellent', 'great', 'good', 'amazing', 'wonderful', 'fantastic', 'outstanding', 'perfect', 'love', 'enjoy', 'helpful', 'clear', 'understand', 'learn', 'improve']
-    negative_words = ['bad', 'poor', 'terrible', 'awful', 'horrible', 'confusing', 'difficult', 'hard', 'boring', 'waste', 'disappoint', 'frustrate', 'hate', 'dislike']
-    
-    positive = neutral = negative = 0
-    
-    for feedback in feedbacks:
-        rating = feedback['rating']
-        comment = feedback.get('comment', '').lower()
-        
-        # Rating-based sentiment
-        if rating >= 4:
-            positive += 1
-        elif rating <= 2:
-            negative += 1
-        else:
-            neutral += 1
-        
-        # Comment-based sentiment
-        positive_score = sum(1 for word in positive_words if word in comment)
-        negative_score = sum(1 for word in negative_words if word in comment)
-        
-        # Adjust sentiment based on comment analysis
-        if positive_score > negative_score and rating == 3:
-            neutral -= 1
-            positive += 1
-        elif negative_score > positive_score and rating == 3:
-            neutral -= 1
-            negative += 1
-    
-    total = len(feedbacks)
-    return {
-        'positive': positive,
-        'neutral': neutral,
-        'negative': negative,
-        'total': total,
-        'positivePercentage': round((positive / total) * 100, 1) if total > 0 else 0,
-        'neutralPercentage': round((neutral / total) * 100, 1) if total > 0 else 0,
-        'negativePercentage': round((negative / total) * 100, 1) if total > 0 else 0
-    }
-
 # Authentication endpoints
 @app.route('/api/auth/login', methods=['POST'])
 def login():
@@ -124,8 +111,10 @@ def login():
             return jsonify({'error': 'Database connection failed'}), 500
         
         cursor = conn.cursor(dictionary=True)
-        # Check if input is username (id) or email
-        cursor.execute("SELECT * FROM users WHERE id = %s OR email = %s", (username, username))
+        # Check if input is username (id) or email; ids never contain '@', so
+        # one equality lookup on the primary key or the email index suffices
+        column = 'email' if '@' in username else 'id'
+        cursor.execute(f"SELECT * FROM users WHERE {column} = %s", (username,))
         user = cursor.fetchone()
         cursor.close()
         conn.close()
@@ -178,21 +167,39 @@ def get_student_results():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT r.*, c.code as course_code, c.title as course_title, c.unit
-            FROM results r
-            JOIN courses c ON r.course_id = c.id
-            WHERE r.student_id = %s
-            ORDER BY r.session DESC, r.semester DESC, c.code
-        """, (session['user_id'],))
-        
-        results = cursor.fetchall()
+        sync_cursor = current_cursor(cursor)
+        if since is not None and cursor_expired(since, sync_cursor):
+            since = None
+        
+        if since is not None:
+            # Delta: results added or changed since the cursor or whose class statistics changed, plus deletions
+            results = fetch_student_results(cursor, session['user_id'], changed_since(since))
+            deleted = deleted_since(cursor, 'result', since, session['user_id'], include_archived=False)
+            cursor.close()
+            annotate_results(conn, results)
+            conn.close()
+            
+            return jsonify({
+                'success': True,
+                'full': False,
+                'cursor': sync_cursor,
+                'changes': results,
+                'deleted': deleted
+            })
+        
+        results = fetch_student_results(cursor, session['user_id'])
         cursor.close()
+        annotate_results(conn, results)
         conn.close()
         
         # Group by session and semester
@@ -209,6 +216,8 @@ def get_student_results():
         
         return jsonify({
             'success': True,
+            'full': True,
+            'cursor': sync_cursor,
             'results': list(organized_results.values())
         })
         
@@ -222,7 +231,7 @@ def get_student_transcript():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
@@ -232,16 +241,8 @@ def get_student_transcript():
         cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
         student = cursor.fetchone()
         
-        # Get all results
-        cursor.execute("""
-            SELECT r.*, c.code as course_code, c.title as course_title, c.unit
-            FROM results r
-            JOIN courses c ON r.course_id = c.id
-            WHERE r.student_id = %s
-            ORDER BY r.session DESC, r.semester DESC, c.code
-        """, (session['user_id'],))
-        
-        results = cursor.fetchall()
+        # Get all results, including archived sessions
+        results = fetch_student_results(cursor, session['user_id'])
         cursor.close()
         conn.close()
         
@@ -311,34 +312,36 @@ def submit_feedback():
         if not (1 <= rating <= 5):
             return jsonify({'error': 'Rating must be between 1 and 5'}), 400
         
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
         cursor = conn.cursor()
+        session_year = semester.split('-')[0]
+        if is_archived(cursor, session_year):
+            cursor.close()
+            conn.close()
+            return jsonify({'error': f'Session {session_year} has been archived and is closed for changes'}), 400
         
-        # Check if feedback already exists
+        # The flusher's INSERT IGNORE would silently drop a repeat of feedback already in MySQL
         cursor.execute("""
-            SELECT id FROM feedbacks 
+            SELECT 1 FROM feedbacks
             WHERE student_id = %s AND course_id = %s AND lecturer_id = %s AND semester = %s
         """, (session['user_id'], course_id, lecturer_id, semester))
-        
-        if cursor.fetchone():
-            cursor.close()
-            conn.close()
+        already_submitted = cursor.fetchone() is not None
+        cursor.close()
+        conn.close()
+        if already_submitted:
             return jsonify({'error': 'Feedback already submitted for this course and semester'}), 400
         
-        # Generate feedback ID
-        feedback_id = f"FB_{int(datetime.now().timestamp())}_{session['user_id']}"
-        
-        # Insert feedback
-        cursor.execute("""
-            INSERT INTO feedbacks (id, student_id, course_id, lecturer_id, rating, comment, semester)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (feedback_id, session['user_id'], course_id, lecturer_id, rating, comment, semester))
+        # Buffered locally and written to MySQL in batches by the flusher; the buffer
+        # itself rejects a repeat of feedback that has not been flushed yet
+        try:
+            get_buffer().submit(session['user_id'], course_id, lecturer_id, rating, comment, semester)
+        except DuplicateFeedback:
+            return jsonify({'error': 'Feedback already submitted for this course and semester'}), 400
         
-        cursor.close()
-        conn.close()
+        mark_write()
         
         return jsonify({
             'success': True,
@@ -355,7 +358,7 @@ def get_feedback_courses():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
@@ -389,74 +392,85 @@ def get_lecturer_feedback():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
         cursor = conn.cursor(dictionary=True)
+        # Live and archived sessions alike
+        lecturer_feedbacks = feedbacks_query("lecturer_id = %s")
         
-        # Get feedback for lecturer
-        cursor.execute("""
-            SELECT f.*, c.code as course_code, c.title as course_title, c.unit
-            FROM feedbacks f
-            JOIN courses c ON f.course_id = c.id
-            WHERE f.lecturer_id = %s
-            ORDER BY f.created_at DESC
-        """, (session['user_id'],))
-        
-        feedbacks = cursor.fetchall()
+        # Overall analytics
+        cursor.execute(f"""
+            SELECT {SENTIMENT_AGGREGATES}
+            FROM {lecturer_feedbacks} f
+        """, (session['user_id'],) * 2)
+        overall = cursor.fetchone()
         
-        # Get courses taught by lecturer
-        cursor.execute("""
-            SELECT c.id, c.code, c.title, c.unit
-            FROM courses c
-            JOIN lecturer_courses lc ON c.id = lc.course_id
+        # Course-wise analytics
+        cursor.execute(f"""
+            SELECT c.id, c.code, c.title, c.unit, {SENTIMENT_AGGREGATES}
+            FROM lecturer_courses lc
+            JOIN courses c ON lc.course_id = c.id
+            JOIN {lecturer_feedbacks} f ON f.course_id = c.id
             WHERE lc.lecturer_id = %s
+            GROUP BY c.id, c.code, c.title, c.unit
             ORDER BY c.code
-        """, (session['user_id'],))
+        """, (session['user_id'],) * 3)
+        course_rows = cursor.fetchall()
         
-        courses = cursor.fetchall()
+        cursor.execute("SELECT COUNT(*) as count FROM lecturer_courses WHERE lecturer_id = %s", (session['user_id'],))
+        total_courses = cursor.fetchone()['count']
+        
+        # Last 10 feedbacks
+        cursor.execute(f"""
+            SELECT f.*, c.code as course_code, c.title as course_title, c.unit
+            FROM {lecturer_feedbacks} f
+            JOIN courses c ON f.course_id = c.id
+            ORDER BY f.created_at DESC
+            LIMIT 10
+        """, (session['user_id'],) * 2)
+        recent_feedbacks = cursor.fetchall()
         cursor.close()
         conn.close()
         
-        # Calculate analytics
-        total_feedbacks = len(feedbacks)
-        average_rating = sum(f['rating'] for f in feedbacks) / total_feedbacks if total_feedbacks > 0 else 0
-        
-        # Course-wise analytics
-        course_analytics = []
-        for course in courses:
-            course_feedbacks = [f for f in feedbacks if f['course_id'] == course['id']]
-            if course_feedbacks:
-                course_avg = sum(f['rating'] for f in course_feedbacks) / len(course_feedbacks)
-                course_analytics.append({
-                    'course_id': course['id'],
-                    'course_code': course['code'],
-                    'course_title': course['title'],
-                    'unit': course['unit'],
-                    'total_feedbacks': len(course_feedbacks),
-                    'average_rating': round(course_avg, 1),
-                    'sentiment': analyze_sentiment(course_feedbacks)
-                })
-        
-        # Overall sentiment analysis
-        overall_sentiment = analyze_sentiment(feedbacks)
+        course_analytics = [{
+            'course_id': row['id'],
+            'course_code': row['code'],
+            'course_title': row['title'],
+            'unit': row['unit'],
+            'total_feedbacks': row['total'],
+            'average_rating': round(float(row['average_rating']), 1),
+            'sentiment': sentiment_summary(row)
+        } for row in course_rows]
         
         return jsonify({
             'success': True,
             'analytics': {
-                'total_feedbacks': total_feedbacks,
-                'average_rating': round(average_rating, 1),
-                'total_courses': len(courses),
-                'sentiment': overall_sentiment,
+                'total_feedbacks': overall['total'],
+                'average_rating': round(float(overall['average_rating'] or 0), 1),
+                'total_courses': total_courses,
+                'sentiment': sentiment_summary(overall),
                 'courses': course_analytics,
-                'recent_feedbacks': feedbacks[:10]  # Last 10 feedbacks
+                'recent_feedbacks': recent_feedbacks
             }
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/lecturer/feedback/trends', methods=['GET'])
+def get_lecturer_feedback_trends():
+    """Rating and sentiment trends for the current lecturer"""
+    if 'user_id' not in session or session['user_role'] != 'lecturer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        return feedback_trends(lecturer_id=session['user_id'])
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/lecturer/courses', methods=['GET'])
 def get_lecturer_courses():
     """Get courses for current lecturer"""
@@ -464,24 +478,32 @@ def get_lecturer_courses():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
+        # Live and archived sessions alike, each aggregated per course before joining
+        cursor.execute(f"""
             SELECT c.*, d.name as department_name,
-                   COUNT(DISTINCT r.student_id) as student_count,
-                   AVG(f.rating) as average_rating
+                   COALESCE(rs.student_count, 0) as student_count,
+                   fs.average_rating
             FROM courses c
             JOIN lecturer_courses lc ON c.id = lc.course_id
             JOIN departments d ON c.department_id = d.id
-            LEFT JOIN results r ON c.id = r.course_id
-            LEFT JOIN feedbacks f ON c.id = f.course_id
+            LEFT JOIN (
+                SELECT course_id, COUNT(DISTINCT student_id) as student_count
+                FROM {results_query(LECTURER_COURSES)} r
+                GROUP BY course_id
+            ) rs ON rs.course_id = c.id
+            LEFT JOIN (
+                SELECT course_id, AVG(rating) as average_rating
+                FROM {feedbacks_query(LECTURER_COURSES)} f
+                GROUP BY course_id
+            ) fs ON fs.course_id = c.id
             WHERE lc.lecturer_id = %s
-            GROUP BY c.id, c.title, c.code, c.unit, c.department_id, c.description, c.created_at, d.name
             ORDER BY c.code
-        """, (session['user_id'],))
+        """, (session['user_id'],) * 5)
         
         courses = cursor.fetchall()
         cursor.close()
@@ -502,31 +524,61 @@ def get_lecturer_students():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
+        cursor = conn.cursor()
+        students = RowSet.fetch(cursor, f"""
             SELECT DISTINCT u.id, u.name, u.email, d.name as department,
                    COUNT(DISTINCT r.course_id) as course_count
             FROM users u
-            JOIN results r ON u.id = r.student_id
-            JOIN courses c ON r.course_id = c.id
-            JOIN lecturer_courses lc ON c.id = lc.course_id
+            JOIN {results_query(LECTURER_COURSES)} r ON u.id = r.student_id
             LEFT JOIN departments d ON u.department_id = d.id
-            WHERE lc.lecturer_id = %s AND u.role = 'student'
+            WHERE u.role = 'student'
             GROUP BY u.id, u.name, u.email, d.name
             ORDER BY u.name
-        """, (session['user_id'],))
+        """, (session['user_id'],) * 2)
+        cursor.close()
+        conn.close()
         
-        students = cursor.fetchall()
+        return jsonify({
+            'success': True,
+            'students': listing(students)
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/lecturer/courses/<int:course_id>/stats', methods=['GET'])
+def get_lecturer_course_stats(course_id):
+    """Score distribution of each class of one of the lecturer's courses"""
+    if 'user_id' not in session or session['user_role'] != 'lecturer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        conn = get_read_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 1 FROM lecturer_courses WHERE lecturer_id = %s AND course_id = %s
+        """, (session['user_id'], course_id))
+        assigned = cursor.fetchone() is not None
         cursor.close()
+        
+        if not assigned:
+            conn.close()
+            return jsonify({'error': 'Course not found'}), 404
+        
+        stats = course_stats(conn, course_id, request.args.get('session'), request.args.get('semester'))
         conn.close()
         
         return jsonify({
             'success': True,
-            'students': students
+            'course_id': course_id,
+            'classes': stats
         })
         
     except Exception as e:
@@ -539,40 +591,94 @@ def get_lecturer_reports():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        # For now, return sample reports
-        # In a real implementation, this would query a reports table
-        sample_reports = [
-            {
-                'id': 1,
-                'title': 'Course Performance Report',
-                'description': 'Comprehensive analysis of student performance in all courses',
-                'type': 'performance',
-                'generatedAt': '2024-01-15T10:30:00Z'
-            },
-            {
-                'id': 2,
-                'title': 'Feedback Analysis Report',
-                'description': 'Detailed feedback analysis and sentiment overview',
-                'type': 'feedback',
-                'generatedAt': '2024-01-10T14:20:00Z'
-            },
-            {
-                'id': 3,
-                'title': 'Student Progress Report',
-                'description': 'Individual student progress tracking and recommendations',
-                'type': 'progress',
-                'generatedAt': '2024-01-05T09:15:00Z'
-            }
-        ]
+        conn = get_read_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        reports = list_reports(conn, session['user_id'])
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'reports': reports
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def prepare_report(report_type):
+    """Return a fresh report artifact, or queue its generation"""
+    session_year = request.args.get('session') or None
+    report_format = request.args.get('format', 'html')
+    
+    if report_type not in REPORT_TYPES:
+        return None, (jsonify({'error': 'Unknown report type'}), 404)
+    if report_format not in REPORT_FORMATS:
+        return None, (jsonify({'error': 'Unsupported report format'}), 400)
+    
+    conn = get_db_connection()
+    if not conn:
+        return None, (jsonify({'error': 'Database connection failed'}), 500)
+    
+    artifact = get_fresh_artifact(conn, session['user_id'], report_type, session_year, report_format)
+    if artifact:
+        conn.close()
+        return artifact, None
+    
+    job_id = enqueue('reports.generate', {
+        'lecturer_id': session['user_id'],
+        'report_type': report_type,
+        'session': session_year,
+        'format': report_format
+    }, priority=PRIORITY_HIGH, created_by=session['user_id'], conn=conn)
+    conn.close()
+    
+    return None, (jsonify({
+        'success': True,
+        'status': 'generating',
+        'job_id': job_id
+    }), 202)
+
+@app.route('/api/lecturer/reports/<report_type>', methods=['POST'])
+def generate_lecturer_report(report_type):
+    """Make sure a report artifact is up to date, generating it on a worker if needed"""
+    if 'user_id' not in session or session['user_role'] != 'lecturer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        artifact, response = prepare_report(report_type)
+        if response:
+            return response
         
         return jsonify({
             'success': True,
-            'reports': sample_reports
+            'status': 'ready',
+            'generatedAt': artifact['generated_at'].isoformat(),
+            'rows': artifact['row_count']
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/lecturer/reports/<report_type>/download', methods=['GET'])
+def download_lecturer_report(report_type):
+    """Serve a stored report artifact"""
+    if 'user_id' not in session or session['user_role'] != 'lecturer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        artifact, response = prepare_report(report_type)
+        if response:
+            return response
+        
+        report_format = artifact['format']
+        download_name = f"{report_type}_report_{artifact['session_key'].replace('/', '-')}.{report_format}"
+        return send_file(artifact['file_path'], mimetype=REPORT_FORMATS[report_format],
+                         as_attachment=report_format != 'html', download_name=download_name)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Admin endpoints
 @app.route('/api/admin/overview', methods=['GET'])
 def get_admin_overview():
@@ -581,7 +687,7 @@ def get_admin_overview():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
@@ -597,17 +703,17 @@ def get_admin_overview():
         cursor.execute("SELECT COUNT(*) as count FROM courses")
         course_count = cursor.fetchone()['count']
         
-        cursor.execute("SELECT COUNT(*) as count FROM results")
+        cursor.execute("SELECT (SELECT COUNT(*) FROM results) + (SELECT COUNT(*) FROM results_archive) as count")
         result_count = cursor.fetchone()['count']
         
-        cursor.execute("SELECT COUNT(*) as count FROM feedbacks")
+        cursor.execute("SELECT (SELECT COUNT(*) FROM feedbacks) + (SELECT COUNT(*) FROM feedbacks_archive) as count")
         feedback_count = cursor.fetchone()['count']
         
         # Get recent feedbacks
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT f.*, c.code as course_code, c.title as course_title, 
                    l.name as lecturer_name, s.name as student_name
-            FROM feedbacks f
+            FROM {ALL_FEEDBACKS} f
             JOIN courses c ON f.course_id = c.id
             JOIN users l ON f.lecturer_id = l.id
             JOIN users s ON f.student_id = s.id
@@ -641,39 +747,54 @@ def get_all_feedback():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get all feedback with details
-        cursor.execute("""
+        cursor = conn.cursor()
+        sync_cursor = current_cursor(cursor)
+        if since is not None and cursor_expired(since, sync_cursor):
+            since = None
+        
+        # Get all feedback with details (tuple rows; this listing can be very large),
+        # or with ?since= only what changed after the cursor. Archived feedback is
+        # listed too, so moving a session to the archive is not reported as a deletion;
+        # archived rows never change, so a delta only reads the live table.
+        feedbacks = RowSet.fetch(cursor, f"""
             SELECT f.*, c.code as course_code, c.title as course_title, 
                    l.name as lecturer_name, s.name as student_name
-            FROM feedbacks f
+            FROM {ALL_FEEDBACKS if since is None else 'feedbacks'} f
             JOIN courses c ON f.course_id = c.id
             JOIN users l ON f.lecturer_id = l.id
             JOIN users s ON f.student_id = s.id
+            {'WHERE f.updated_at >= FROM_UNIXTIME(%s)' if since is not None else ''}
             ORDER BY f.created_at DESC
-        """)
+        """, (changed_since(since),) if since is not None else ())
+        deleted = deleted_since(cursor, 'feedback', since, include_archived=False) if since is not None else []
+        cursor.close()
         
-        feedbacks = cursor.fetchall()
+        # Overall analytics
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT {SENTIMENT_AGGREGATES} FROM {ALL_FEEDBACKS} f")
+        overall = cursor.fetchone()
         cursor.close()
         conn.close()
         
-        # Calculate overall analytics
-        total_feedbacks = len(feedbacks)
-        average_rating = sum(f['rating'] for f in feedbacks) / total_feedbacks if total_feedbacks > 0 else 0
-        overall_sentiment = analyze_sentiment(feedbacks)
-        
         return jsonify({
             'success': True,
-            'feedbacks': feedbacks,
+            'full': since is None,
+            'cursor': sync_cursor,
+            'feedbacks': listing(feedbacks),
+            'deleted': deleted,
             'analytics': {
-                'total_feedbacks': total_feedbacks,
-                'average_rating': round(average_rating, 1),
-                'sentiment': overall_sentiment
+                'total_feedbacks': overall['total'],
+                'average_rating': round(float(overall['average_rating'] or 0), 1),
+                'sentiment': sentiment_summary(overall)
             }
         })
         
@@ -709,6 +830,11 @@ def add_result():
         
         cursor = conn.cursor()
         
+        if is_archived(cursor, session_year):
+            cursor.close()
+            conn.close()
+            return jsonify({'error': f'Session {session_year} has been archived and is closed for changes'}), 400
+        
         # Check if result already exists
         cursor.execute("""
             SELECT id FROM results 
@@ -720,15 +846,27 @@ def add_result():
             conn.close()
             return jsonify({'error': 'Result already exists for this student, course, and semester'}), 400
         
-        # Insert result
-        cursor.execute("""
-            INSERT INTO results (student_id, course_id, score, grade, session, semester)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (student_id, course_id, score, grade, session_year, semester))
+        # Insert result, with the class statistics and student features it changes
+        conn.start_transaction()
+        try:
+            cursor.execute("""
+                INSERT INTO results (student_id, course_id, score, grade, session, semester)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (student_id, course_id, score, grade, session_year, semester))
+            invalidate(cursor, course_id, session_year, semester)
+            record_result(cursor, student_id, course_id, score)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         
         cursor.close()
         conn.close()
         
+        mark_write()
+        publish([user_channel(student_id)], 'results',
+                 {'course_id': course_id, 'session': session_year, 'semester': semester})
+        
         return jsonify({
             'success': True,
             'message': 'Result added successfully'
@@ -761,19 +899,37 @@ def update_result():
             return jsonify({'error': 'Database connection failed'}), 500
         
         cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE results SET score = %s, grade = %s, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        """, (score, grade, result_id))
-        
-        if cursor.rowcount == 0:
-            cursor.close()
-            conn.close()
-            return jsonify({'error': 'Result not found'}), 404
-        
+        conn.start_transaction()
+        try:
+            cursor.execute("""
+                SELECT student_id, course_id, session, semester, score FROM results WHERE id = %s FOR UPDATE
+            """, (result_id,))
+            row = cursor.fetchone()
+            
+            if row is None:
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                return jsonify({'error': 'Result not found'}), 404
+            
+            student_id, course_id, session_year, semester, old_score = row
+            cursor.execute("""
+                UPDATE results SET score = %s, grade = %s, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+            """, (score, grade, result_id))
+            invalidate(cursor, course_id, session_year, semester)
+            record_result(cursor, student_id, course_id, score, old_score=old_score)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         cursor.close()
         conn.close()
         
+        mark_write()
+        publish([user_channel(student_id)], 'results',
+                 {'course_id': course_id, 'session': session_year, 'semester': semester})
+        
         return jsonify({
             'success': True,
             'message': 'Result updated successfully'
@@ -782,6 +938,27 @@ def update_result():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Live events
+@app.route('/api/events/token', methods=['GET'])
+def get_events_token():
+    """Signed token for opening the live events stream"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        server = get_event_server(app.secret_key)
+        if server.loop is None:
+            return jsonify({'error': 'Live events are unavailable'}), 503
+        
+        return jsonify({
+            'success': True,
+            'url': EVENTS_PUBLIC_URL,
+            'token': server.issue_token(session['user_id'], session['user_role'])
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Utility endpoints
 @app.route('/api/users/students', methods=['GET'])
 def get_students():
@@ -790,7 +967,7 @@ def get_students():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
@@ -815,7 +992,7 @@ def get_courses():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
@@ -845,7 +1022,7 @@ def get_departments():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
@@ -895,6 +1072,8 @@ def add_department():
         cursor.close()
         conn.close()
         
+        mark_write()
+        
         return jsonify({
             'success': True,
             'message': 'Department added successfully'
@@ -941,6 +1120,8 @@ def update_department(dept_id):
         cursor.close()
         conn.close()
         
+        mark_write()
+        
         return jsonify({
             'success': True,
             'message': 'Department updated successfully'
@@ -982,6 +1163,8 @@ def delete_department(dept_id):
         cursor.close()
         conn.close()
         
+        mark_write()
+        
         return jsonify({
             'success': True,
             'message': 'Department deleted successfully'
@@ -990,7 +1173,371 @@ def delete_department(dept_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Analytics endpoints (served from Parquet snapshots, not the live database)
+@app.route('/api/admin/analytics/snapshots', methods=['GET'])
+def get_analytics_snapshots():
+    """List exported analytics snapshots"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        return jsonify({
+            'success': True,
+            'snapshots': analytics.list_snapshots()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/analytics/snapshots', methods=['POST'])
+def start_analytics_snapshot():
+    """Queue a snapshot export for a session"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        if not data.get('session'):
+            return jsonify({'error': 'Session is required'}), 400
+        
+        job_id = enqueue('analytics.snapshot', {'session': data['session']},
+                         priority=PRIORITY_LOW, created_by=session['user_id'])
+        if not job_id:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/analytics/<report>', methods=['GET'])
+def get_cohort_analytics(report):
+    """Cohort statistics for a session: distribution, pass-rates or courses"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    session_year = request.args.get('session')
+    if not session_year:
+        return jsonify({'error': 'Session is required'}), 400
+    
+    try:
+        if report == 'distribution':
+            data = analytics.score_distribution(session_year, request.args.get('course_id', type=int))
+        elif report == 'pass-rates':
+            data = analytics.pass_rates(session_year)
+        elif report == 'courses':
+            data = analytics.course_comparison(session_year)
+        else:
+            return jsonify({'error': 'Unknown analytics report'}), 404
+        
+        return jsonify({
+            'success': True,
+            'analytics': data
+        })
+        
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/feedback/trends', methods=['GET'])
+def get_admin_feedback_trends():
+    """Rating and sentiment trends, optionally for one lecturer (?lecturer_id=)"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        return feedback_trends(lecturer_id=request.args.get('lecturer_id') or None)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/feedback/buffer', methods=['GET'])
+def get_feedback_buffer():
+    """Feedback submissions waiting to be written to the database"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        return jsonify({
+            'success': True,
+            'buffer': get_buffer().pending()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/predictions', methods=['POST'])
+def start_cohort_predictions():
+    """Queue performance predictions for a cohort from the feature store"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        cohort = {key: data[key] for key in ('student_ids', 'session', 'course_id') if data.get(key)}
+        
+        if not cohort:
+            return jsonify({'error': 'Provide student_ids, session or course_id'}), 400
+        
+        job_id = enqueue('predictions.cohort', cohort, created_by=session['user_id'])
+        if not job_id:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/sessions/archive', methods=['POST'])
+def start_session_archive():
+    """Queue archival of a closed academic session"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        session_year = data.get('session')
+        
+        if not session_year:
+            return jsonify({'error': 'Session is required'}), 400
+        
+        job_id = enqueue('sessions.archive', {'session': session_year, 'force': bool(data.get('force'))},
+                         priority=PRIORITY_LOW, created_by=session['user_id'])
+        if not job_id:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/transcripts/batch', methods=['POST'])
+def start_batch_transcripts():
+    """Queue transcript generation for a cohort"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        student_ids = data.get('student_ids')
+        session_year = data.get('session')
+        
+        if not student_ids and not session_year:
+            return jsonify({'error': 'Provide student_ids or a graduating session'}), 400
+        
+        job_id = enqueue('transcripts.batch', {'student_ids': student_ids, 'session': session_year},
+                         priority=PRIORITY_LOW, created_by=session['user_id'])
+        if not job_id:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/transcripts/batch/<int:job_id>/download', methods=['GET'])
+def download_batch_transcripts(job_id):
+    """Download the archive produced by a batch transcript job"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        job = get_job(conn, job_id)
+        conn.close()
+        
+        if not job or job['job_type'] != 'transcripts.batch':
+            return jsonify({'error': 'Job not found'}), 404
+        if job['status'] != 'succeeded':
+            return jsonify({'error': f"Transcripts are not ready (status: {job['status']})"}), 409
+        
+        return send_file(job['result']['archive'], mimetype='application/zip', as_attachment=True,
+                         download_name=f"transcripts_{job_id}.zip")
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/roster/import', methods=['POST'])
+def start_roster_import():
+    """Queue account creation for an uploaded CSV roster"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        roster = request.files.get('file')
+        role = request.form.get('role', 'student')
+        
+        if not roster or not roster.filename:
+            return jsonify({'error': 'A roster CSV file is required'}), 400
+        if role not in ROLES:
+            return jsonify({'error': f"Role must be one of {', '.join(ROLES)}"}), 400
+        
+        os.makedirs(ROSTER_DIR, exist_ok=True)
+        path = os.path.join(ROSTER_DIR, f"roster_{uuid.uuid4().hex}.csv")
+        roster.save(path)
+        
+        job_id = enqueue('roster.import', {'path': path, 'role': role}, created_by=session['user_id'])
+        if not job_id:
+            os.remove(path)
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/roster/import/<int:job_id>/credentials', methods=['GET'])
+def download_roster_credentials(job_id):
+    """Download the initial passwords generated by a roster import; the file is deleted once downloaded"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        job = get_job(conn, job_id)
+        conn.close()
+        
+        if not job or job['job_type'] != 'roster.import':
+            return jsonify({'error': 'Job not found'}), 404
+        if job['status'] != 'succeeded':
+            return jsonify({'error': f"Roster import has not finished (status: {job['status']})"}), 409
+        
+        # Plain-text passwords are handed out once: claim the file by renaming it so
+        # concurrent requests cannot both read it, then delete it before sending
+        path = job['result']['credentials']
+        claimed = f"{path}.{uuid.uuid4().hex}"
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            return jsonify({'error': 'The initial passwords were already downloaded and have been deleted'}), 410
+        with open(claimed, 'rb') as f:
+            content = f.read()
+        os.remove(claimed)
+        
+        response = send_file(io.BytesIO(content), mimetype='text/csv', as_attachment=True,
+                             download_name=f"credentials_{job_id}.csv")
+        response.headers['X-Credentials-Deleted'] = 'true'
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Background job endpoints
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Get status of a background job started by the current user"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        job = get_job(conn, job_id)
+        conn.close()
+        
+        if not job or (job['created_by'] != session['user_id'] and session['user_role'] != 'admin'):
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/jobs', methods=['GET'])
+def get_jobs():
+    """List recent background jobs"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        jobs = list_jobs(conn, request.args.get('status'), min(int(request.args.get('limit', 100)), 500))
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'jobs': jobs
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/sentiment/backfill', methods=['POST'])
+def start_sentiment_backfill():
+    """Queue scoring of all feedbacks without stored sentiment"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        job_id = enqueue('sentiment.backfill', {'start_after': '', 'batch_size': data.get('batch_size', 500)},
+                         priority=PRIORITY_LOW, created_by=session['user_id'])
+        if not job_id:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/results/regrade', methods=['POST'])
+def start_regrade():
+    """Queue recomputation of stored grades from scores"""
+    if 'user_id' not in session or session['user_role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        payload = {field: data.get(field) for field in ('course_id', 'session', 'semester')}
+        job_id = enqueue('results.regrade', payload, created_by=session['user_id'])
+        if not job_id:
+            return jsonify({'error': 'Database connection failed'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
+    # Feedback left in the local buffer by a previous run is flushed without waiting for a new submission
+    get_buffer()
+    
     print("=" * 60)
     print("🚀 IntellGrade API Server Starting...")
     print("=" * 60)
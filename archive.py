@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Session Archive
+Moves closed academic sessions out of the live results/feedbacks tables into
+compressed, session-partitioned archive tables
+"""
+
+import re
+import sys
+import argparse
+from typing import Dict, List, Optional
+
+from database import get_db_connection
+from job_queue import job_handler
+
+RESULT_COLUMNS = 'id, student_id, course_id, score, grade, session, semester, created_at, updated_at'
+
+def results_query(condition: Optional[str] = None) -> str:
+    """
+    Every result, live or archived, as a derived table
+
+    The condition is applied inside each branch so both can use their
+    indexes; its parameters must therefore be passed twice.
+    """
+    where = f" WHERE {condition}" if condition else ''
+    return f"""(
+        SELECT {RESULT_COLUMNS} FROM results{where}
+        UNION ALL
+        SELECT {RESULT_COLUMNS} FROM results_archive{where}
+    )"""
+
+# Every result, live or archived. Callers filtering on a student should use
+# student_results_query() instead so each branch can use its index.
+ALL_RESULTS = results_query()
+
+FEEDBACK_COLUMNS = ('id, student_id, course_id, lecturer_id, rating, comment, semester, sentiment_label, '
+                    'sentiment_score, sentiment_confidence, sentiment_engine, sentiment_analyzed_at, created_at')
+
+def feedbacks_query(condition: Optional[str] = None) -> str:
+    """
+    Every feedback, live or archived, as a derived table
+
+    The condition (e.g. "lecturer_id = %s") is applied inside each branch so
+    both can use their indexes; its parameters must therefore be passed twice.
+    Archived rows have a NULL updated_at, so ?since= deltas never resend them.
+    """
+    where = f" WHERE {condition}" if condition else ''
+    return f"""(
+        SELECT {FEEDBACK_COLUMNS}, updated_at FROM feedbacks{where}
+        UNION ALL
+        SELECT {FEEDBACK_COLUMNS}, NULL FROM feedbacks_archive{where}
+    )"""
+
+ALL_FEEDBACKS = feedbacks_query()
+
+def student_results_query(select: str = "r.*, c.code as course_code, c.title as course_title, c.unit",
+                          changed_since: bool = False) -> str:
+    """
+    Query for one student's live and archived results, joined to courses
+
+    With changed_since, a result is included when it changed itself or when
+    its class's statistics did (another student's result in the class was
+    added, changed or removed), since its percentile and class_stats moved.
+    """
+    condition = "student_id = %s"
+    if changed_since:
+        condition += """ AND (updated_at >= FROM_UNIXTIME(%s) OR (course_id, session, semester) IN (
+                SELECT course_id, session, semester FROM course_grade_stats WHERE changed_at >= FROM_UNIXTIME(%s)))"""
+    return f"""
+        SELECT {select}
+        FROM (
+            SELECT {RESULT_COLUMNS} FROM results WHERE {condition}
+            UNION ALL
+            SELECT {RESULT_COLUMNS} FROM results_archive WHERE {condition}
+        ) r
+        JOIN courses c ON r.course_id = c.id
+        ORDER BY r.session DESC, r.semester DESC, c.code
+    """
+
+def fetch_student_results(cursor, student_id: str, changed_since: Optional[int] = None) -> List[Dict[str, any]]:
+    """Fetch one student's results across live and archived sessions, optionally only recent changes"""
+    if changed_since is None:
+        cursor.execute(student_results_query(), (student_id, student_id))
+    else:
+        cursor.execute(student_results_query(changed_since=True),
+                       (student_id, changed_since, changed_since) * 2)
+    return cursor.fetchall()
+
+def is_archived(cursor, session_year: str) -> bool:
+    """Whether a session has been archived (and is closed for changes)"""
+    cursor.execute("SELECT 1 FROM archived_sessions WHERE session = %s", (session_year,))
+    return cursor.fetchone() is not None
+
+def partition_name(session_year: str) -> str:
+    """Partition name for a session, e.g. 2023/2024 -> p2023_2024"""
+    return 'p' + re.sub(r'[^0-9A-Za-z]', '_', session_year)
+
+def ensure_partition(cursor, table: str, session_year: str):
+    """Add the session's partition to an archive table if it does not exist yet"""
+    name = partition_name(session_year)
+    cursor.execute("""
+        SELECT 1 FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME = %s
+    """, (table, name))
+    if cursor.fetchone() is None:
+        cursor.execute(f"ALTER TABLE {table} ADD PARTITION (PARTITION {name} VALUES IN (%s))", (session_year,))
+
+def _move_batches(conn, select_ids: str, copy: str, delete: str, session_year: str, batch_size: int) -> int:
+    """Copy and delete rows in id batches, one transaction per batch"""
+    moved = 0
+    cursor = conn.cursor()
+    while True:
+        cursor.execute(select_ids, (session_year, batch_size))
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            break
+
+        placeholders = ', '.join(['%s'] * len(ids))
+        conn.start_transaction()
+        try:
+            cursor.execute(copy.format(ids=placeholders), tuple(ids))
+            cursor.execute(delete.format(ids=placeholders), tuple(ids))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        moved += len(ids)
+    cursor.close()
+    return moved
+
+def archive_session(conn, session_year: str, batch_size: int = 1000, force: bool = False) -> Dict[str, int]:
+    """
+    Move a closed session's results and feedbacks into the archive tables
+
+    Rows are moved in batches so the live tables are never locked for long;
+    an interrupted run can simply be started again.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(session) FROM results")
+    latest = cursor.fetchone()[0]
+    if session_year == latest and not force:
+        cursor.close()
+        raise ValueError(f"{session_year} is the most recent session; pass force to archive it anyway")
+
+    # Closing the session first stops new results being added while rows move
+    cursor.execute("""
+        INSERT INTO archived_sessions (session) VALUES (%s)
+        ON DUPLICATE KEY UPDATE session = session
+    """, (session_year,))
+    ensure_partition(cursor, 'results_archive', session_year)
+    ensure_partition(cursor, 'feedbacks_archive', session_year)
+
+    # Tells the delete triggers these rows are being archived, not deleted,
+    # so delta sync keeps them for listings that include the archive
+    cursor.execute("SET @archiving = 1")
+    cursor.close()
+
+    try:
+        moved = _move_session(conn, session_year, batch_size)
+    finally:
+        cursor = conn.cursor()
+        cursor.execute("SET @archiving = NULL")
+        cursor.close()
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE archived_sessions
+        SET results_archived = results_archived + %s, feedbacks_archived = feedbacks_archived + %s,
+            archived_at = CURRENT_TIMESTAMP
+        WHERE session = %s
+    """, (moved['results'], moved['feedbacks'], session_year))
+    cursor.close()
+
+    return moved
+
+def _move_session(conn, session_year: str, batch_size: int) -> Dict[str, int]:
+    """Move a session's results and feedbacks into the archive tables"""
+    results_moved = _move_batches(
+        conn,
+        "SELECT id FROM results WHERE session = %s ORDER BY id LIMIT %s",
+        f"INSERT IGNORE INTO results_archive ({RESULT_COLUMNS}) SELECT {RESULT_COLUMNS} FROM results WHERE id IN ({{ids}})",
+        "DELETE FROM results WHERE id IN ({ids})",
+        session_year, batch_size
+    )
+
+    feedbacks_moved = _move_batches(
+        conn,
+        "SELECT id FROM feedbacks WHERE semester LIKE CONCAT(%s, '-%%') ORDER BY id LIMIT %s",
+        f"INSERT IGNORE INTO feedbacks_archive ({FEEDBACK_COLUMNS}, session) "
+        f"SELECT {FEEDBACK_COLUMNS}, SUBSTRING_INDEX(semester, '-', 1) FROM feedbacks WHERE id IN ({{ids}})",
+        "DELETE FROM feedbacks WHERE id IN ({ids})",
+        session_year, batch_size
+    )
+
+    return {'results': results_moved, 'feedbacks': feedbacks_moved}
+
+@job_handler('sessions.archive')
+def archive_session_job(ctx):
+    """Archive a closed session on a worker"""
+    return archive_session(ctx.conn, ctx.payload['session'], force=ctx.payload.get('force', False))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Archive a closed academic session')
+    parser.add_argument('session', help='Session to archive, e.g. 2022/2023')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows moved per transaction')
+    parser.add_argument('--force', action='store_true', help='Allow archiving the most recent session')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+
+    print(f"🗄️  Archiving session {args.session}...")
+    try:
+        moved = archive_session(conn, args.session, args.batch_size, args.force)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    print(f"✅ Archived {moved['results']} results and {moved['feedbacks']} feedbacks")
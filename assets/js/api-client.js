@@ -38,6 +38,7 @@ class APIClient {
 
     // Authentication methods
     async login(username, password) {
+        if (window.syncCache) await window.syncCache.clear();
         return this.request('/auth/login', {
             method: 'POST',
             body: JSON.stringify({ username, password })
@@ -45,6 +46,8 @@ class APIClient {
     }
 
     async logout() {
+        if (window.syncCache) await window.syncCache.clear();
+        if (window.eventsClient) window.eventsClient.disconnect();
         return this.request('/auth/logout', {
             method: 'POST'
         });
@@ -55,8 +58,34 @@ class APIClient {
     }
 
     // Student methods
-    async getStudentResults() {
-        return this.request('/student/results');
+    async getStudentResults(since = null) {
+        return this.request(since !== null ? `/student/results?since=${since}` : '/student/results');
+    }
+
+    // Same shape as getStudentResults(), but served from the IndexedDB cache plus a ?since= delta
+    async getStudentResultsSynced() {
+        if (!window.syncCache) return this.getStudentResults();
+        const { rows } = await window.syncCache.sync(
+            'student-results',
+            cursor => this.getStudentResults(cursor),
+            response => response.full === false ? response.changes : response.results.flatMap(semester => semester.courses)
+        );
+        return { success: true, results: this.groupResultsBySemester(rows) };
+    }
+
+    groupResultsBySemester(rows) {
+        const sorted = [...rows].sort((a, b) =>
+            b.session.localeCompare(a.session) || b.semester.localeCompare(a.semester) ||
+            a.course_code.localeCompare(b.course_code));
+        const groups = new Map();
+        for (const row of sorted) {
+            const key = `${row.session}-${row.semester}`;
+            if (!groups.has(key)) {
+                groups.set(key, { session: row.session, semester: row.semester, courses: [] });
+            }
+            groups.get(key).courses.push(row);
+        }
+        return [...groups.values()];
     }
 
     async getStudentTranscript() {
@@ -80,25 +109,106 @@ class APIClient {
         return this.request('/lecturer/feedback');
     }
 
+    // filters: { granularity: 'day' | 'week' | 'semester', from, to, course_id }
+    async getLecturerFeedbackTrends(filters = {}) {
+        const query = new URLSearchParams(filters).toString();
+        return this.request(`/lecturer/feedback/trends${query ? `?${query}` : ''}`);
+    }
+
     async getLecturerCourses() {
         return this.request('/lecturer/courses');
     }
 
-    async getLecturerStudents() {
-        return this.request('/lecturer/students');
+    async getLecturerStudents(format = null) {
+        return this.request(format ? `/lecturer/students?format=${format}` : '/lecturer/students');
+    }
+
+    async getCourseStats(courseId, session = null, semester = null) {
+        const params = new URLSearchParams();
+        if (session) params.set('session', session);
+        if (semester) params.set('semester', semester);
+        const query = params.toString();
+        return this.request(`/lecturer/courses/${courseId}/stats${query ? `?${query}` : ''}`);
     }
 
     async getLecturerReports() {
         return this.request('/lecturer/reports');
     }
 
+    // Makes sure a report artifact is current, waiting for the job worker if it has to be generated
+    async prepareReport(reportType, options = {}) {
+        const query = new URLSearchParams(options).toString();
+        const response = await this.request(`/lecturer/reports/${reportType}?${query}`, {
+            method: 'POST'
+        });
+        if (response.status === 'generating') {
+            return this.waitForJob(response.job_id);
+        }
+        return response;
+    }
+
+    getReportDownloadURL(reportType, options = {}) {
+        const query = new URLSearchParams(options).toString();
+        return `${this.baseURL}/lecturer/reports/${reportType}/download?${query}`;
+    }
+
     // Admin methods
     async getAdminOverview() {
         return this.request('/admin/overview');
     }
 
-    async getAllFeedback() {
-        return this.request('/admin/feedback');
+    async getAllFeedback(format = null, since = null) {
+        const params = new URLSearchParams();
+        if (format) params.set('format', format);
+        if (since !== null) params.set('since', since);
+        const query = params.toString();
+        return this.request(`/admin/feedback${query ? `?${query}` : ''}`);
+    }
+
+    // Same shape as getAllFeedback(), but served from the IndexedDB cache plus a ?since= delta
+    async getAllFeedbackSynced() {
+        if (!window.syncCache) return this.getAllFeedback();
+        const { rows, response } = await window.syncCache.sync(
+            'admin-feedback',
+            cursor => this.getAllFeedback(null, cursor),
+            response => response.feedbacks
+        );
+        rows.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
+        return { success: true, feedbacks: rows, analytics: response.analytics };
+    }
+
+    // Same filters as getLecturerFeedbackTrends(), plus lecturer_id
+    async getFeedbackTrends(filters = {}) {
+        const query = new URLSearchParams(filters).toString();
+        return this.request(`/admin/feedback/trends${query ? `?${query}` : ''}`);
+    }
+
+    async startBatchTranscripts(cohort) {
+        return this.request('/admin/transcripts/batch', {
+            method: 'POST',
+            body: JSON.stringify(cohort)
+        });
+    }
+
+    getBatchTranscriptsURL(jobId) {
+        return `${this.baseURL}/admin/transcripts/batch/${jobId}/download`;
+    }
+
+    // file is a File from an <input type="file">; the browser sets the multipart header
+    async startRosterImport(file, role = 'student') {
+        const form = new FormData();
+        form.append('file', file);
+        form.append('role', role);
+        return this.request('/admin/roster/import', {
+            method: 'POST',
+            headers: {},
+            body: form
+        });
+    }
+
+    // The passwords can be downloaded once; the server deletes them afterwards
+    getRosterCredentialsURL(jobId) {
+        return `${this.baseURL}/admin/roster/import/${jobId}/credentials`;
     }
 
     // Results management
@@ -125,6 +235,29 @@ class APIClient {
         return this.request('/courses');
     }
 
+    // Live events
+    async getEventsToken() {
+        return this.request('/events/token');
+    }
+
+    // Background jobs
+    async getJob(jobId) {
+        return this.request(`/jobs/${jobId}`);
+    }
+
+    async waitForJob(jobId, intervalMs = 1000) {
+        while (true) {
+            const { job } = await this.getJob(jobId);
+            if (job.status === 'succeeded') {
+                return job;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Job failed');
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    }
+
     // Department methods
     async getDepartments() {
         return this.request('/departments');
@@ -207,6 +340,21 @@ class APIUtils {
         return 'F';
     }
 
+    // Turns a ?format=columnar listing ({column: [values]}) back into row objects
+    static fromColumnar(columns) {
+        const names = Object.keys(columns);
+        const length = names.length ? columns[names[0]].length : 0;
+        const rows = new Array(length);
+        for (let i = 0; i < length; i++) {
+            const row = {};
+            for (const name of names) {
+                row[name] = columns[name][i];
+            }
+            rows[i] = row;
+        }
+        return rows;
+    }
+
     static getGradeColor(grade) {
         const gradeColors = {
             'A+': 'success', 'A': 'success', 'A-': 'success',
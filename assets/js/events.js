@@ -0,0 +1,59 @@
+/**
+ * IntellGrade Live Events
+ * Listens on the server-sent events stream so dashboards refresh only when
+ * the user's results or feedback actually change
+ */
+
+class EventsClient {
+    constructor() {
+        this.source = null;
+        this.handlers = {};
+        this.retryDelay = 5000;
+    }
+
+    on(event, handler) {
+        if (!this.handlers[event]) {
+            this.handlers[event] = [];
+            if (this.source) this.listen(event);
+        }
+        this.handlers[event].push(handler);
+    }
+
+    listen(event) {
+        this.source.addEventListener(event, message => {
+            const data = message.data ? JSON.parse(message.data) : {};
+            this.handlers[event].forEach(handler => handler(data));
+        });
+    }
+
+    async connect() {
+        if (this.source || typeof EventSource === 'undefined') return;
+
+        try {
+            const { url, token } = await window.apiClient.getEventsToken();
+            this.source = new EventSource(`${url}?token=${encodeURIComponent(token)}`);
+            Object.keys(this.handlers).forEach(event => this.listen(event));
+
+            this.source.onerror = () => {
+                // EventSource reconnects by itself unless the server refused the
+                // stream (e.g. an expired token); then start over with a new token
+                if (this.source.readyState === EventSource.CLOSED) {
+                    this.source = null;
+                    setTimeout(() => this.connect(), this.retryDelay);
+                }
+            };
+        } catch (error) {
+            console.warn('Live events unavailable:', error.message);
+        }
+    }
+
+    disconnect() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+}
+
+// Global events client instance
+window.eventsClient = new EventsClient();
@@ -56,6 +56,7 @@ class LecturerDashboard {
         this.setupEventListeners();
         this.loadUserInfo();
         this.loadOverviewPage();
+        this.subscribeToUpdates();
         
         console.log('Dashboard initialization completed');
     }
@@ -234,6 +235,18 @@ class LecturerDashboard {
         }
     }
 
+    subscribeToUpdates() {
+        if (!window.eventsClient) return;
+
+        // New feedback for this lecturer has been written to the database
+        window.eventsClient.on('feedback', () => {
+            if (this.currentPage === 'overview' || this.currentPage === 'feedback') {
+                this.loadFeedbackAnalytics();
+            }
+        });
+        window.eventsClient.connect();
+    }
+
     async loadFeedbackAnalytics() {
         try {
             // Try to get feedback data from API first
@@ -867,7 +880,7 @@ class LecturerDashboard {
         `;
 
         reports.forEach(report => {
-            const date = new Date(report.generatedAt).toLocaleDateString();
+            const date = report.generatedAt ? new Date(report.generatedAt).toLocaleDateString() : 'Not yet generated';
             html += `
                 <div class="col-lg-6 col-xl-4">
                     <div class="card h-100">
@@ -1041,19 +1054,37 @@ function viewStudentResults(studentId) {
     // Implementation for viewing student results
 }
 
-function generateNewReport() {
+async function generateNewReport() {
     Utils.showNotification('Generating new report...', 'info');
-    // Implementation for generating new report
+    try {
+        await Promise.all(['performance', 'feedback', 'progress'].map(type => window.apiClient.prepareReport(type)));
+        Utils.showNotification('Reports are up to date', 'success');
+        if (window.lecturerDashboard) {
+            window.lecturerDashboard.loadReportsPage();
+        }
+    } catch (error) {
+        Utils.showNotification(`Report generation failed: ${error.message}`, 'danger');
+    }
 }
 
-function viewReport(reportId) {
-    Utils.showNotification(`Viewing report ${reportId}`, 'info');
-    // Implementation for viewing report
+async function viewReport(reportId) {
+    Utils.showNotification(`Preparing report ${reportId}...`, 'info');
+    try {
+        await window.apiClient.prepareReport(reportId, { format: 'html' });
+        window.open(window.apiClient.getReportDownloadURL(reportId, { format: 'html' }), '_blank');
+    } catch (error) {
+        Utils.showNotification(`Could not open report: ${error.message}`, 'danger');
+    }
 }
 
-function downloadReport(reportId) {
-    Utils.showNotification(`Downloading report ${reportId}`, 'info');
-    // Implementation for downloading report
+async function downloadReport(reportId) {
+    Utils.showNotification(`Preparing report ${reportId} for download...`, 'info');
+    try {
+        await window.apiClient.prepareReport(reportId, { format: 'csv' });
+        window.location.href = window.apiClient.getReportDownloadURL(reportId, { format: 'csv' });
+    } catch (error) {
+        Utils.showNotification(`Could not download report: ${error.message}`, 'danger');
+    }
 }
 
 function showModal(modalId) {
@@ -15,6 +15,19 @@ class StudentDashboard {
         this.setupEventListeners();
         this.loadUserInfo();
         this.loadPageContent();
+        this.subscribeToUpdates();
+    }
+
+    subscribeToUpdates() {
+        if (!window.eventsClient) return;
+
+        // Results pages refresh (via a delta sync) only when a result of this student changes
+        window.eventsClient.on('results', () => {
+            if (this.currentPage === 'overview' || this.currentPage === 'results') {
+                this.loadPageContent();
+            }
+        });
+        window.eventsClient.connect();
     }
 
     setupEventListeners() {
@@ -133,7 +146,7 @@ class StudentDashboard {
 
     async loadOverviewPage() {
         try {
-            const resultsResponse = await window.apiClient.getStudentResults();
+            const resultsResponse = await window.apiClient.getStudentResultsSynced();
             const feedbackResponse = await window.apiClient.getFeedbackCourses();
             
             if (resultsResponse.success) {
@@ -270,7 +283,7 @@ class StudentDashboard {
     async loadResultsPage() {
         try {
             window.apiUtils.showLoading(document.getElementById('results'));
-            const response = await window.apiClient.getStudentResults();
+            const response = await window.apiClient.getStudentResultsSynced();
             
             if (response.success) {
                 this.displayResults(response.results);
@@ -0,0 +1,118 @@
+/**
+ * IntellGrade Sync Cache
+ * Keeps API listings in IndexedDB and refreshes them with ?since= deltas,
+ * so repeated page loads only transfer what changed
+ */
+
+class SyncCache {
+    constructor(dbName = 'intellgrade-sync') {
+        this.dbName = dbName;
+        this.dbPromise = null;
+    }
+
+    get supported() {
+        return typeof indexedDB !== 'undefined';
+    }
+
+    open() {
+        if (!this.dbPromise) {
+            this.dbPromise = new Promise((resolve, reject) => {
+                const request = indexedDB.open(this.dbName, 1);
+                request.onupgradeneeded = () => {
+                    const db = request.result;
+                    // Rows are keyed [dataset, id]; cursors are keyed by dataset
+                    db.createObjectStore('rows');
+                    db.createObjectStore('cursors');
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => reject(request.error);
+            });
+        }
+        return this.dbPromise;
+    }
+
+    static done(transaction) {
+        return new Promise((resolve, reject) => {
+            transaction.oncomplete = () => resolve();
+            transaction.onerror = () => reject(transaction.error);
+            transaction.onabort = () => reject(transaction.error);
+        });
+    }
+
+    static datasetRange(dataset) {
+        return IDBKeyRange.bound([dataset, ''], [dataset, '\uffff']);
+    }
+
+    async getCursor(dataset) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const request = db.transaction('cursors').objectStore('cursors').get(dataset);
+            request.onsuccess = () => resolve(request.result ?? null);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    async getRows(dataset) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const request = db.transaction('rows').objectStore('rows').getAll(SyncCache.datasetRange(dataset));
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    // Applies a full listing or a delta ({rows, deleted}) and stores the new cursor
+    async apply(dataset, { full, cursor, rows, deleted = [] }) {
+        const db = await this.open();
+        const transaction = db.transaction(['rows', 'cursors'], 'readwrite');
+        const store = transaction.objectStore('rows');
+
+        if (full) {
+            store.delete(SyncCache.datasetRange(dataset));
+        }
+        for (const row of rows) {
+            store.put(row, [dataset, String(row.id)]);
+        }
+        for (const id of deleted) {
+            store.delete([dataset, String(id)]);
+        }
+        transaction.objectStore('cursors').put(cursor, dataset);
+
+        return SyncCache.done(transaction);
+    }
+
+    /**
+     * Brings a dataset up to date and returns { rows, response }
+     *
+     * fetcher(cursor) calls the API (cursor is null for a full listing);
+     * rowsOf(response) returns the rows of a full or delta response.
+     */
+    async sync(dataset, fetcher, rowsOf) {
+        if (!this.supported) {
+            const response = await fetcher(null);
+            return { rows: rowsOf(response), response };
+        }
+
+        const cursor = await this.getCursor(dataset);
+        const response = await fetcher(cursor);
+        await this.apply(dataset, {
+            full: response.full !== false,
+            cursor: response.cursor,
+            rows: rowsOf(response),
+            deleted: response.deleted || []
+        });
+        return { rows: await this.getRows(dataset), response };
+    }
+
+    async clear() {
+        if (!this.supported) return;
+        const db = await this.open();
+        const transaction = db.transaction(['rows', 'cursors'], 'readwrite');
+        transaction.objectStore('rows').clear();
+        transaction.objectStore('cursors').clear();
+        return SyncCache.done(transaction);
+    }
+}
+
+// Global sync cache instance
+window.syncCache = new SyncCache();
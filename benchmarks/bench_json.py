@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+JSON serialization benchmark
+Compares Flask's default provider with FastJSONProvider (orjson and standard
+library paths) on a feedback payload shaped like /api/admin/feedback rows
+
+Usage: python benchmarks/bench_json.py [--rows 100000] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import FastJSONProvider
+
+COMMENTS = [
+    'Excellent teaching, very clear explanations and helpful examples.',
+    'The course was okay but the assignments were too long.',
+    'Poor organization, lectures often started late.',
+    'Great lecturer! Always available after class to answer questions.',
+    'Average course. Some topics were rushed.'
+]
+
+def feedback_rows(count: int):
+    """Rows as cursor(dictionary=True) returns them for the feedback listing"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    rows = []
+    for i in range(count):
+        rating = rng.randint(1, 5)
+        created = start + timedelta(minutes=i * 7)
+        rows.append({
+            'id': f"FB_{i:08d}",
+            'student_id': f"STU{rng.randint(1, 5000):04d}",
+            'course_id': rng.randint(1, 200),
+            'lecturer_id': f"LECT{rng.randint(1, 80):03d}",
+            'rating': rating,
+            'comment': rng.choice(COMMENTS),
+            'semester': '2023/2024-1',
+            'sentiment_label': 'positive' if rating >= 4 else 'negative' if rating <= 2 else 'neutral',
+            'sentiment_score': Decimal(f"{rng.uniform(-100, 100):.2f}"),
+            'sentiment_confidence': Decimal(f"{rng.random():.3f}"),
+            'sentiment_analyzed_at': created + timedelta(seconds=30),
+            'created_at': created,
+            'course_code': f"CS{rng.randint(100, 499)}",
+            'course_title': 'Introduction to Programming',
+            'student_name': 'Alice Johnson',
+            'lecturer_name': 'Dr. John Smith'
+        })
+    return rows
+
+def run(app: Flask, payload, repeat: int):
+    """Best time of `repeat` full response builds, and the body size"""
+    best = float('inf')
+    size = 0
+    with app.app_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = app.json.response(payload)
+            best = min(best, time.perf_counter() - started)
+            size = len(response.get_data())
+    return best, size
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark JSON response serialization')
+    parser.add_argument('--rows', type=int, default=100000, help='Feedback rows in the payload')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per provider (best is reported)')
+    args = parser.parse_args()
+
+    payload = {'success': True, 'feedbacks': feedback_rows(args.rows)}
+    print(f"📦 {args.rows} feedback rows, best of {args.repeat}")
+
+    candidates = [('flask default', DefaultJSONProvider, False)]
+    if json_provider.orjson is not None:
+        candidates.append(('fast (orjson)', FastJSONProvider, False))
+    candidates.append(('fast (stdlib)', FastJSONProvider, True))
+
+    orjson_module = json_provider.orjson
+    baseline = None
+    for name, provider_class, force_stdlib in candidates:
+        app = Flask(__name__)
+        app.json = provider_class(app)
+        json_provider.orjson = None if force_stdlib else orjson_module
+        try:
+            seconds, size = run(app, payload, args.repeat)
+        finally:
+            json_provider.orjson = orjson_module
+        baseline = baseline or seconds
+        print(f"   {name:<15} {seconds * 1000:8.1f} ms  {args.rows / seconds:>12,.0f} rows/s  "
+              f"{size / 1024 / 1024:6.1f} MB  {baseline / seconds:5.1f}x")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Row memory benchmark
+Compares per-row dictionaries (what cursor(dictionary=True) returns) with
+RowSet tuple rows, measuring peak memory with tracemalloc and the size of
+the dict vs columnar JSON payloads
+
+Usage: python benchmarks/bench_rows.py [--rows 100000]
+"""
+
+import os
+import sys
+import random
+import argparse
+import tracemalloc
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+
+from json_provider import FastJSONProvider
+from rowset import RowSet
+
+COLUMNS = ('id', 'student_id', 'course_id', 'lecturer_id', 'rating', 'comment', 'semester',
+           'sentiment_label', 'sentiment_score', 'sentiment_confidence', 'sentiment_analyzed_at',
+           'created_at', 'course_code', 'course_title', 'lecturer_name', 'student_name')
+
+COMMENTS = [
+    'Excellent teaching, very clear explanations and helpful examples.',
+    'The course was okay but the assignments were too long.',
+    'Poor organization, lectures often started late.'
+]
+
+def tuple_rows(count: int):
+    """Rows as a plain cursor returns them for the admin feedback listing"""
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    return [(
+        f"FB_{i:08d}", f"STU{rng.randint(1, 5000):04d}", rng.randint(1, 200), f"LECT{rng.randint(1, 80):03d}",
+        rng.randint(1, 5), rng.choice(COMMENTS), '2023/2024-1', 'neutral',
+        Decimal(f"{rng.uniform(-100, 100):.2f}"), Decimal(f"{rng.random():.3f}"),
+        start + timedelta(minutes=i, seconds=30), start + timedelta(minutes=i),
+        f"CS{rng.randint(100, 499)}", 'Introduction to Programming', 'Dr. John Smith', 'Alice Johnson'
+    ) for i in range(count)]
+
+def measure(build):
+    """Peak traced memory while building a structure from already-fetched rows"""
+    tracemalloc.start()
+    result = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark row memory: dictionaries vs RowSet')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows to build')
+    args = parser.parse_args()
+
+    rows = tuple_rows(args.rows)
+    print(f"📦 {args.rows} feedback rows, {len(COLUMNS)} columns")
+
+    # The driver materializes the tuples either way; measure what is kept on top of them
+    dicts, dict_peak = measure(lambda: [dict(zip(COLUMNS, row)) for row in rows])
+    rowset, rowset_peak = measure(lambda: RowSet(COLUMNS, list(rows)))
+    del dicts
+
+    print(f"   dict rows     {dict_peak / 1024 / 1024:8.1f} MB")
+    print(f"   RowSet        {rowset_peak / 1024 / 1024:8.1f} MB  "
+          f"({dict_peak / max(rowset_peak, 1):.0f}x less)")
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    with app.app_context():
+        (dict_body, dict_json_peak) = measure(lambda: app.json.dumpb(rowset.to_dicts()))
+        (columnar_body, columnar_json_peak) = measure(lambda: app.json.dumpb(rowset.to_columnar()))
+
+    print(f"   dict JSON     {len(dict_body) / 1024 / 1024:8.1f} MB body, "
+          f"{dict_json_peak / 1024 / 1024:6.1f} MB peak while serializing")
+    print(f"   columnar JSON {len(columnar_body) / 1024 / 1024:8.1f} MB body, "
+          f"{columnar_json_peak / 1024 / 1024:6.1f} MB peak while serializing")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Sentiment matcher benchmark
+Compares the phrase-trie analyzer with the previous word-by-word scoring
+(a list lookup per word, then separate passes for intensifiers and negation)
+on generated feedback comments, and counts comments whose label changed
+
+Usage: python benchmarks/bench_sentiment.py [--comments 20000] [--repeat 3]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from sentiment_analysis import DEFAULT_LEXICON, SentimentAnalyzer
+
+CLAUSES = [
+    'Excellent teaching methods and clear explanations',
+    'the practical sessions were very helpful',
+    'the course content is comprehensive but could use more examples',
+    'very confusing and poorly organized',
+    'the lecturer is not helpful at all',
+    'lectures were well-explained and easy to understand',
+    'assignments are time-consuming and a waste of time',
+    'the pace was too fast and hard to follow',
+    'amazing lecturer, really knowledgeable and patient with students',
+    "the lecturer doesn't explain the difficult topics well",
+    'the labs were engaging, up to date and well-organized',
+    'some topics were boring and repetitive',
+    'never unclear, always approachable and friendly'
+]
+
+class WordByWordAnalyzer(SentimentAnalyzer):
+    """The scoring used before the phrase matcher, kept here for comparison"""
+
+    def __init__(self):
+        super().__init__()
+        with open(DEFAULT_LEXICON) as f:
+            lexicon = json.load(f)
+        self.positive_keywords = list(lexicon['positive'])
+        self.negative_keywords = list(lexicon['negative'])
+        self.intensifiers = list(lexicon['intensifiers'])
+        self.negators = lexicon['negators']
+
+    def analyze_sentiment(self, text):
+        cleaned_text = re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', text.lower())).strip()
+        words = cleaned_text.split()
+        positive_words = [word for word in words if word in self.positive_keywords]
+        negative_words = [word for word in words if word in self.negative_keywords]
+        positive_score = self._negate(words, self._intensify(words, positive_words), positive_words)
+        negative_score = self._negate(words, self._intensify(words, negative_words), negative_words)
+        final_score = positive_score - negative_score
+        sentiment, confidence = self._categorize_sentiment(final_score, len(positive_words), len(negative_words))
+        return {'sentiment': sentiment, 'score': final_score, 'confidence': confidence}
+
+    def _intensify(self, words, found_words):
+        score = 0.0
+        for i, word in enumerate(words):
+            if word in found_words:
+                score += 1.5 if i > 0 and words[i - 1] in self.intensifiers else 1.0
+        return score
+
+    def _negate(self, words, score, found_words):
+        for i, word in enumerate(words):
+            if word in found_words and any(words[j] in self.negators for j in range(max(0, i - 3), i)):
+                score -= 1.0
+        return max(0, score)
+
+def comments(count: int):
+    rng = random.Random(11)
+    return ['. '.join(rng.sample(CLAUSES, rng.randint(1, 4))) + '.' for _ in range(count)]
+
+def run(analyzer, texts, repeat: int):
+    """Best time of `repeat` batch runs, and the labels of the last one"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = analyzer.batch_analyze(texts)
+        best = min(best, time.perf_counter() - started)
+    return best, [result['sentiment'] for result in results]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the sentiment phrase matcher')
+    parser.add_argument('--comments', type=int, default=20000, help='Generated feedback comments')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per analyzer (best is reported)')
+    args = parser.parse_args()
+
+    texts = comments(args.comments)
+    words = sum(len(text.split()) for text in texts)
+    print(f"💬 {args.comments} comments ({words} words), best of {args.repeat}")
+
+    baseline = None
+    labels = {}
+    for name, analyzer in (('word-by-word', WordByWordAnalyzer()), ('phrase trie', SentimentAnalyzer())):
+        seconds, labels[name] = run(analyzer, texts, args.repeat)
+        baseline = baseline or seconds
+        print(f"   {name:<13} {seconds * 1000:8.1f} ms  {args.comments / seconds:>10,.0f} comments/s  "
+              f"{words / seconds:>12,.0f} words/s  {baseline / seconds:5.1f}x")
+
+    changed = sum(old != new for old, new in zip(labels['word-by-word'], labels['phrase trie']))
+    print(f"   labels changed by phrase matching: {changed} ({changed / args.comments * 100:.1f}%)")
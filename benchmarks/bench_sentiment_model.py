@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Sentiment engine benchmark
+Trains the hashed linear model and compares its accuracy and throughput
+with the lexicon engine, on generated comments or on a labeled CSV export
+
+Usage: python benchmarks/bench_sentiment_model.py [--comments 50000] [--csv labeled.csv]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from sentiment_analysis import SentimentAnalyzer
+from sentiment_model import SentimentModel, read_labeled_csv
+
+# Clauses with their sentiment (1, 0, -1), including wording the lexicon has no entry for
+CLAUSES = [
+    ('excellent teaching methods and clear explanations', 1),
+    ('the practical sessions were very helpful', 1),
+    ('always available after class to answer questions', 1),
+    ('I learned a lot from the assignments', 1),
+    ('lectures were well-explained and easy to understand', 1),
+    ('the lecturer really knows the subject', 1),
+    ('the course covers the syllabus', 0),
+    ('we had two tests and a project', 0),
+    ('lectures are on monday and wednesday', 0),
+    ('the course content could use more examples', 0),
+    ('lectures often started late', -1),
+    ('the lecturer is not helpful at all', -1),
+    ('assignments are time-consuming and a waste of time', -1),
+    ('the pace was too fast and hard to follow', -1),
+    ('nobody answered our emails', -1),
+    ("the slides didn't match the exam", -1)
+]
+
+def generated(count: int):
+    rng = random.Random(3)
+    texts, labels = [], []
+    for _ in range(count):
+        clauses = rng.sample(CLAUSES, rng.randint(1, 3))
+        polarity = sum(sign for _, sign in clauses)
+        texts.append('. '.join(text for text, _ in clauses).capitalize() + '.')
+        labels.append('positive' if polarity > 0 else 'negative' if polarity < 0 else 'neutral')
+    return texts, labels
+
+def evaluate(engine, texts, labels):
+    started = time.perf_counter()
+    results = engine.batch_analyze(texts)
+    seconds = time.perf_counter() - started
+    correct = sum(result['sentiment'] == label for result, label in zip(results, labels))
+    return seconds, correct / len(labels)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the sentiment engines')
+    parser.add_argument('--comments', type=int, default=50000, help='Generated comments (ignored with --csv)')
+    parser.add_argument('--csv', help='Labeled feedback CSV (comment plus label or rating)')
+    args = parser.parse_args()
+
+    texts, labels = read_labeled_csv(args.csv) if args.csv else generated(args.comments)
+    split = int(len(texts) * 0.8)
+    train_texts, train_labels = texts[:split], labels[:split]
+    test_texts, test_labels = texts[split:], labels[split:]
+
+    started = time.perf_counter()
+    model = SentimentModel.train(train_texts, train_labels)
+    print(f"🧠 Trained on {len(train_texts)} comments in {time.perf_counter() - started:.1f}s; "
+          f"evaluating on {len(test_texts)}")
+
+    for name, engine in (('lexicon', SentimentAnalyzer()), ('model', model)):
+        seconds, correct = evaluate(engine, test_texts, test_labels)
+        print(f"   {name:<8} accuracy {correct:6.1%}  {seconds * 1000:8.1f} ms  "
+              f"{len(test_texts) / seconds:>10,.0f} comments/s")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Imports each entry point in a fresh interpreter under -X importtime and
+reports wall time, import time and the packages that account for most of it
+
+Usage: python benchmarks/bench_startup.py [--entry api_server worker] [--repeat 5] [--top 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Name -> code run in the fresh interpreter (from the repository root)
+ENTRY_POINTS = {
+    'api_server': 'import api_server',
+    'worker': 'import worker; worker.load_handlers()',
+    'worker+preload': "import worker; worker.load_handlers(); worker.preload_models(['sentiment', 'performance'])",
+    'server': 'import server; server.check_dependencies()',
+    'sentiment_worker': 'import sentiment_worker',
+    'performance_prediction': 'import performance_prediction',
+}
+
+def measure(code: str):
+    """Wall seconds and per-module (self µs, cumulative µs) for one cold start"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'python')]),
+               PYTHONDONTWRITEBYTECODE='')
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(own), int(cumulative), len(name) - len(name.lstrip())))
+    return wall, modules
+
+def summarize(modules, top: int):
+    """Total import µs (top-level imports) and the packages with the most self time"""
+    total = sum(cumulative for _, _, cumulative, depth in modules if depth == 1)
+    packages = defaultdict(int)
+    for name, own, _, _ in modules:
+        packages[name.split('.')[0]] += own
+    return total, sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark entry point start-up time')
+    parser.add_argument('--entry', nargs='*', choices=sorted(ENTRY_POINTS), help='Entry points (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Cold starts per entry point (best is reported)')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest packages listed per entry point')
+    args = parser.parse_args()
+
+    baseline = min(measure('pass')[0] for _ in range(args.repeat))
+    print(f"🚀 Cold start, best of {args.repeat} (bare interpreter: {baseline * 1000:.0f} ms)")
+
+    for name in args.entry or ENTRY_POINTS:
+        runs = [measure(ENTRY_POINTS[name]) for _ in range(args.repeat)]
+        wall, modules = min(runs, key=lambda run: run[0])
+        total, packages = summarize(modules, args.top)
+        print(f"\n   {name:<24} {wall * 1000:7.0f} ms wall  {total / 1000:7.0f} ms imports  {len(modules)} modules")
+        for package, own in packages:
+            print(f"     {package:<22} {own / 1000:7.1f} ms")
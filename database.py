@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Database Access
+Shared MySQL connection settings for the API server and background workers,
+with optional read replicas for read-only queries
+"""
+
+import os
+import time
+import threading
+import mysql.connector
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'user': os.getenv('DB_USER', 'root'),
+    'password': os.getenv('DB_PASSWORD', ''),
+    'database': os.getenv('DB_NAME', 'intellgrade_db'),
+    'charset': 'utf8mb4',
+    'autocommit': True
+}
+
+def _parse_replicas(value):
+    """Parse DB_REPLICAS ("host:port,host:port") into connection configs"""
+    replicas = []
+    for entry in filter(None, (part.strip() for part in value.split(','))):
+        host, _, port = entry.partition(':')
+        config = dict(DB_CONFIG, host=host)
+        if port:
+            config['port'] = int(port)
+        replicas.append(config)
+    return replicas
+
+# Read replicas share the primary's credentials and database name
+REPLICA_CONFIGS = _parse_replicas(os.getenv('DB_REPLICAS', ''))
+
+# Replicas further behind the primary than this (in seconds) are skipped
+MAX_REPLICA_LAG = float(os.getenv('DB_MAX_REPLICA_LAG', '5'))
+
+# How long a user's reads stay on the primary after they write
+READ_YOUR_WRITES_WINDOW = float(os.getenv('DB_READ_YOUR_WRITES_WINDOW', '10'))
+
+# Seconds a measured replica lag is trusted before it is checked again
+REPLICA_LAG_CHECK_INTERVAL = 5
+
+_replica_lag = {}
+_replica_lock = threading.Lock()
+_next_replica = 0
+
+def _measure_lag(connection):
+    """Seconds the replica is behind its source, or None if replication is not running"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SHOW REPLICA STATUS")
+        status = cursor.fetchone()
+        lag_column = 'Seconds_Behind_Source'
+    except mysql.connector.Error:
+        # MySQL before 8.0.22
+        cursor.execute("SHOW SLAVE STATUS")
+        status = cursor.fetchone()
+        lag_column = 'Seconds_Behind_Master'
+    finally:
+        cursor.close()
+
+    if not status or status.get(lag_column) is None:
+        return None
+    return float(status[lag_column])
+
+def _replica_is_fresh(index, connection):
+    """Check (and cache) whether a replica is within MAX_REPLICA_LAG"""
+    now = time.time()
+    with _replica_lock:
+        cached = _replica_lag.get(index)
+    if cached and now - cached[1] < REPLICA_LAG_CHECK_INTERVAL:
+        lag = cached[0]
+    else:
+        lag = _measure_lag(connection)
+        with _replica_lock:
+            _replica_lag[index] = (lag, now)
+    return lag is not None and lag <= MAX_REPLICA_LAG
+
+def _get_replica_connection():
+    """Connect to the next healthy replica in round-robin order, or return None"""
+    global _next_replica
+
+    with _replica_lock:
+        start = _next_replica
+        _next_replica = (_next_replica + 1) % len(REPLICA_CONFIGS)
+
+    for offset in range(len(REPLICA_CONFIGS)):
+        index = (start + offset) % len(REPLICA_CONFIGS)
+        try:
+            connection = mysql.connector.connect(**REPLICA_CONFIGS[index])
+        except mysql.connector.Error as err:
+            print(f"Replica connection error ({REPLICA_CONFIGS[index]['host']}): {err}")
+            continue
+
+        try:
+            if _replica_is_fresh(index, connection):
+                return connection
+        except mysql.connector.Error as err:
+            print(f"Replica status error ({REPLICA_CONFIGS[index]['host']}): {err}")
+        connection.close()
+
+    return None
+
+def get_db_connection(read_only=False):
+    """
+    Create and return database connection
+
+    Read-only callers are sent to a read replica when one is configured and
+    not lagging; everything else (and any fallback) goes to the primary.
+    """
+    if read_only and REPLICA_CONFIGS:
+        connection = _get_replica_connection()
+        if connection:
+            return connection
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except mysql.connector.Error as err:
+        print(f"Database connection error: {err}")
+        return None
@@ -1,5 +1,9 @@
 -- IntellGrade Database Schema
 -- MySQL Database for Academic Management System
+--
+-- Creates a new database at the latest schema, with sample data. Existing
+-- databases are upgraded with migrate.py: add schema changes as a new file in
+-- migrations/ and mirror them here.
 
 -- Create database
 CREATE DATABASE IF NOT EXISTS intellgrade_db;
@@ -61,13 +65,71 @@ CREATE TABLE feedbacks (
     rating INT NOT NULL CHECK (rating >= 1 AND rating <= 5),
     comment TEXT,
     semester VARCHAR(10) NOT NULL,
+    sentiment_label ENUM('positive', 'neutral', 'negative') NULL,
+    sentiment_score DECIMAL(6,2) NULL,
+    sentiment_confidence DECIMAL(4,3) NULL,
+    sentiment_engine ENUM('lexicon', 'model') NULL,
+    sentiment_analyzed_at TIMESTAMP NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
     FOREIGN KEY (lecturer_id) REFERENCES users(id) ON DELETE CASCADE,
     UNIQUE KEY unique_feedback (student_id, course_id, lecturer_id, semester)
 );
 
+-- Archived sessions (see archive.py). Closed sessions are moved out of the live
+-- results/feedbacks tables into compressed tables partitioned by session.
+-- Partitioned InnoDB tables cannot carry foreign keys, so integrity is checked
+-- while rows are still live.
+CREATE TABLE archived_sessions (
+    session VARCHAR(10) PRIMARY KEY,
+    results_archived INT NOT NULL DEFAULT 0,
+    feedbacks_archived INT NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE results_archive (
+    id INT NOT NULL,
+    student_id VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    score DECIMAL(5,2) NOT NULL,
+    grade CHAR(2),
+    session VARCHAR(10) NOT NULL,
+    semester VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    PRIMARY KEY (id, session),
+    KEY idx_results_archive_student (student_id),
+    KEY idx_results_archive_course (course_id)
+) ROW_FORMAT=COMPRESSED
+PARTITION BY LIST COLUMNS (session) (
+    PARTITION p_initial VALUES IN ('')
+);
+
+CREATE TABLE feedbacks_archive (
+    id VARCHAR(50) NOT NULL,
+    student_id VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    lecturer_id VARCHAR(20) NOT NULL,
+    rating INT NOT NULL,
+    comment TEXT,
+    semester VARCHAR(10) NOT NULL,
+    session VARCHAR(10) NOT NULL,
+    sentiment_label ENUM('positive', 'neutral', 'negative') NULL,
+    sentiment_score DECIMAL(6,2) NULL,
+    sentiment_confidence DECIMAL(4,3) NULL,
+    sentiment_engine ENUM('lexicon', 'model') NULL,
+    sentiment_analyzed_at TIMESTAMP NULL,
+    created_at TIMESTAMP NULL,
+    PRIMARY KEY (id, session),
+    KEY idx_feedbacks_archive_lecturer (lecturer_id),
+    KEY idx_feedbacks_archive_course (course_id)
+) ROW_FORMAT=COMPRESSED
+PARTITION BY LIST COLUMNS (session) (
+    PARTITION p_initial VALUES IN ('')
+);
+
 -- Lecturer courses pivot table (many-to-many)
 CREATE TABLE lecturer_courses (
     lecturer_id VARCHAR(20) NOT NULL,
@@ -78,17 +140,151 @@ CREATE TABLE lecturer_courses (
     FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
 );
 
+-- Background jobs (see job_queue.py)
+CREATE TABLE jobs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job_type VARCHAR(50) NOT NULL,
+    payload TEXT,
+    status ENUM('queued', 'running', 'succeeded', 'failed') NOT NULL DEFAULT 'queued',
+    priority INT NOT NULL DEFAULT 50,
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    progress DECIMAL(5,2) NOT NULL DEFAULT 0,
+    progress_message VARCHAR(255),
+    result MEDIUMTEXT,
+    error TEXT,
+    created_by VARCHAR(20),
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP NULL,
+    run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL
+);
+
+-- Rendered lecturer reports (see reports.py)
+CREATE TABLE report_artifacts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    lecturer_id VARCHAR(20) NOT NULL,
+    report_type VARCHAR(20) NOT NULL,
+    session_key VARCHAR(10) NOT NULL DEFAULT 'all',
+    format VARCHAR(10) NOT NULL,
+    data_version CHAR(40) NOT NULL,
+    file_path VARCHAR(255) NOT NULL,
+    row_count INT NOT NULL DEFAULT 0,
+    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (lecturer_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_artifact (lecturer_id, report_type, session_key, format)
+);
+
+-- Cached score distribution per class (see grade_stats.py). version is bumped
+-- whenever a result in the class changes; the row is current while
+-- computed_version = version.
+CREATE TABLE course_grade_stats (
+    course_id INT NOT NULL,
+    session VARCHAR(10) NOT NULL,
+    semester VARCHAR(10) NOT NULL,
+    version INT NOT NULL DEFAULT 0,
+    computed_version INT NULL,
+    student_count INT NOT NULL DEFAULT 0,
+    mean_score DECIMAL(5,2),
+    stddev DECIMAL(5,2),
+    pass_rate DECIMAL(4,1),
+    histogram TEXT,
+    quantiles TEXT,
+    scores MEDIUMTEXT,
+    computed_at TIMESTAMP NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (course_id, session, semester),
+    KEY idx_course_grade_stats_changed (changed_at),
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+);
+
+-- Running per-student totals for performance prediction (see feature_store.py),
+-- updated in the same transaction as each result write. GPA uses grade
+-- points on a 4.0 scale; the primary department is where the student has
+-- taken the most units.
+CREATE TABLE student_features (
+    student_id VARCHAR(20) PRIMARY KEY,
+    result_count INT NOT NULL DEFAULT 0,
+    score_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    units INT NOT NULL DEFAULT 0,
+    grade_point_units DECIMAL(12,2) NOT NULL DEFAULT 0,
+    primary_department_id INT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE student_department_units (
+    student_id VARCHAR(20) NOT NULL,
+    department_id INT NOT NULL,
+    units INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, department_id)
+);
+
+CREATE TABLE department_stats (
+    department_id INT PRIMARY KEY,
+    result_count INT NOT NULL DEFAULT 0,
+    score_sum DECIMAL(14,2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (department_id) REFERENCES departments(id) ON DELETE CASCADE
+);
+
+-- Feedback counts per day, week (bucket = Monday) and semester for each course
+-- and lecturer (see feedback_rollups.py). Updated in the transactions that
+-- insert and score feedback; neutral = feedback_count - positive - negative.
+CREATE TABLE feedback_rollups (
+    granularity ENUM('day', 'week', 'semester') NOT NULL,
+    bucket VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    lecturer_id VARCHAR(20) NOT NULL,
+    feedback_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    positive_count INT NOT NULL DEFAULT 0,
+    negative_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket, course_id, lecturer_id)
+);
+
+-- Rows removed from results/feedbacks, for ?since= delta sync (see sync.py).
+-- Filled by the delete triggers below; reason is 'archived' when archive.py
+-- moves a row to the archive tables. Cascaded foreign key deletes do not fire
+-- triggers, so clients fall back to a full listing once their cursor expires.
+CREATE TABLE sync_tombstones (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity ENUM('result', 'feedback') NOT NULL,
+    row_id VARCHAR(50) NOT NULL,
+    student_id VARCHAR(20),
+    reason ENUM('deleted', 'archived') NOT NULL DEFAULT 'deleted',
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER trg_results_tombstone AFTER DELETE ON results FOR EACH ROW
+    INSERT INTO sync_tombstones (entity, row_id, student_id, reason)
+    VALUES ('result', OLD.id, OLD.student_id, IF(@archiving IS NULL, 'deleted', 'archived'));
+
+CREATE TRIGGER trg_feedbacks_tombstone AFTER DELETE ON feedbacks FOR EACH ROW
+    INSERT INTO sync_tombstones (entity, row_id, student_id, reason)
+    VALUES ('feedback', OLD.id, OLD.student_id, IF(@archiving IS NULL, 'deleted', 'archived'));
+
 -- Indexes for better performance
 CREATE INDEX idx_users_role ON users(role);
-CREATE INDEX idx_users_email ON users(email);
-CREATE INDEX idx_results_student ON results(student_id);
 CREATE INDEX idx_results_course ON results(course_id);
 CREATE INDEX idx_results_session_semester ON results(session, semester);
-CREATE INDEX idx_feedbacks_student ON feedbacks(student_id);
 CREATE INDEX idx_feedbacks_course ON feedbacks(course_id);
-CREATE INDEX idx_feedbacks_lecturer ON feedbacks(lecturer_id);
 CREATE INDEX idx_feedbacks_semester ON feedbacks(semester);
+CREATE INDEX idx_feedbacks_lecturer_created ON feedbacks(lecturer_id, created_at);
+CREATE INDEX idx_feedbacks_updated ON feedbacks(updated_at);
+CREATE INDEX idx_results_student_updated ON results(student_id, updated_at);
+CREATE INDEX idx_tombstones_entity_deleted ON sync_tombstones(entity, deleted_at);
+CREATE INDEX idx_rollups_lecturer ON feedback_rollups(lecturer_id, granularity, bucket);
+CREATE INDEX idx_rollups_course ON feedback_rollups(course_id, granularity, bucket);
 CREATE INDEX idx_courses_department ON courses(department_id);
+CREATE INDEX idx_jobs_claim ON jobs(status, priority, id);
+CREATE INDEX idx_jobs_created_by ON jobs(created_by);
 
 -- Sample data insertion
 -- Departments
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Live Events
+Server-sent events telling clients when their results or feedback change.
+An asyncio server on its own port holds the (mostly idle) connections on a
+single thread; API handlers publish to per-user and per-role channels.
+"""
+
+import os
+import json
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+EVENTS_HOST = os.getenv('EVENTS_HOST', '0.0.0.0')
+EVENTS_PORT = int(os.getenv('EVENTS_PORT', '5001'))
+EVENTS_PUBLIC_URL = os.getenv('EVENTS_PUBLIC_URL', f"http://localhost:{EVENTS_PORT}/events")
+
+# Connection tokens are checked once, when the stream opens
+TOKEN_MAX_AGE = 24 * 60 * 60
+
+# Comment lines sent on idle streams so proxies keep them open and dead clients are noticed
+HEARTBEAT_INTERVAL = 25
+
+# Undelivered events kept per client; a client further behind loses the oldest ones
+CLIENT_QUEUE_SIZE = 100
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def role_channel(role: str) -> str:
+    return f"role:{role}"
+
+class EventServer:
+    """SSE endpoint plus the in-process pub/sub feeding it"""
+
+    def __init__(self, secret_key: str, host: str = EVENTS_HOST, port: int = EVENTS_PORT):
+        self.serializer = URLSafeTimedSerializer(secret_key, salt='intellgrade-events')
+        self.host = host
+        self.port = port
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.connections = 0
+        self._started = threading.Event()
+        self._thread = None
+
+    # Tokens
+
+    def issue_token(self, user_id: str, role: str) -> str:
+        return self.serializer.dumps({'user_id': user_id, 'role': role})
+
+    def _identity(self, token: str) -> Optional[Dict[str, str]]:
+        try:
+            return self.serializer.loads(token, max_age=TOKEN_MAX_AGE)
+        except BadSignature:
+            return None
+
+    # Publishing (any thread)
+
+    def publish(self, channels: Iterable[str], event: str, data: Optional[Dict] = None):
+        """Queue an event for every client subscribed to any of the channels"""
+        if self.loop is None:
+            return
+        message = f"event: {event}\ndata: {json.dumps(data or {}, default=str)}\n\n".encode('utf-8')
+        self.loop.call_soon_threadsafe(self._dispatch, list(channels), message)
+
+    def _dispatch(self, channels: List[str], message: bytes):
+        queues = set()
+        for channel in channels:
+            queues.update(self.subscribers.get(channel, ()))
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    # Serving (event loop thread)
+
+    def start(self) -> bool:
+        """Start the server thread once; False if the port could not be bound"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='event-server', daemon=True)
+            self._thread.start()
+            self._started.wait(5)
+        return self.loop is not None
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port, backlog=1024))
+        except OSError as e:
+            print(f"⚠️  Event server not started on port {self.port}: {e}")
+            self._started.set()
+            return
+        self.loop = loop
+        self._started.set()
+        print(f"📡 Live events: http://{self.host}:{self.port}/events")
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        queue = None
+        channels = []
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 10)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 10)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            method, target = request_line.decode('latin-1').split(' ')[:2]
+            origin = headers.get('origin', '*')
+            url = urlsplit(target)
+            if url.path != '/events' or method not in ('GET', 'OPTIONS'):
+                await self._reply(writer, '404 Not Found', origin)
+                return
+            if method == 'OPTIONS':
+                await self._reply(writer, '204 No Content', origin)
+                return
+
+            identity = self._identity(parse_qs(url.query).get('token', [''])[0])
+            if identity is None:
+                await self._reply(writer, '401 Unauthorized', origin)
+                return
+
+            writer.write((
+                "HTTP/1.1 200 OK\r\n"
+                "Content-Type: text/event-stream\r\n"
+                "Cache-Control: no-cache\r\n"
+                "Connection: keep-alive\r\n"
+                f"Access-Control-Allow-Origin: {origin}\r\n"
+                "X-Accel-Buffering: no\r\n"
+                "\r\n"
+                "retry: 5000\n"
+                "event: ready\ndata: {}\n\n"
+            ).encode('latin-1'))
+            await writer.drain()
+
+            queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+            channels = [user_channel(identity['user_id']), role_channel(identity['role'])]
+            for channel in channels:
+                self.subscribers.setdefault(channel, set()).add(queue)
+            self.connections += 1
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    message = b": ping\n\n"
+                writer.write(message)
+                await writer.drain()
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            if queue is not None:
+                self.connections -= 1
+                for channel in channels:
+                    subscribers = self.subscribers.get(channel)
+                    if subscribers is not None:
+                        subscribers.discard(queue)
+                        if not subscribers:
+                            del self.subscribers[channel]
+            writer.close()
+
+    async def _reply(self, writer: asyncio.StreamWriter, status: str, origin: str):
+        writer.write((
+            f"HTTP/1.1 {status}\r\n"
+            f"Access-Control-Allow-Origin: {origin}\r\n"
+            "Access-Control-Allow-Methods: GET\r\n"
+            "Content-Length: 0\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+        ).encode('latin-1'))
+        await writer.drain()
+
+_server: Optional[EventServer] = None
+_server_lock = threading.Lock()
+
+def get_event_server(secret_key: str) -> EventServer:
+    """The process-wide event server, started on first use"""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = EventServer(secret_key)
+                _server.start()
+    return _server
+
+def publish(channels: Iterable[str], event: str, data: Optional[Dict] = None):
+    """Notify subscribers; a no-op until the event server has been started"""
+    if _server is not None:
+        _server.publish(channels, event, data)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Feature Store
+Per-student and per-department running totals, updated with every result
+write, and a bulk loader that turns them into PerformancePredictor features
+"""
+
+import os
+import sys
+import argparse
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from archive import ALL_RESULTS
+from database import get_db_connection
+from grading import GRADE_POINTS, calculate_grade
+from job_queue import job_handler
+
+# Features the store can compute; the rest come from defaults
+STORED_FEATURES = ('previous_gpa', 'previous_course_performance', 'department_average')
+
+# Used for features the database has no data for, and for students without
+# results yet; the values are the centres of the predictor's training data
+DEFAULT_FEATURES = {
+    'previous_gpa': 3.0,
+    'attendance_rate': 0.8,
+    'assignment_completion': 0.75,
+    'midterm_score': 75.0,
+    'course_difficulty': 3,
+    'study_hours_per_week': 15.0,
+    'previous_course_performance': 75.0,
+    'department_average': 72.0
+}
+
+FeatureMatrix = namedtuple('FeatureMatrix', ['student_ids', 'feature_names', 'X', 'imputed'])
+
+GRADE_POINTS_SQL = "CASE r.grade {} ELSE 0 END".format(
+    ' '.join(f"WHEN '{grade}' THEN {points}" for grade, points in GRADE_POINTS.items()))
+
+def _points(score: float) -> float:
+    return GRADE_POINTS[calculate_grade(score)]
+
+def record_result(cursor, student_id: str, course_id: int, score: float, old_score: Optional[float] = None):
+    """
+    Apply one result write to the running totals
+
+    Call in the transaction that inserts the result (old_score None) or
+    changes its score. Totals only ever move by deltas, so concurrent writes
+    for the same student or department cannot lose each other's updates.
+    """
+    cursor.execute("SELECT department_id, unit FROM courses WHERE id = %s", (course_id,))
+    department_id, unit = cursor.fetchone()
+
+    score = float(score)
+    added = 1 if old_score is None else 0
+    score_delta = score - float(old_score or 0)
+    points_delta = (_points(score) - (_points(float(old_score)) if old_score is not None else 0)) * unit
+
+    cursor.execute("""
+        INSERT INTO student_features (student_id, result_count, score_sum, units, grade_point_units)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            result_count = result_count + VALUES(result_count),
+            score_sum = score_sum + VALUES(score_sum),
+            units = units + VALUES(units),
+            grade_point_units = grade_point_units + VALUES(grade_point_units)
+    """, (student_id, added, score_delta, unit * added, points_delta))
+    cursor.execute("""
+        INSERT INTO department_stats (department_id, result_count, score_sum) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE result_count = result_count + VALUES(result_count),
+                                score_sum = score_sum + VALUES(score_sum)
+    """, (department_id, added, score_delta))
+
+    if added:
+        cursor.execute("""
+            INSERT INTO student_department_units (student_id, department_id, units) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE units = units + VALUES(units)
+        """, (student_id, department_id, unit))
+        # The department the student has taken the most units in
+        cursor.execute("""
+            UPDATE student_features SET primary_department_id = (
+                SELECT department_id FROM student_department_units
+                WHERE student_id = %s ORDER BY units DESC, department_id LIMIT 1
+            )
+            WHERE student_id = %s
+        """, (student_id, student_id))
+
+def rebuild(conn) -> int:
+    """Recompute every total from live and archived results"""
+    cursor = conn.cursor()
+    conn.start_transaction()
+    try:
+        cursor.execute("DELETE FROM student_features")
+        cursor.execute("DELETE FROM student_department_units")
+        cursor.execute("DELETE FROM department_stats")
+        cursor.execute(f"""
+            INSERT INTO student_features (student_id, result_count, score_sum, units, grade_point_units)
+            SELECT r.student_id, COUNT(*), SUM(r.score), SUM(c.unit), SUM(({GRADE_POINTS_SQL}) * c.unit)
+            FROM {ALL_RESULTS} r
+            JOIN courses c ON c.id = r.course_id
+            GROUP BY r.student_id
+        """)
+        cursor.execute(f"""
+            INSERT INTO student_department_units (student_id, department_id, units)
+            SELECT r.student_id, c.department_id, SUM(c.unit)
+            FROM {ALL_RESULTS} r
+            JOIN courses c ON c.id = r.course_id
+            GROUP BY r.student_id, c.department_id
+        """)
+        cursor.execute("""
+            UPDATE student_features sf SET primary_department_id = (
+                SELECT department_id FROM student_department_units sdu
+                WHERE sdu.student_id = sf.student_id ORDER BY units DESC, department_id LIMIT 1
+            )
+        """)
+        cursor.execute(f"""
+            INSERT INTO department_stats (department_id, result_count, score_sum)
+            SELECT c.department_id, COUNT(*), SUM(r.score)
+            FROM {ALL_RESULTS} r
+            JOIN courses c ON c.id = r.course_id
+            GROUP BY c.department_id
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    cursor.execute("SELECT COUNT(*) FROM student_features")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+def load_feature_matrix(conn, feature_names: List[str], student_ids: Optional[List[str]] = None,
+                        session_year: Optional[str] = None, course_id: Optional[int] = None,
+                        defaults: Optional[Dict[str, float]] = None) -> FeatureMatrix:
+    """
+    Features for a cohort as one row per student, columns in feature_names order
+
+    The cohort is the given students, narrowed (or, without student_ids,
+    selected) by having a result in the session and/or course. One query
+    reads the stored totals; the features are derived with array operations.
+    Values the store cannot provide come from defaults (DEFAULT_FEATURES
+    unless overridden) and are flagged in the imputed mask.
+    """
+    defaults = {**DEFAULT_FEATURES, **(defaults or {})}
+    missing = [name for name in feature_names if name not in defaults and name not in STORED_FEATURES]
+    if missing:
+        raise ValueError(f"No source or default for features: {', '.join(missing)}")
+
+    filters = ["u.role = 'student'"]
+    params = []
+    if student_ids is not None:
+        if not student_ids:
+            return FeatureMatrix([], list(feature_names), np.empty((0, len(feature_names))),
+                                 np.empty((0, len(feature_names)), dtype=bool))
+        filters.append(f"u.id IN ({', '.join(['%s'] * len(student_ids))})")
+        params.extend(student_ids)
+    cohort = []
+    if session_year:
+        cohort.append("r.session = %s")
+        params.append(session_year)
+    if course_id is not None:
+        cohort.append("r.course_id = %s")
+        params.append(course_id)
+    if cohort:
+        filters.append(f"u.id IN (SELECT r.student_id FROM {ALL_RESULTS} r WHERE {' AND '.join(cohort)})")
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT u.id, sf.result_count, sf.score_sum, sf.units, sf.grade_point_units,
+               ds.result_count, ds.score_sum
+        FROM users u
+        LEFT JOIN student_features sf ON sf.student_id = u.id
+        LEFT JOIN department_stats ds ON ds.department_id = sf.primary_department_id
+        WHERE {' AND '.join(filters)}
+        ORDER BY u.id
+    """, tuple(params))
+    rows = cursor.fetchall()
+    cursor.close()
+
+    ids = [row[0] for row in rows]
+    # None (no totals yet) becomes NaN, and 0/0 below stays NaN
+    totals = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), 6)
+    result_count, score_sum, units, grade_point_units, department_count, department_sum = totals.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stored = {
+            'previous_gpa': grade_point_units / units,
+            'previous_course_performance': score_sum / result_count,
+            'department_average': department_sum / department_count
+        }
+
+    X = np.empty((len(rows), len(feature_names)))
+    imputed = np.zeros(X.shape, dtype=bool)
+    for column, name in enumerate(feature_names):
+        values = stored.get(name)
+        if values is None:
+            X[:, column] = defaults[name]
+            imputed[:, column] = True
+        else:
+            unknown = ~np.isfinite(values)
+            X[:, column] = np.where(unknown, defaults.get(name, np.nan), values)
+            imputed[:, column] = unknown
+    return FeatureMatrix(ids, list(feature_names), X, imputed)
+
+_predictor = None
+
+def get_predictor():
+    """The performance predictor, loaded (or trained) once per process"""
+    global _predictor
+    if _predictor is None:
+        from performance_prediction import DEFAULT_MODEL_PATH, PerformancePredictor
+        # Prefer the model chosen by model_selection.py when one has been saved
+        _predictor = PerformancePredictor(DEFAULT_MODEL_PATH if os.path.exists(DEFAULT_MODEL_PATH) else None)
+    return _predictor
+
+def warm_up():
+    """Load the predictor and score one student so the first job does not pay for it"""
+    predictor = get_predictor()
+    predictor.predict_matrix([[DEFAULT_FEATURES.get(name, 0.0) for name in predictor.feature_names]])
+
+@job_handler('features.rebuild')
+def rebuild_job(ctx):
+    """Recompute the feature store on a worker"""
+    return {'students': rebuild(ctx.conn)}
+
+@job_handler('predictions.cohort')
+def predict_cohort_job(ctx):
+    """Predict performance for a cohort (student_ids, session and/or course_id) from stored features"""
+    predictor = get_predictor()
+    features = load_feature_matrix(ctx.conn, predictor.feature_names,
+                                   student_ids=ctx.payload.get('student_ids'),
+                                   session_year=ctx.payload.get('session'),
+                                   course_id=ctx.payload.get('course_id'))
+    ctx.set_progress(50)
+
+    predictions = predictor.predict_matrix(features.X)
+    return {
+        'summary': predictions.summary(),
+        # Per-student contributions, one list per feature in student_id order
+        'explanations': predictor.explain_batch(features.X),
+        'imputed_features': [name for column, name in enumerate(features.feature_names)
+                             if features.imputed[:, column].all()],
+        'predictions': predictions.records(features.student_ids)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Maintain the student feature store')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute all totals from results')
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        sys.exit(0)
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    print("🧮 Rebuilding student features...")
+    print(f"✅ Features stored for {rebuild(conn)} students")
+    conn.close()
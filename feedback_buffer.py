@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Feedback Buffer
+Write-behind ingestion for feedback submissions: requests append to a durable
+local SQLite queue and a background flusher moves them to MySQL in grouped
+multi-row transactions
+"""
+
+import os
+import sys
+import time
+import uuid
+import atexit
+import sqlite3
+import secrets
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from database import get_db_connection
+from events import publish, role_channel, user_channel
+from feedback_rollups import record_feedbacks
+from job_queue import enqueue, PRIORITY_HIGH
+
+BUFFER_PATH = os.getenv('FEEDBACK_BUFFER_PATH',
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feedback_buffer.db'))
+
+# Seconds between flushes, and the most rows written to MySQL per transaction
+FLUSH_INTERVAL = float(os.getenv('FEEDBACK_FLUSH_INTERVAL', '1.0'))
+FLUSH_BATCH_SIZE = 500
+
+# Claimed rows whose flusher died are claimed again after this many seconds
+CLAIM_TIMEOUT = 60
+
+COLUMNS = ('id', 'student_id', 'course_id', 'lecturer_id', 'rating', 'comment', 'semester', 'created_at')
+
+class DuplicateFeedback(Exception):
+    """The student already has feedback for this course, lecturer and semester waiting in the buffer"""
+
+def new_feedback_id(student_id: str) -> str:
+    """Feedback id that stays unique for several submissions by one student in the same second"""
+    return f"FB_{int(time.time())}_{student_id}_{secrets.token_hex(4)}"
+
+class FeedbackBuffer:
+    """
+    Durable queue of accepted feedback submissions
+
+    Every process using the same file shares the queue; flushers claim rows
+    with a token so concurrent flushers never write the same rows. MySQL's
+    unique_feedback key makes a replayed flush (after a crash between the
+    MySQL commit and the local delete) a no-op, so feedback is neither lost
+    nor duplicated.
+    """
+
+    def __init__(self, path: str = BUFFER_PATH, resume: bool = True):
+        """
+        Args:
+            resume: Start the flusher right away if rows were left buffered by
+                an earlier process (a crash or restart)
+        """
+        self.path = path
+        self._local = threading.local()
+        self._flusher = None
+        self._lock = threading.Lock()
+        self.last_flush = None
+        self.last_error = None
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending_feedback (
+                id TEXT PRIMARY KEY,
+                student_id TEXT NOT NULL,
+                course_id INTEGER NOT NULL,
+                lecturer_id TEXT NOT NULL,
+                rating INTEGER NOT NULL,
+                comment TEXT,
+                semester TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                claim TEXT,
+                claimed_at REAL,
+                UNIQUE (student_id, course_id, lecturer_id, semester)
+            )
+        """)
+        if resume and self.pending()['pending']:
+            self._ensure_flusher()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One SQLite connection per thread, in WAL mode with fully synced commits"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            self._local.conn = conn
+        return conn
+
+    def submit(self, student_id: str, course_id: int, lecturer_id: str, rating: int,
+               comment: str, semester: str) -> str:
+        """
+        Durably accept a submission and return its feedback id
+
+        Raises:
+            DuplicateFeedback: the same feedback is already waiting to be flushed
+        """
+        feedback_id = new_feedback_id(student_id)
+        try:
+            self._conn().execute(
+                f"INSERT INTO pending_feedback ({', '.join(COLUMNS)}) VALUES ({', '.join(['?'] * len(COLUMNS))})",
+                (feedback_id, student_id, course_id, lecturer_id, rating, comment, semester,
+                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+        except sqlite3.IntegrityError:
+            raise DuplicateFeedback()
+
+        self._ensure_flusher()
+        return feedback_id
+
+    def pending(self) -> Dict[str, any]:
+        """Buffer depth and flusher health, for monitoring"""
+        count, oldest = self._conn().execute(
+            "SELECT COUNT(*), MIN(created_at) FROM pending_feedback").fetchone()
+        return {
+            'pending': count,
+            'oldest_pending': oldest,
+            'last_flush': self.last_flush,
+            'last_error': self.last_error
+        }
+
+    def _claim(self, batch_size: int) -> Tuple[str, List[tuple]]:
+        """Take up to batch_size unclaimed (or abandoned) rows"""
+        token = uuid.uuid4().hex
+        now = time.time()
+        conn = self._conn()
+        conn.execute("""
+            UPDATE pending_feedback SET claim = ?, claimed_at = ?
+            WHERE id IN (
+                SELECT id FROM pending_feedback
+                WHERE claim IS NULL OR claimed_at < ?
+                ORDER BY rowid
+                LIMIT ?
+            )
+        """, (token, now, now - CLAIM_TIMEOUT, batch_size))
+        rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM pending_feedback WHERE claim = ?",
+                            (token,)).fetchall()
+        return token, rows
+
+    def _release(self, token: str):
+        self._conn().execute("UPDATE pending_feedback SET claim = NULL, claimed_at = NULL WHERE claim = ?", (token,))
+
+    def flush_batch(self, batch_size: int = FLUSH_BATCH_SIZE) -> Optional[Dict[str, int]]:
+        """
+        Write one claimed batch to MySQL in a single transaction
+
+        Returns:
+            Counts of rows written and ignored, or None when the buffer is empty
+        """
+        token, rows = self._claim(batch_size)
+        if not rows:
+            return None
+
+        conn = get_db_connection()
+        if not conn:
+            self._release(token)
+            raise RuntimeError('Database connection failed')
+
+        try:
+            cursor = conn.cursor()
+            conn.start_transaction()
+            ids = [row[0] for row in rows]
+            id_list = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"SELECT id FROM feedbacks WHERE id IN ({id_list}) FOR UPDATE", tuple(ids))
+            existing = {row[0] for row in cursor.fetchall()}
+
+            # Rows already in MySQL (a replayed batch, or feedback submitted
+            # through another server) are skipped by the primary/unique keys
+            cursor.execute(f"""
+                INSERT IGNORE INTO feedbacks ({', '.join(COLUMNS)})
+                VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s)'] * len(rows))}
+            """, tuple(value for row in rows for value in row))
+
+            cursor.execute(f"SELECT id FROM feedbacks WHERE id IN ({id_list})", tuple(ids))
+            new_ids = [row[0] for row in cursor.fetchall() if row[0] not in existing]
+            inserted = len(new_ids)
+            record_feedbacks(cursor, new_ids)
+
+            cursor.execute(f"""
+                SELECT id FROM feedbacks
+                WHERE id IN ({id_list}) AND sentiment_analyzed_at IS NULL
+            """, tuple(ids))
+            unscored = [row[0] for row in cursor.fetchall()]
+            if unscored:
+                # Comment sentiment is scored by the job workers
+                enqueue('sentiment.score', {'feedback_ids': unscored}, priority=PRIORITY_HIGH, conn=conn)
+            conn.commit()
+            cursor.close()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(token)
+            raise
+        finally:
+            conn.close()
+
+        # Only forget the rows once MySQL has them
+        self._conn().execute("DELETE FROM pending_feedback WHERE claim = ?", (token,))
+
+        if inserted:
+            # Lets open lecturer and admin dashboards refresh their feedback views
+            for lecturer_id in {row[3] for row in rows}:
+                publish([user_channel(lecturer_id)], 'feedback')
+            publish([role_channel('admin')], 'feedback', {'count': inserted})
+        return {'written': inserted, 'ignored': len(rows) - inserted}
+
+    def flush(self) -> Dict[str, int]:
+        """Drain the buffer"""
+        totals = {'written': 0, 'ignored': 0}
+        while True:
+            counts = self.flush_batch()
+            if counts is None:
+                break
+            totals['written'] += counts['written']
+            totals['ignored'] += counts['ignored']
+        self.last_flush = datetime.now().isoformat()
+        return totals
+
+    def _ensure_flusher(self):
+        """Start the background flusher the first time this process has feedback to write"""
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name='feedback-flusher', daemon=True)
+                self._flusher.start()
+                atexit.register(self._flush_on_exit)
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+                self.last_error = None
+            except Exception as e:
+                # Rows stay buffered and are retried on the next interval
+                self.last_error = str(e)
+                print(f"⚠️  Feedback flush failed: {e}")
+
+    def _flush_on_exit(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️  {self.pending()['pending']} feedbacks left in {self.path}: {e}")
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+def get_buffer() -> FeedbackBuffer:
+    """The process-wide buffer"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = FeedbackBuffer()
+    return _buffer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Inspect or drain the feedback write-behind buffer')
+    parser.add_argument('--flush', action='store_true', help='Write all buffered feedback to MySQL')
+    args = parser.parse_args()
+
+    # Inspecting the buffer should not start a background flusher
+    buffer = FeedbackBuffer(resume=False)
+    print(f"📥 {buffer.pending()['pending']} feedbacks buffered in {buffer.path}")
+    if args.flush:
+        try:
+            counts = buffer.flush()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ {counts['written']} written, {counts['ignored']} already present")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Feedback Rollups
+Daily, weekly and per-semester rating and sentiment counts per course and
+lecturer, maintained incrementally as feedback is written and scored
+"""
+
+import sys
+import argparse
+from typing import Dict, List, Optional
+
+from database import get_db_connection
+from job_queue import job_handler
+
+GRANULARITIES = ('day', 'week', 'semester')
+
+# Bucket of a feedback row for each granularity; weeks start on Monday
+BUCKET = """
+    CASE g.granularity
+        WHEN 'day' THEN CAST(DATE(f.created_at) AS CHAR)
+        WHEN 'week' THEN CAST(DATE(f.created_at) - INTERVAL WEEKDAY(f.created_at) DAY AS CHAR)
+        ELSE f.semester
+    END
+"""
+
+GRANULARITY_ROWS = "(SELECT 'day' AS granularity UNION ALL SELECT 'week' UNION ALL SELECT 'semester')"
+
+# Same rule as SENTIMENT_AGGREGATES: the rating decides, the comment breaks 3-star ties
+POSITIVE = "CASE WHEN f.rating >= 4 OR (f.rating = 3 AND f.sentiment_label = 'positive') THEN 1 ELSE 0 END"
+NEGATIVE = "CASE WHEN f.rating <= 2 OR (f.rating = 3 AND f.sentiment_label = 'negative') THEN 1 ELSE 0 END"
+
+COUNT_COLUMNS = ('feedback_count', 'rating_sum', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5',
+                 'positive_count', 'negative_count')
+
+def _upsert(source: str, condition: str) -> str:
+    """Add the counts of the matching feedback rows to every granularity's buckets"""
+    return f"""
+        INSERT INTO feedback_rollups (granularity, bucket, course_id, lecturer_id, {', '.join(COUNT_COLUMNS)})
+        SELECT g.granularity, {BUCKET} AS bucket, f.course_id, f.lecturer_id,
+               COUNT(*), SUM(f.rating),
+               SUM(f.rating = 1), SUM(f.rating = 2), SUM(f.rating = 3), SUM(f.rating = 4), SUM(f.rating = 5),
+               SUM({POSITIVE}), SUM({NEGATIVE})
+        FROM {source} f
+        CROSS JOIN {GRANULARITY_ROWS} g
+        WHERE {condition}
+        GROUP BY g.granularity, bucket, f.course_id, f.lecturer_id
+        ON DUPLICATE KEY UPDATE
+            {', '.join(f'{column} = {column} + VALUES({column})' for column in COUNT_COLUMNS)}
+    """
+
+def record_feedbacks(cursor, feedback_ids: List[str]):
+    """Count newly inserted feedbacks; call in the transaction that inserted them"""
+    if feedback_ids:
+        cursor.execute(_upsert('feedbacks', f"f.id IN ({', '.join(['%s'] * len(feedback_ids))})"),
+                       tuple(feedback_ids))
+
+def record_sentiment(cursor, feedback_ids: List[str]):
+    """
+    Move newly labelled 3-star feedbacks out of neutral
+
+    Call in the transaction that stored the labels, with only the rows that
+    were unlabelled before it; other ratings do not depend on the label.
+    """
+    if not feedback_ids:
+        return
+    cursor.execute(f"""
+        INSERT INTO feedback_rollups (granularity, bucket, course_id, lecturer_id, positive_count, negative_count)
+        SELECT g.granularity, {BUCKET} AS bucket, f.course_id, f.lecturer_id,
+               SUM(f.sentiment_label = 'positive'), SUM(f.sentiment_label = 'negative')
+        FROM feedbacks f
+        CROSS JOIN {GRANULARITY_ROWS} g
+        WHERE f.id IN ({', '.join(['%s'] * len(feedback_ids))}) AND f.rating = 3
+        GROUP BY g.granularity, bucket, f.course_id, f.lecturer_id
+        ON DUPLICATE KEY UPDATE
+            positive_count = positive_count + VALUES(positive_count),
+            negative_count = negative_count + VALUES(negative_count)
+    """, tuple(feedback_ids))
+
+def rebuild(conn) -> int:
+    """Recompute every rollup from live and archived feedback"""
+    cursor = conn.cursor()
+    conn.start_transaction()
+    try:
+        cursor.execute("DELETE FROM feedback_rollups")
+        cursor.execute(_upsert('feedbacks', '1 = 1'))
+        cursor.execute(_upsert('feedbacks_archive', '1 = 1'))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    cursor.execute("SELECT COUNT(*) FROM feedback_rollups")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+def trend(cursor, granularity: str, start: Optional[str] = None, end: Optional[str] = None,
+          course_id: Optional[int] = None, lecturer_id: Optional[str] = None) -> List[Dict[str, any]]:
+    """
+    Rating and sentiment series, one point per bucket
+
+    Buckets are dates (YYYY-MM-DD, weeks by their Monday) or semesters; start
+    and end are inclusive bounds in the same form. Points carry total,
+    positive and negative counts in the shape sentiment_summary() expects.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularity must be one of {', '.join(GRANULARITIES)}")
+
+    filters = ['granularity = %s']
+    params = [granularity]
+    for condition, value in (('bucket >= %s', start), ('bucket <= %s', end),
+                             ('course_id = %s', course_id), ('lecturer_id = %s', lecturer_id)):
+        if value is not None:
+            filters.append(condition)
+            params.append(value)
+
+    cursor.execute(f"""
+        SELECT bucket, {', '.join(f'SUM({column}) AS {column}' for column in COUNT_COLUMNS)}
+        FROM feedback_rollups
+        WHERE {' AND '.join(filters)}
+        GROUP BY bucket
+        ORDER BY bucket
+    """, tuple(params))
+
+    series = []
+    for row in cursor.fetchall():
+        bucket, total, rating_sum, *ratings, positive, negative = row
+        series.append({
+            'bucket': bucket,
+            'total': int(total),
+            'average_rating': round(float(rating_sum) / int(total), 2) if total else 0,
+            'ratings': {str(stars): int(count) for stars, count in enumerate(ratings, start=1)},
+            'positive': int(positive),
+            'negative': int(negative)
+        })
+    return series
+
+@job_handler('rollups.rebuild')
+def rebuild_job(ctx):
+    """Recompute feedback rollups on a worker"""
+    return {'rollup_rows': rebuild(ctx.conn)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Maintain feedback rollups')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute all rollups from feedback')
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        sys.exit(0)
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    print("📈 Rebuilding feedback rollups...")
+    print(f"✅ {rebuild(conn)} rollup rows")
+    conn.close()
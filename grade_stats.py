@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Class Statistics
+Per-(course, session, semester) score distributions and percentile ranks,
+cached in course_grade_stats and recomputed only when a class's results change
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from analytics import SCORE_BINS
+from archive import ALL_RESULTS
+from database import get_db_connection
+from grading import PASS_MARK
+
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+ClassKey = Tuple[int, str, str]
+
+def invalidate(cursor, course_id: int, session_year: str, semester: str):
+    """
+    Mark a class's statistics out of date
+
+    Bumping the version (rather than deleting the row) also stops a refresh
+    that started before this change from storing its now-stale result.
+    """
+    cursor.execute("""
+        INSERT INTO course_grade_stats (course_id, session, semester, version)
+        VALUES (%s, %s, %s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1, changed_at = CURRENT_TIMESTAMP
+    """, (course_id, session_year, semester))
+
+def compute_stats(scores: np.ndarray) -> Dict[str, any]:
+    """Distribution statistics of one class's scores"""
+    scores = np.sort(scores.astype(float))
+    counts, _ = np.histogram(scores, bins=SCORE_BINS)
+    return {
+        'student_count': int(scores.size),
+        'mean_score': round(float(scores.mean()), 2) if scores.size else 0,
+        'stddev': round(float(scores.std()), 2) if scores.size else 0,
+        'pass_rate': round(float((scores >= PASS_MARK).mean() * 100), 1) if scores.size else 0,
+        'histogram': counts.tolist(),
+        'quantiles': [round(float(q), 2) for q in np.quantile(scores, QUANTILES)] if scores.size else [0] * len(QUANTILES),
+        'scores': scores.tolist()
+    }
+
+def percentile_ranks(sorted_scores: List[float], scores: Iterable[float]) -> np.ndarray:
+    """
+    Percentile rank of each score within a class
+
+    Ties count half, so the single top score of a class of four is the 87.5th
+    percentile and a class where everyone scored the same puts everyone at 50.
+    """
+    sorted_scores = np.asarray(sorted_scores, dtype=float)
+    scores = np.asarray(list(scores), dtype=float)
+    if not sorted_scores.size:
+        return np.zeros(scores.size)
+    below = np.searchsorted(sorted_scores, scores, side='left')
+    at_or_below = np.searchsorted(sorted_scores, scores, side='right')
+    return np.round((below + at_or_below) / 2 / sorted_scores.size * 100, 1)
+
+def _decode(row: Dict[str, any]) -> Dict[str, any]:
+    return {
+        'course_id': row['course_id'],
+        'session': row['session'],
+        'semester': row['semester'],
+        'student_count': row['student_count'],
+        'mean_score': float(row['mean_score']),
+        'stddev': float(row['stddev']),
+        'pass_rate': float(row['pass_rate']),
+        'histogram': json.loads(row['histogram']),
+        'quantiles': json.loads(row['quantiles']),
+        'scores': json.loads(row['scores'])
+    }
+
+def _key_filter(keys: List[ClassKey]) -> str:
+    return f"(course_id, session, semester) IN ({', '.join(['(%s, %s, %s)'] * len(keys))})"
+
+def refresh(conn, keys: List[ClassKey]) -> Dict[ClassKey, Dict[str, any]]:
+    """Recompute statistics for the given classes with one scan and store them"""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    params = tuple(value for key in keys for value in key)
+
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO course_grade_stats (course_id, session, semester) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE course_id = course_id
+    """, keys)
+    cursor.execute(f"SELECT course_id, session, semester, version FROM course_grade_stats WHERE {_key_filter(keys)}",
+                   params)
+    versions = {(row[0], row[1], row[2]): row[3] for row in cursor.fetchall()}
+
+    cursor.execute(f"""
+        SELECT course_id, session, semester, score FROM {ALL_RESULTS} r
+        WHERE {_key_filter(keys)}
+    """, params)
+    scores = {key: [] for key in keys}
+    for course_id, session_year, semester, score in cursor.fetchall():
+        scores[(course_id, session_year, semester)].append(score)
+
+    refreshed = {}
+    for key in keys:
+        stats = compute_stats(np.array(scores[key], dtype=float))
+        # Only store the result if no write invalidated the class meanwhile
+        cursor.execute("""
+            UPDATE course_grade_stats
+            SET student_count = %s, mean_score = %s, stddev = %s, pass_rate = %s,
+                histogram = %s, quantiles = %s, scores = %s,
+                computed_version = version, computed_at = CURRENT_TIMESTAMP
+            WHERE course_id = %s AND session = %s AND semester = %s AND version = %s
+        """, (stats['student_count'], stats['mean_score'], stats['stddev'], stats['pass_rate'],
+              json.dumps(stats['histogram']), json.dumps(stats['quantiles']), json.dumps(stats['scores']),
+              *key, versions[key]))
+        refreshed[key] = {'course_id': key[0], 'session': key[1], 'semester': key[2], **stats}
+    cursor.close()
+    return refreshed
+
+def get_class_stats(conn, keys: List[ClassKey]) -> Dict[ClassKey, Dict[str, any]]:
+    """
+    Statistics for each class, from the cache where it is current
+
+    Missing or out-of-date classes are recomputed on the primary so a lagging
+    replica never gets cached as the truth.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT * FROM course_grade_stats
+        WHERE {_key_filter(keys)} AND computed_version = version
+    """, tuple(value for key in keys for value in key))
+    stats = {(row['course_id'], row['session'], row['semester']): _decode(row) for row in cursor.fetchall()}
+    cursor.close()
+
+    missing = [key for key in keys if key not in stats]
+    if missing:
+        primary = get_db_connection()
+        if not primary:
+            raise RuntimeError('Database connection failed')
+        try:
+            stats.update(refresh(primary, missing))
+        finally:
+            primary.close()
+    return stats
+
+def public_stats(stats: Dict[str, any]) -> Dict[str, any]:
+    """Class statistics without the raw score list, for API responses"""
+    return {
+        'student_count': stats['student_count'],
+        'mean_score': stats['mean_score'],
+        'stddev': stats['stddev'],
+        'pass_rate': stats['pass_rate'],
+        'histogram': [{'from': SCORE_BINS[i], 'to': SCORE_BINS[i + 1], 'count': count}
+                      for i, count in enumerate(stats['histogram'])],
+        'quantiles': dict(zip(['p10', 'p25', 'p50', 'p75', 'p90'], stats['quantiles']))
+    }
+
+def annotate_results(conn, results: List[Dict[str, any]]) -> List[Dict[str, any]]:
+    """Add percentile rank and class statistics to a student's result rows"""
+    keys = [(result['course_id'], result['session'], result['semester']) for result in results]
+    stats = get_class_stats(conn, keys)
+    for result, key in zip(results, keys):
+        class_stats = stats.get(key)
+        if class_stats is None:
+            continue
+        result['percentile'] = float(percentile_ranks(class_stats['scores'], [result['score']])[0])
+        result['class_stats'] = public_stats(class_stats)
+    return results
+
+def course_stats(conn, course_id: int, session_year: Optional[str] = None,
+                 semester: Optional[str] = None) -> List[Dict[str, any]]:
+    """Statistics for every class of a course, optionally narrowed to a session/semester"""
+    filters = ['course_id = %s']
+    params = [course_id]
+    if session_year:
+        filters.append('session = %s')
+        params.append(session_year)
+    if semester:
+        filters.append('semester = %s')
+        params.append(semester)
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT DISTINCT course_id, session, semester FROM {ALL_RESULTS} r
+        WHERE {' AND '.join(filters)}
+        ORDER BY session DESC, semester DESC
+    """, tuple(params))
+    keys = [tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+
+    stats = get_class_stats(conn, keys)
+    return [{'session': key[1], 'semester': key[2], **public_stats(stats[key])} for key in keys]
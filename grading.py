@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Grading
+Score-to-grade conversion and bulk regrade jobs
+"""
+
+from job_queue import job_handler
+
+# Lowest passing score (anything below is an F)
+PASS_MARK = 40
+
+# Grade points on a 4.0 scale, for GPA features
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0, 'F': 0.0
+}
+
+def calculate_grade(score):
+    """Calculate grade based on score"""
+    if score >= 90: return 'A+'
+    elif score >= 85: return 'A'
+    elif score >= 80: return 'A-'
+    elif score >= 75: return 'B+'
+    elif score >= 70: return 'B'
+    elif score >= 65: return 'B-'
+    elif score >= 60: return 'C+'
+    elif score >= 55: return 'C'
+    elif score >= 50: return 'C-'
+    elif score >= 45: return 'D+'
+    elif score >= PASS_MARK: return 'D'
+    else: return 'F'
+
+@job_handler('results.regrade')
+def regrade_job(ctx):
+    """Recompute stored grades from scores, optionally for one course/session/semester"""
+    filters = []
+    params = []
+    for field in ('course_id', 'session', 'semester'):
+        if ctx.payload.get(field) is not None:
+            filters.append(f"{field} = %s")
+            params.append(ctx.payload[field])
+    where = f"WHERE {' AND '.join(filters)}" if filters else ''
+
+    cursor = ctx.conn.cursor()
+    cursor.execute(f"SELECT id, score, grade FROM results {where}", tuple(params))
+    rows = cursor.fetchall()
+
+    changes = []
+    for result_id, score, grade in rows:
+        new_grade = calculate_grade(score)
+        if new_grade != grade:
+            changes.append((new_grade, result_id))
+
+    batch_size = 500
+    for start in range(0, len(changes), batch_size):
+        ctx.conn.start_transaction()
+        cursor.executemany("UPDATE results SET grade = %s WHERE id = %s", changes[start:start + batch_size])
+        ctx.conn.commit()
+        ctx.set_progress((start + batch_size) / len(changes) * 100)
+
+    cursor.close()
+    if changes:
+        # GPA features are built from the stored grades
+        ctx.enqueue('features.rebuild', {})
+    return {'checked': len(rows), 'regraded': len(changes)}
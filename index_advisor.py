@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Index Advisor
+Takes the statement shapes the server has actually run for this database
+(performance_schema digests), EXPLAINs a sample of each, and reports plans
+that scan or merge indexes, plus indexes that are unused or redundant
+"""
+
+import sys
+import json
+import argparse
+from collections import defaultdict
+from typing import Dict, List
+
+import mysql.connector
+
+from database import get_db_connection
+
+# Plans reading at least this many rows without a usable index are reported
+MIN_SCAN_ROWS = 1000
+
+def reset_capture(conn):
+    """Start a fresh capture window: forget digests and index usage counted so far"""
+    cursor = conn.cursor()
+    cursor.execute("TRUNCATE TABLE performance_schema.events_statements_summary_by_digest")
+    cursor.execute("TRUNCATE TABLE performance_schema.table_io_waits_summary_by_index_usage")
+    cursor.close()
+
+def query_shapes(conn, limit: int = 50) -> List[Dict[str, any]]:
+    """
+    Statement shapes run against this database, most total time first
+
+    Literals are replaced by ? in digest_text; sample_text is one real
+    execution (MySQL 8.0.3+), which is what gets EXPLAINed.
+    """
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT DIGEST_TEXT AS digest_text, QUERY_SAMPLE_TEXT AS sample_text,
+               COUNT_STAR AS executions, ROUND(SUM_TIMER_WAIT / 1e9, 1) AS total_ms,
+               SUM_ROWS_EXAMINED AS rows_examined, SUM_ROWS_SENT AS rows_sent,
+               SUM_NO_INDEX_USED AS no_index_used
+        FROM performance_schema.events_statements_summary_by_digest
+        WHERE SCHEMA_NAME = DATABASE()
+          AND DIGEST_TEXT REGEXP '^(SELECT|UPDATE|DELETE|INSERT.*SELECT)'
+          AND DIGEST_TEXT NOT REGEXP 'performance_schema|information_schema|schema_migrations'
+        ORDER BY SUM_TIMER_WAIT DESC
+        LIMIT %s
+    """, (limit,))
+    shapes = cursor.fetchall()
+    cursor.close()
+    return shapes
+
+def plan_findings(plan: List[Dict[str, any]], min_rows: int = MIN_SCAN_ROWS) -> List[str]:
+    """Problems in an EXPLAIN result worth an index"""
+    findings = []
+    for step in plan:
+        table, access, rows = step.get('table'), step.get('type'), step.get('rows') or 0
+        extra = step.get('Extra') or ''
+        if access == 'ALL' and rows >= min_rows:
+            findings.append(f"full scan of {table} (~{rows} rows, possible keys: {step.get('possible_keys') or 'none'})")
+        elif access == 'index' and rows >= min_rows:
+            findings.append(f"full index scan of {table} via {step.get('key')} (~{rows} rows)")
+        elif access == 'index_merge':
+            findings.append(f"index merge on {table} ({step.get('key')}); one composite index or split lookups avoid it")
+        if 'Using filesort' in extra and rows >= min_rows:
+            findings.append(f"filesort on {table} (~{rows} rows)")
+        if 'Using temporary' in extra and rows >= min_rows:
+            findings.append(f"temporary table for {table} (~{rows} rows)")
+    return findings
+
+def explain_shapes(conn, shapes: List[Dict[str, any]], min_rows: int = MIN_SCAN_ROWS) -> List[Dict[str, any]]:
+    """Attach the EXPLAIN plan and findings to each shape that has a sample"""
+    cursor = conn.cursor(dictionary=True)
+    for shape in shapes:
+        shape['plan'], shape['findings'] = [], []
+        sample = shape.get('sample_text')
+        if not sample or sample.endswith('...'):
+            # Truncated by performance_schema_max_sql_text_length
+            shape['findings'].append('no complete sample to EXPLAIN')
+            continue
+        try:
+            cursor.execute(f"EXPLAIN {sample}")
+            shape['plan'] = cursor.fetchall()
+        except mysql.connector.Error as err:
+            shape['findings'].append(f"EXPLAIN failed: {err.msg}")
+            continue
+        shape['findings'] = plan_findings(shape['plan'], min_rows)
+    cursor.close()
+    return shapes
+
+def index_columns(conn) -> Dict[tuple, Dict[str, any]]:
+    """(table, index) -> columns in order and uniqueness, for every index in the database"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, NON_UNIQUE
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """)
+    indexes = {}
+    for table, index, column, non_unique in cursor.fetchall():
+        entry = indexes.setdefault((table, index), {'columns': [], 'unique': not non_unique})
+        entry['columns'].append(column)
+    cursor.close()
+    return indexes
+
+def redundant_indexes(indexes: Dict[tuple, Dict[str, any]]) -> List[Dict[str, any]]:
+    """Non-unique indexes whose columns are the leading columns of another index on the table"""
+    by_table = defaultdict(list)
+    for (table, index), entry in indexes.items():
+        by_table[table].append((index, entry))
+
+    redundant = []
+    for table, entries in by_table.items():
+        for index, entry in entries:
+            if entry['unique']:
+                continue
+            width = len(entry['columns'])
+            for other, other_entry in entries:
+                covers = other != index and other_entry['columns'][:width] == entry['columns']
+                # Of two identical non-unique indexes, report only one
+                if covers and (len(other_entry['columns']) > width or other_entry['unique'] or other < index):
+                    redundant.append({'table': table, 'index': index, 'columns': entry['columns'], 'covered_by': other})
+                    break
+    return redundant
+
+def unused_indexes(conn, indexes: Dict[tuple, Dict[str, any]]) -> List[Dict[str, any]]:
+    """Non-unique indexes with no reads or writes through them since the capture window began"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT OBJECT_NAME, INDEX_NAME
+        FROM performance_schema.table_io_waits_summary_by_index_usage
+        WHERE OBJECT_SCHEMA = DATABASE() AND INDEX_NAME IS NOT NULL AND INDEX_NAME <> 'PRIMARY'
+          AND COUNT_STAR = 0
+        ORDER BY OBJECT_NAME, INDEX_NAME
+    """)
+    rows = cursor.fetchall()
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+    """)
+    foreign_keys = set(cursor.fetchall())
+    cursor.close()
+
+    unused = []
+    for table, index in rows:
+        entry = indexes.get((table, index))
+        if not entry or entry['unique']:
+            continue
+        unused.append({
+            'table': table,
+            'index': index,
+            'columns': entry['columns'],
+            # Dropping it is refused unless another index starts with the column
+            'backs_foreign_key': (table, entry['columns'][0]) in foreign_keys
+        })
+    return unused
+
+def advise(conn, limit: int = 50, min_rows: int = MIN_SCAN_ROWS) -> Dict[str, List[Dict[str, any]]]:
+    """The full report: explained query shapes, unused and redundant indexes"""
+    indexes = index_columns(conn)
+    return {
+        'queries': explain_shapes(conn, query_shapes(conn, limit), min_rows),
+        'unused_indexes': unused_indexes(conn, indexes),
+        'redundant_indexes': redundant_indexes(indexes)
+    }
+
+def print_report(report: Dict[str, List[Dict[str, any]]]):
+    flagged = [shape for shape in report['queries'] if shape['findings']]
+    print(f"🔎 {len(report['queries'])} query shapes captured, {len(flagged)} with findings")
+    for shape in flagged:
+        print(f"\n   {shape['executions']}x, {shape['total_ms']} ms total, "
+              f"{shape['rows_examined']} rows examined for {shape['rows_sent']} sent")
+        print(f"   {' '.join(shape['digest_text'].split())[:160]}")
+        for finding in shape['findings']:
+            print(f"     ⚠️  {finding}")
+
+    print(f"\n🗑️  Unused indexes ({len(report['unused_indexes'])}):")
+    for entry in report['unused_indexes']:
+        note = ' (backs a foreign key)' if entry['backs_foreign_key'] else ''
+        print(f"   {entry['table']}.{entry['index']} ({', '.join(entry['columns'])}){note}")
+
+    print(f"\n♻️  Redundant indexes ({len(report['redundant_indexes'])}):")
+    for entry in report['redundant_indexes']:
+        print(f"   {entry['table']}.{entry['index']} ({', '.join(entry['columns'])}) "
+              f"is covered by {entry['covered_by']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Report missing and unused indexes from real query shapes')
+    parser.add_argument('--reset', action='store_true',
+                        help='Start a new capture window (exercise the API, then run again without --reset)')
+    parser.add_argument('--limit', type=int, default=50, help='Query shapes to examine, by total time')
+    parser.add_argument('--min-rows', type=int, default=MIN_SCAN_ROWS, help='Smallest scan worth reporting')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+
+    try:
+        if args.reset:
+            reset_capture(conn)
+            print("🧹 Capture window started; run the advisor again after exercising the API")
+        else:
+            report = advise(conn, args.limit, args.min_rows)
+            if args.json:
+                print(json.dumps(report, indent=2, default=str))
+            else:
+                print_report(report)
+    except mysql.connector.Error as err:
+        print(f"❌ {err} (the advisor needs performance_schema enabled and SELECT on it)")
+        sys.exit(1)
+    finally:
+        conn.close()
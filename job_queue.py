@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Job Queue
+Durable MySQL-backed queue for work that should not run inside API requests
+"""
+
+import os
+import json
+import time
+import socket
+from typing import Callable, Dict, List, Optional
+
+from database import get_db_connection
+
+# Lower numbers are claimed first
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 50
+PRIORITY_LOW = 100
+
+# Seconds before a failed job is retried, doubled on every attempt
+RETRY_BASE_DELAY = 30
+
+# Running jobs whose worker stopped reporting are requeued after this many seconds
+STALE_JOB_TIMEOUT = 15 * 60
+
+JOB_HANDLERS: Dict[str, Callable] = {}
+
+def job_handler(job_type: str):
+    """Register a function as the handler for a job type"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+class JobContext:
+    """Handed to job handlers: the claimed job plus the worker's connection"""
+
+    def __init__(self, conn, job: Dict[str, any]):
+        self.conn = conn
+        self.job = job
+        self.id = job['id']
+        self.payload = job['payload'] or {}
+
+    def set_progress(self, progress: float, message: Optional[str] = None):
+        """Record progress (0-100) so the status API can report it"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE jobs SET progress = %s, progress_message = %s, locked_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (round(min(100, max(0, progress)), 2), message, self.id))
+        cursor.close()
+
+    def enqueue(self, job_type: str, payload: Optional[Dict] = None, priority: Optional[int] = None) -> int:
+        """Queue a follow-up job on behalf of the same user"""
+        return enqueue(job_type, payload,
+                       priority=self.job['priority'] if priority is None else priority,
+                       created_by=self.job['created_by'], conn=self.conn)
+
+def _decode_job(job: Optional[Dict[str, any]]) -> Optional[Dict[str, any]]:
+    """Turn the JSON text columns of a job row back into Python objects"""
+    if job is None:
+        return None
+    for field in ('payload', 'result'):
+        if job.get(field):
+            job[field] = json.loads(job[field])
+    return job
+
+def enqueue(job_type: str, payload: Optional[Dict] = None, priority: int = PRIORITY_NORMAL,
+            max_attempts: int = 3, created_by: Optional[str] = None, conn=None) -> Optional[int]:
+    """
+    Add a job to the queue
+
+    Args:
+        job_type: Name a handler was registered under with @job_handler
+        payload: JSON-serializable arguments for the handler
+        priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        conn: Existing connection to reuse; a new one is opened otherwise
+
+    Returns:
+        The new job id, or None if the database is unavailable
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+        if not conn:
+            return None
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO jobs (job_type, payload, priority, max_attempts, created_by)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (job_type, json.dumps(payload or {}), priority, max_attempts, created_by))
+        job_id = cursor.lastrowid
+        cursor.close()
+        return job_id
+    finally:
+        if own_conn:
+            conn.close()
+
+def get_job(conn, job_id: int) -> Optional[Dict[str, any]]:
+    """Fetch a single job"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
+    job = cursor.fetchone()
+    cursor.close()
+    return _decode_job(job)
+
+def list_jobs(conn, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, any]]:
+    """List the most recent jobs, optionally filtered by status"""
+    cursor = conn.cursor(dictionary=True)
+    if status:
+        cursor.execute("SELECT * FROM jobs WHERE status = %s ORDER BY id DESC LIMIT %s", (status, limit))
+    else:
+        cursor.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT %s", (limit,))
+    jobs = cursor.fetchall()
+    cursor.close()
+    return [_decode_job(job) for job in jobs]
+
+def claim_job(conn, worker_id: str, job_types: Optional[List[str]] = None) -> Optional[Dict[str, any]]:
+    """Atomically take the next runnable job; concurrent workers skip each other's rows"""
+    type_filter = ''
+    params = []
+    if job_types:
+        type_filter = f"AND job_type IN ({', '.join(['%s'] * len(job_types))})"
+        params = list(job_types)
+
+    cursor = conn.cursor(dictionary=True)
+    conn.start_transaction()
+    try:
+        cursor.execute(f"""
+            SELECT * FROM jobs
+            WHERE status = 'queued' AND run_after <= CURRENT_TIMESTAMP {type_filter}
+            ORDER BY priority, id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """, tuple(params))
+        job = cursor.fetchone()
+
+        if job:
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1, locked_by = %s,
+                    locked_at = CURRENT_TIMESTAMP, started_at = COALESCE(started_at, CURRENT_TIMESTAMP)
+                WHERE id = %s
+            """, (worker_id, job['id']))
+            job['attempts'] += 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return _decode_job(job)
+
+def complete_job(conn, job_id: int, result: Optional[Dict] = None):
+    """Mark a job as finished successfully"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE jobs
+        SET status = 'succeeded', result = %s, error = NULL, progress = 100,
+            locked_by = NULL, finished_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+    """, (json.dumps(result) if result is not None else None, job_id))
+    cursor.close()
+
+def fail_job(conn, job: Dict[str, any], error: str):
+    """Schedule a retry with exponential backoff, or give up after max_attempts"""
+    cursor = conn.cursor()
+    if job['attempts'] < job['max_attempts']:
+        delay = RETRY_BASE_DELAY * (2 ** (job['attempts'] - 1))
+        cursor.execute("""
+            UPDATE jobs
+            SET status = 'queued', error = %s, locked_by = NULL,
+                run_after = CURRENT_TIMESTAMP + INTERVAL %s SECOND
+            WHERE id = %s
+        """, (error, delay, job['id']))
+    else:
+        cursor.execute("""
+            UPDATE jobs
+            SET status = 'failed', error = %s, locked_by = NULL, finished_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (error, job['id']))
+    cursor.close()
+
+def requeue_stale_jobs(conn, timeout: int = STALE_JOB_TIMEOUT) -> int:
+    """Return jobs held by crashed workers to the queue"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE jobs
+        SET status = IF(attempts < max_attempts, 'queued', 'failed'),
+            error = 'Worker stopped responding', locked_by = NULL
+        WHERE status = 'running' AND locked_at < CURRENT_TIMESTAMP - INTERVAL %s SECOND
+    """, (timeout,))
+    count = cursor.rowcount
+    cursor.close()
+    return count
+
+def execute_job(conn, job: Dict[str, any]):
+    """Run the handler for a claimed job and record the outcome"""
+    handler = JOB_HANDLERS.get(job['job_type'])
+    if handler is None:
+        job['attempts'] = job['max_attempts']
+        fail_job(conn, job, f"No handler registered for job type '{job['job_type']}'")
+        return
+
+    try:
+        result = handler(JobContext(conn, job))
+        complete_job(conn, job['id'], result)
+    except Exception as e:
+        print(f"❌ Job {job['id']} ({job['job_type']}) failed: {e}")
+        if conn.in_transaction:
+            conn.rollback()
+        fail_job(conn, job, str(e))
+
+def run_worker(worker_id: Optional[str] = None, job_types: Optional[List[str]] = None,
+               poll_interval: float = 1.0, stop_event=None):
+    """Claim and execute jobs until stop_event is set"""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    conn = None
+    last_stale_check = 0
+
+    while stop_event is None or not stop_event.is_set():
+        if conn is None or not conn.is_connected():
+            conn = get_db_connection()
+            if not conn:
+                time.sleep(poll_interval * 5)
+                continue
+
+        try:
+            if time.time() - last_stale_check > 60:
+                requeue_stale_jobs(conn)
+                last_stale_check = time.time()
+
+            job = claim_job(conn, worker_id, job_types)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+
+            execute_job(conn, job)
+        except Exception as e:
+            print(f"Worker {worker_id} error: {e}")
+            try:
+                conn.close()
+            except Exception:
+                pass
+            conn = None
+            time.sleep(poll_interval)
+
+    if conn:
+        conn.close()
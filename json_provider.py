@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+IntellGrade JSON Provider
+Serializes API responses with orjson when it is installed and the standard
+library otherwise, producing the same JSON either way
+"""
+
+import json
+import uuid
+import dataclasses
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def default(obj):
+    """Convert the types database rows and analytics code produce"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, timedelta):
+        # MySQL TIME columns are returned as timedelta
+        return obj.total_seconds()
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode('utf-8', errors='replace')
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, 'tolist'):
+        # NumPy arrays and scalars
+        return obj.tolist()
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider with fast paths for Decimal scores and datetimes
+
+    Decimals are written as numbers and dates as ISO 8601 strings.
+    """
+
+    def dumpb(self, obj, indent: bool = False) -> bytes:
+        """Serialize straight to UTF-8 bytes"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=default, option=option)
+
+        return json.dumps(obj, default=default, sort_keys=self.sort_keys, ensure_ascii=False,
+                          indent=2 if indent else None,
+                          separators=None if indent else (',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is not None and set(kwargs) <= {'indent', 'separators'}:
+            return self.dumpb(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+        kwargs.setdefault('default', default)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('ensure_ascii', False)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response without the intermediate str the default provider creates"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumpb(obj, indent=indent) + b'\n', mimetype=self.mimetype)
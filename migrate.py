@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Schema Migrations
+Applies the numbered SQL files in migrations/ that the database has not run
+yet, in order, using online DDL where the server supports it
+"""
+
+import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+import mysql.connector
+
+from database import get_db_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+Migration = namedtuple('Migration', ['version', 'name', 'checksum', 'statements'])
+
+# Algorithm/lock clauses tried in order; the last (none) lets MySQL pick and may lock the table
+ONLINE_CLAUSES = {
+    'ALTER TABLE': [', ALGORITHM=INSTANT', ', ALGORITHM=INPLACE, LOCK=NONE', ''],
+    'CREATE INDEX': [' ALGORITHM=INPLACE LOCK=NONE', ''],
+    'CREATE UNIQUE INDEX': [' ALGORITHM=INPLACE LOCK=NONE', ''],
+    'DROP INDEX': [' ALGORITHM=INPLACE LOCK=NONE', ''],
+}
+
+# Unknown algorithm/lock, or not supported for this change: try the next clause
+ONLINE_UNSUPPORTED = {1800, 1801, 1845, 1846}
+
+# The object already exists (or is already gone), as after an interrupted run
+ALREADY_APPLIED = {
+    1050,  # table or view exists
+    1060,  # duplicate column
+    1061,  # duplicate key name
+    1091,  # can't drop, does not exist
+    1359,  # trigger exists
+}
+
+def split_statements(sql: str) -> List[str]:
+    """Statements in a SQL file, split on semicolons outside quotes and comments"""
+    statements, current = [], []
+    quote = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            current.append(char)
+            if char == '\\':
+                current.append(sql[i + 1:i + 2])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"', '`'):
+            quote = char
+            current.append(char)
+        elif sql.startswith('--', i) or char == '#':
+            i = sql.find('\n', i)
+            if i < 0:
+                break
+            current.append('\n')
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = len(sql) if end < 0 else end + 1
+        elif char == ';':
+            statements.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """Every migration file, by version"""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding='utf-8') as f:
+            sql = f.read().replace('\r\n', '\n')
+        migrations.append(Migration(int(match.group(1)), match.group(2),
+                                    hashlib.sha256(sql.encode('utf-8')).hexdigest(), split_statements(sql)))
+
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+def ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            execution_ms INT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def applied_migrations(cursor) -> Dict[int, str]:
+    """Applied version -> checksum of the file when it ran"""
+    ensure_table(cursor)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+def online_variants(statement: str) -> List[str]:
+    """The statement with each online clause to try, most online first"""
+    if re.search(r'\b(ALGORITHM|LOCK)\s*=', statement, re.IGNORECASE):
+        return [statement]
+    prefix = ' '.join(statement.split()[:3]).upper()
+    for kind, clauses in ONLINE_CLAUSES.items():
+        if prefix.startswith(kind):
+            return [statement + clause for clause in clauses]
+    return [statement]
+
+def execute_statement(cursor, statement: str) -> str:
+    """
+    Run one migration statement
+
+    Returns:
+        'online' (no table lock), 'locking' (the server could not do it
+        online), 'skipped' (already applied) or 'done' (not DDL with online options)
+    """
+    variants = online_variants(statement)
+    last = len(variants) - 1
+    for attempt, variant in enumerate(variants):
+        try:
+            cursor.execute(variant)
+        except mysql.connector.Error as err:
+            if err.errno in ONLINE_UNSUPPORTED and attempt < last:
+                continue
+            if err.errno in ALREADY_APPLIED:
+                return 'skipped'
+            raise
+        if not last:
+            return 'done'
+        return 'locking' if attempt == last else 'online'
+
+def apply_migration(conn, migration: Migration):
+    """
+    Run a migration and record it
+
+    DDL commits implicitly in MySQL, so a migration is not atomic. Statements
+    whose effect is already present are skipped, which lets a migration that
+    failed part-way through be run again once the cause is fixed.
+    """
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    try:
+        for number, statement in enumerate(migration.statements, 1):
+            try:
+                outcome = execute_statement(cursor, statement)
+            except mysql.connector.Error as err:
+                raise RuntimeError(f"Migration {migration.version:04d} statement {number} failed: {err}\n"
+                                   f"{statement}") from err
+            if outcome in ('locking', 'skipped'):
+                summary = ' '.join(statement.split())[:70]
+                note = 'could not run online, table was locked' if outcome == 'locking' else 'already applied'
+                print(f"   ⚠️  {summary}... ({note})")
+
+        cursor.execute("INSERT INTO schema_migrations (version, name, checksum, execution_ms) VALUES (%s, %s, %s, %s)",
+                       (migration.version, migration.name, migration.checksum,
+                        int((time.perf_counter() - started) * 1000)))
+        conn.commit()
+    finally:
+        cursor.close()
+
+def has_unversioned_schema(cursor) -> bool:
+    """Tables exist but no migration has been recorded (installed from database_schema.sql before migrations)"""
+    cursor.execute("SELECT COUNT(*) FROM schema_migrations")
+    if cursor.fetchone()[0]:
+        return False
+    cursor.execute("SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'users'")
+    return cursor.fetchone()[0] > 0
+
+def pending_migrations(conn, target: Optional[int] = None) -> List[Migration]:
+    """Migrations not yet applied, up to target; warns about applied files that were edited since"""
+    cursor = conn.cursor()
+    applied = applied_migrations(cursor)
+    cursor.close()
+
+    pending = []
+    for migration in load_migrations():
+        if migration.version in applied:
+            if applied[migration.version] != migration.checksum:
+                print(f"⚠️  Migration {migration.version:04d}_{migration.name} changed after it was applied")
+        elif target is None or migration.version <= target:
+            pending.append(migration)
+    return pending
+
+def migrate(conn, target: Optional[int] = None, dry_run: bool = False) -> int:
+    """Apply pending migrations in order; returns how many ran"""
+    cursor = conn.cursor()
+    ensure_table(cursor)
+    unversioned = has_unversioned_schema(cursor)
+    cursor.close()
+    if unversioned:
+        raise RuntimeError("The database has tables but no recorded migrations. Record the ones it already "
+                           "has with --baseline VERSION (1 for the original schema) and run again.")
+
+    pending = pending_migrations(conn, target)
+    for migration in pending:
+        print(f"🔧 {migration.version:04d}_{migration.name} ({len(migration.statements)} statements)")
+        if dry_run:
+            for statement in migration.statements:
+                print(f"   {' '.join(online_variants(statement)[0].split())[:110]}")
+            continue
+        apply_migration(conn, migration)
+    return len(pending)
+
+def baseline(conn, version: Optional[int] = None) -> int:
+    """
+    Record migrations up to version (default: all) as applied without running them
+
+    For databases created from database_schema.sql, which always matches the
+    latest migration.
+    """
+    cursor = conn.cursor()
+    applied = applied_migrations(cursor)
+    recorded = 0
+    for migration in load_migrations():
+        if migration.version not in applied and (version is None or migration.version <= version):
+            cursor.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                           (migration.version, migration.name, migration.checksum))
+            recorded += 1
+    conn.commit()
+    cursor.close()
+    return recorded
+
+def status(conn) -> List[Dict[str, any]]:
+    """Every migration with when it was applied (None if pending)"""
+    cursor = conn.cursor(dictionary=True)
+    ensure_table(cursor)
+    cursor.execute("SELECT version, applied_at, execution_ms FROM schema_migrations")
+    applied = {row['version']: row for row in cursor.fetchall()}
+    cursor.close()
+    return [{
+        'version': migration.version,
+        'name': migration.name,
+        'applied_at': applied.get(migration.version, {}).get('applied_at'),
+        'execution_ms': applied.get(migration.version, {}).get('execution_ms')
+    } for migration in load_migrations()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Apply database schema migrations')
+    parser.add_argument('--target', type=int, help='Stop after this version')
+    parser.add_argument('--dry-run', action='store_true', help='List pending statements without running them')
+    parser.add_argument('--status', action='store_true', help='Show applied and pending migrations')
+    parser.add_argument('--baseline', type=int, metavar='VERSION', nargs='?', const=0,
+                        help='Record migrations up to VERSION (default: all) as applied without running them')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+
+    try:
+        if args.status:
+            for row in status(conn):
+                state = f"applied {row['applied_at']}" if row['applied_at'] else 'pending'
+                print(f"   {row['version']:04d}_{row['name']:<32} {state}")
+        elif args.baseline is not None:
+            recorded = baseline(conn, args.baseline or None)
+            print(f"📌 Recorded {recorded} migrations as applied")
+        else:
+            count = migrate(conn, args.target, args.dry_run)
+            if args.dry_run:
+                print(f"📋 {count} pending migrations")
+            else:
+                print(f"✅ Applied {count} migrations" if count else "✅ Database schema is up to date")
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
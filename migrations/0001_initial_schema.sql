@@ -0,0 +1,143 @@
+-- Initial schema: users, departments, courses, results, feedbacks, lecturer courses and reporting views
+
+-- Users table (admin, student, lecturer)
+CREATE TABLE users (
+    id VARCHAR(20) PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    role ENUM('admin', 'student', 'lecturer') NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Departments table
+CREATE TABLE departments (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    code VARCHAR(10) UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Courses table
+CREATE TABLE courses (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    code VARCHAR(20) UNIQUE NOT NULL,
+    unit INT NOT NULL DEFAULT 3,
+    department_id INT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (department_id) REFERENCES departments(id) ON DELETE CASCADE
+);
+
+-- Results table
+CREATE TABLE results (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    student_id VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    score DECIMAL(5,2) NOT NULL,
+    grade CHAR(2),
+    session VARCHAR(10) NOT NULL,
+    semester VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_result (student_id, course_id, session, semester)
+);
+
+-- Feedbacks table
+CREATE TABLE feedbacks (
+    id VARCHAR(50) PRIMARY KEY,
+    student_id VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    lecturer_id VARCHAR(20) NOT NULL,
+    rating INT NOT NULL CHECK (rating >= 1 AND rating <= 5),
+    comment TEXT,
+    semester VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
+    FOREIGN KEY (lecturer_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_feedback (student_id, course_id, lecturer_id, semester)
+);
+
+-- Lecturer courses pivot table (many-to-many)
+CREATE TABLE lecturer_courses (
+    lecturer_id VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (lecturer_id, course_id),
+    FOREIGN KEY (lecturer_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+);
+
+-- Indexes for better performance
+CREATE INDEX idx_users_role ON users(role);
+CREATE INDEX idx_users_email ON users(email);
+CREATE INDEX idx_results_student ON results(student_id);
+CREATE INDEX idx_results_course ON results(course_id);
+CREATE INDEX idx_results_session_semester ON results(session, semester);
+CREATE INDEX idx_feedbacks_student ON feedbacks(student_id);
+CREATE INDEX idx_feedbacks_course ON feedbacks(course_id);
+CREATE INDEX idx_feedbacks_lecturer ON feedbacks(lecturer_id);
+CREATE INDEX idx_feedbacks_semester ON feedbacks(semester);
+CREATE INDEX idx_courses_department ON courses(department_id);
+
+-- Create views for easier querying
+CREATE VIEW student_results_view AS
+SELECT 
+    r.id,
+    r.student_id,
+    u.name as student_name,
+    r.course_id,
+    c.code as course_code,
+    c.title as course_title,
+    c.unit,
+    r.score,
+    r.grade,
+    r.session,
+    r.semester,
+    r.created_at
+FROM results r
+JOIN users u ON r.student_id = u.id
+JOIN courses c ON r.course_id = c.id
+WHERE u.role = 'student';
+
+CREATE VIEW lecturer_feedback_view AS
+SELECT 
+    f.id,
+    f.student_id,
+    s.name as student_name,
+    f.course_id,
+    c.code as course_code,
+    c.title as course_title,
+    f.lecturer_id,
+    l.name as lecturer_name,
+    f.rating,
+    f.comment,
+    f.semester,
+    f.created_at
+FROM feedbacks f
+JOIN users s ON f.student_id = s.id
+JOIN users l ON f.lecturer_id = l.id
+JOIN courses c ON f.course_id = c.id
+WHERE s.role = 'student' AND l.role = 'lecturer';
+
+CREATE VIEW course_analytics_view AS
+SELECT 
+    c.id as course_id,
+    c.code as course_code,
+    c.title as course_title,
+    c.unit,
+    d.name as department_name,
+    COUNT(DISTINCT r.student_id) as total_students,
+    AVG(r.score) as average_score,
+    COUNT(f.id) as total_feedbacks,
+    AVG(f.rating) as average_rating
+FROM courses c
+LEFT JOIN departments d ON c.department_id = d.id
+LEFT JOIN results r ON c.id = r.course_id
+LEFT JOIN feedbacks f ON c.id = f.course_id
+GROUP BY c.id, c.code, c.title, c.unit, d.name; 
@@ -0,0 +1,10 @@
+-- Stored comment sentiment on feedbacks (see sentiment_worker.py); existing rows
+-- are scored with python sentiment_worker.py
+
+ALTER TABLE feedbacks
+    ADD COLUMN sentiment_label ENUM('positive', 'neutral', 'negative') NULL AFTER semester,
+    ADD COLUMN sentiment_score DECIMAL(6,2) NULL AFTER sentiment_label,
+    ADD COLUMN sentiment_confidence DECIMAL(4,3) NULL AFTER sentiment_score,
+    ADD COLUMN sentiment_analyzed_at TIMESTAMP NULL AFTER sentiment_confidence;
+
+CREATE INDEX idx_feedbacks_lecturer_created ON feedbacks(lecturer_id, created_at);
@@ -0,0 +1,24 @@
+-- Background jobs (see job_queue.py)
+CREATE TABLE jobs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job_type VARCHAR(50) NOT NULL,
+    payload TEXT,
+    status ENUM('queued', 'running', 'succeeded', 'failed') NOT NULL DEFAULT 'queued',
+    priority INT NOT NULL DEFAULT 50,
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    progress DECIMAL(5,2) NOT NULL DEFAULT 0,
+    progress_message VARCHAR(255),
+    result MEDIUMTEXT,
+    error TEXT,
+    created_by VARCHAR(20),
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP NULL,
+    run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL
+);
+
+CREATE INDEX idx_jobs_claim ON jobs(status, priority, id);
+CREATE INDEX idx_jobs_created_by ON jobs(created_by);
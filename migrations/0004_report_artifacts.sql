@@ -0,0 +1,14 @@
+-- Rendered lecturer reports (see reports.py)
+CREATE TABLE report_artifacts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    lecturer_id VARCHAR(20) NOT NULL,
+    report_type VARCHAR(20) NOT NULL,
+    session_key VARCHAR(10) NOT NULL DEFAULT 'all',
+    format VARCHAR(10) NOT NULL,
+    data_version CHAR(40) NOT NULL,
+    file_path VARCHAR(255) NOT NULL,
+    row_count INT NOT NULL DEFAULT 0,
+    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (lecturer_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_artifact (lecturer_id, report_type, session_key, format)
+);
@@ -0,0 +1,50 @@
+-- Archived sessions (see archive.py). Closed sessions are moved out of the live
+-- results/feedbacks tables into compressed tables partitioned by session.
+-- Partitioned InnoDB tables cannot carry foreign keys, so integrity is checked
+-- while rows are still live.
+CREATE TABLE archived_sessions (
+    session VARCHAR(10) PRIMARY KEY,
+    results_archived INT NOT NULL DEFAULT 0,
+    feedbacks_archived INT NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE results_archive (
+    id INT NOT NULL,
+    student_id VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    score DECIMAL(5,2) NOT NULL,
+    grade CHAR(2),
+    session VARCHAR(10) NOT NULL,
+    semester VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    PRIMARY KEY (id, session),
+    KEY idx_results_archive_student (student_id),
+    KEY idx_results_archive_course (course_id)
+) ROW_FORMAT=COMPRESSED
+PARTITION BY LIST COLUMNS (session) (
+    PARTITION p_initial VALUES IN ('')
+);
+
+CREATE TABLE feedbacks_archive (
+    id VARCHAR(50) NOT NULL,
+    student_id VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    lecturer_id VARCHAR(20) NOT NULL,
+    rating INT NOT NULL,
+    comment TEXT,
+    semester VARCHAR(10) NOT NULL,
+    session VARCHAR(10) NOT NULL,
+    sentiment_label ENUM('positive', 'neutral', 'negative') NULL,
+    sentiment_score DECIMAL(6,2) NULL,
+    sentiment_confidence DECIMAL(4,3) NULL,
+    sentiment_analyzed_at TIMESTAMP NULL,
+    created_at TIMESTAMP NULL,
+    PRIMARY KEY (id, session),
+    KEY idx_feedbacks_archive_lecturer (lecturer_id),
+    KEY idx_feedbacks_archive_course (course_id)
+) ROW_FORMAT=COMPRESSED
+PARTITION BY LIST COLUMNS (session) (
+    PARTITION p_initial VALUES IN ('')
+);
@@ -0,0 +1,20 @@
+-- Cached score distribution per class (see grade_stats.py). version is bumped
+-- whenever a result in the class changes; the row is current while
+-- computed_version = version.
+CREATE TABLE course_grade_stats (
+    course_id INT NOT NULL,
+    session VARCHAR(10) NOT NULL,
+    semester VARCHAR(10) NOT NULL,
+    version INT NOT NULL DEFAULT 0,
+    computed_version INT NULL,
+    student_count INT NOT NULL DEFAULT 0,
+    mean_score DECIMAL(5,2),
+    stddev DECIMAL(5,2),
+    pass_rate DECIMAL(4,1),
+    histogram TEXT,
+    quantiles TEXT,
+    scores MEDIUMTEXT,
+    computed_at TIMESTAMP NULL,
+    PRIMARY KEY (course_id, session, semester),
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+);
@@ -0,0 +1,29 @@
+-- Change tracking for ?since= delta sync (see sync.py)
+
+ALTER TABLE feedbacks
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER created_at;
+
+-- Rows removed from results/feedbacks, for ?since= delta sync (see sync.py).
+-- Filled by the delete triggers below; reason is 'archived' when archive.py
+-- moves a row to the archive tables. Cascaded foreign key deletes do not fire
+-- triggers, so clients fall back to a full listing once their cursor expires.
+CREATE TABLE sync_tombstones (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity ENUM('result', 'feedback') NOT NULL,
+    row_id VARCHAR(50) NOT NULL,
+    student_id VARCHAR(20),
+    reason ENUM('deleted', 'archived') NOT NULL DEFAULT 'deleted',
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER trg_results_tombstone AFTER DELETE ON results FOR EACH ROW
+    INSERT INTO sync_tombstones (entity, row_id, student_id, reason)
+    VALUES ('result', OLD.id, OLD.student_id, IF(@archiving IS NULL, 'deleted', 'archived'));
+
+CREATE TRIGGER trg_feedbacks_tombstone AFTER DELETE ON feedbacks FOR EACH ROW
+    INSERT INTO sync_tombstones (entity, row_id, student_id, reason)
+    VALUES ('feedback', OLD.id, OLD.student_id, IF(@archiving IS NULL, 'deleted', 'archived'));
+
+CREATE INDEX idx_feedbacks_updated ON feedbacks(updated_at);
+CREATE INDEX idx_results_student_updated ON results(student_id, updated_at);
+CREATE INDEX idx_tombstones_entity_deleted ON sync_tombstones(entity, deleted_at);
@@ -0,0 +1,24 @@
+-- Feedback counts per day, week (bucket = Monday) and semester for each course
+-- and lecturer (see feedback_rollups.py). Updated in the transactions that
+-- insert and score feedback; neutral = feedback_count - positive - negative.
+CREATE TABLE feedback_rollups (
+    granularity ENUM('day', 'week', 'semester') NOT NULL,
+    bucket VARCHAR(20) NOT NULL,
+    course_id INT NOT NULL,
+    lecturer_id VARCHAR(20) NOT NULL,
+    feedback_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    positive_count INT NOT NULL DEFAULT 0,
+    negative_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket, course_id, lecturer_id)
+);
+
+CREATE INDEX idx_rollups_lecturer ON feedback_rollups(lecturer_id, granularity, bucket);
+CREATE INDEX idx_rollups_course ON feedback_rollups(course_id, granularity, bucket);
+
+-- Existing feedback is counted with python feedback_rollups.py --rebuild
@@ -0,0 +1,30 @@
+-- Running per-student totals for performance prediction (see feature_store.py),
+-- updated in the same transaction as each result write. GPA uses grade
+-- points on a 4.0 scale; the primary department is where the student has
+-- taken the most units.
+CREATE TABLE student_features (
+    student_id VARCHAR(20) PRIMARY KEY,
+    result_count INT NOT NULL DEFAULT 0,
+    score_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    units INT NOT NULL DEFAULT 0,
+    grade_point_units DECIMAL(12,2) NOT NULL DEFAULT 0,
+    primary_department_id INT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE student_department_units (
+    student_id VARCHAR(20) NOT NULL,
+    department_id INT NOT NULL,
+    units INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, department_id)
+);
+
+CREATE TABLE department_stats (
+    department_id INT PRIMARY KEY,
+    result_count INT NOT NULL DEFAULT 0,
+    score_sum DECIMAL(14,2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (department_id) REFERENCES departments(id) ON DELETE CASCADE
+);
+
+-- Existing results are totalled with python feature_store.py --rebuild
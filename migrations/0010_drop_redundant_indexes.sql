@@ -0,0 +1,14 @@
+-- Indexes that repeat the leading columns of another index on the same table
+-- (reported by index_advisor.py). Each foreign key keeps a usable index.
+
+-- UNIQUE (email) already indexes email, and login looks users up by email alone
+DROP INDEX idx_users_email ON users;
+
+-- Leading column of unique_result and idx_results_student_updated
+DROP INDEX idx_results_student ON results;
+
+-- Leading column of unique_feedback
+DROP INDEX idx_feedbacks_student ON feedbacks;
+
+-- Leading column of idx_feedbacks_lecturer_created
+DROP INDEX idx_feedbacks_lecturer ON feedbacks;
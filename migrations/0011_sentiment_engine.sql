@@ -0,0 +1,10 @@
+-- Which engine scored each comment. The lexicon's sentiment_score is an unbounded
+-- sum of phrase weights while the model's runs from -1 to 1, so the two are only
+-- averaged separately. Rows scored before this column existed stay NULL and are
+-- counted with the lexicon, the default engine.
+
+ALTER TABLE feedbacks
+    ADD COLUMN sentiment_engine ENUM('lexicon', 'model') NULL AFTER sentiment_confidence;
+
+ALTER TABLE feedbacks_archive
+    ADD COLUMN sentiment_engine ENUM('lexicon', 'model') NULL AFTER sentiment_confidence;
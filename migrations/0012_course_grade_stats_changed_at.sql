@@ -0,0 +1,6 @@
+-- When a class's results last changed (set with each version bump in grade_stats.py),
+-- so ?since= deltas can resend a student's rows whose class statistics moved
+ALTER TABLE course_grade_stats
+    ADD COLUMN changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP AFTER computed_at;
+
+CREATE INDEX idx_course_grade_stats_changed ON course_grade_stats(changed_at);
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Model Selection
+K-fold cross-validation of candidate performance models in parallel,
+keeping the best one for PerformancePredictor
+"""
+
+import os
+import time
+import argparse
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge, Lasso
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import StandardScaler
+
+from performance_prediction import DEFAULT_MODEL_PATH, PerformancePredictor
+
+# Name -> factory; each factory returns an unfitted estimator
+CANDIDATES: Dict[str, Callable] = {
+    'linear': lambda: LinearRegression(),
+    'ridge': lambda: Ridge(alpha=1.0),
+    'lasso': lambda: Lasso(alpha=0.1),
+    'random_forest': lambda: RandomForestRegressor(n_estimators=200, min_samples_leaf=5, n_jobs=1, random_state=42),
+    'gradient_boosting': lambda: GradientBoostingRegressor(n_estimators=200, max_depth=3, learning_rate=0.05,
+                                                           random_state=42)
+}
+
+def _fit_fold(name: str, estimator, X: np.ndarray, y: np.ndarray,
+              train_index: np.ndarray, test_index: np.ndarray) -> Dict[str, any]:
+    """Fit one candidate on one fold; X and y arrive memory-mapped, not copied"""
+    started = time.perf_counter()
+    model = clone(estimator).fit(X[train_index], y[train_index])
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    predicted = model.predict(X[test_index])
+    predict_seconds = time.perf_counter() - started
+
+    return {
+        'candidate': name,
+        'r2': r2_score(y[test_index], predicted),
+        'rmse': float(np.sqrt(mean_squared_error(y[test_index], predicted))),
+        'mae': mean_absolute_error(y[test_index], predicted),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds
+    }
+
+def cross_validate(X: np.ndarray, y: np.ndarray, candidates: Optional[Dict[str, Callable]] = None,
+                   folds: int = 5, n_jobs: int = -1) -> List[Dict[str, any]]:
+    """
+    Score every candidate with k-fold cross-validation
+
+    All (candidate, fold) fits run as one joblib batch across processes. The
+    scaled matrix is passed once; joblib memory-maps large arrays for the
+    workers, and each fold only ships its index arrays.
+
+    Returns:
+        Per-candidate mean/std of R², RMSE and MAE plus timings, best first
+    """
+    candidates = candidates or CANDIDATES
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=42).split(X))
+
+    fold_results = Parallel(n_jobs=n_jobs, max_nbytes='1M')(
+        delayed(_fit_fold)(name, factory(), X, y, train_index, test_index)
+        for name, factory in candidates.items()
+        for train_index, test_index in splits
+    )
+
+    summary = []
+    for name in candidates:
+        rows = [row for row in fold_results if row['candidate'] == name]
+        r2 = np.array([row['r2'] for row in rows])
+        rmse = np.array([row['rmse'] for row in rows])
+        summary.append({
+            'candidate': name,
+            'r2_mean': round(float(r2.mean()), 4),
+            'r2_std': round(float(r2.std()), 4),
+            'rmse_mean': round(float(rmse.mean()), 3),
+            'rmse_std': round(float(rmse.std()), 3),
+            'mae_mean': round(float(np.mean([row['mae'] for row in rows])), 3),
+            'fit_seconds': round(sum(row['fit_seconds'] for row in rows), 3),
+            'predict_seconds': round(sum(row['predict_seconds'] for row in rows), 4)
+        })
+    return sorted(summary, key=lambda row: row['r2_mean'], reverse=True)
+
+def select_model(data: pd.DataFrame, feature_names: List[str], target: str = 'final_score',
+                 candidates: Optional[Dict[str, Callable]] = None, folds: int = 5,
+                 n_jobs: int = -1) -> Dict[str, any]:
+    """Cross-validate the candidates, then refit the best one on all rows"""
+    candidates = candidates or CANDIDATES
+    scaler = StandardScaler()
+    X = np.ascontiguousarray(scaler.fit_transform(data[feature_names].to_numpy(dtype=float)))
+    y = data[target].to_numpy(dtype=float)
+
+    started = time.perf_counter()
+    results = cross_validate(X, y, candidates, folds, n_jobs)
+    best = results[0]
+    model = candidates[best['candidate']]().fit(X, y)
+
+    return {
+        'model': model,
+        'scaler': scaler,
+        'feature_names': list(feature_names),
+        'candidate': best['candidate'],
+        'train_r2': round(float(model.score(X, y)), 4),
+        'cv_results': results,
+        'folds': folds,
+        'samples': len(y),
+        'selection_seconds': round(time.perf_counter() - started, 2),
+        'trained_at': datetime.now().isoformat()
+    }
+
+def save_model(selection: Dict[str, any], path: str = DEFAULT_MODEL_PATH):
+    """Persist a selection result for PerformancePredictor(model_path=...)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.tmp"
+    joblib.dump(selection, temp_path)
+    os.replace(temp_path, path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Select and save the performance prediction model')
+    parser.add_argument('--csv', help='Training data with the feature columns and final_score '
+                                      '(default: the predictor\'s generated sample data)')
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds')
+    parser.add_argument('--jobs', type=int, default=-1, help='Parallel processes (-1 = all cores)')
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help='Where to save the best model')
+    args = parser.parse_args()
+
+    predictor = PerformancePredictor()
+    data = pd.read_csv(args.csv) if args.csv else predictor.sample_data
+
+    print(f"🔬 Cross-validating {len(CANDIDATES)} models on {len(data)} rows ({args.folds} folds)...")
+    selection = select_model(data, predictor.feature_names, folds=args.folds, n_jobs=args.jobs)
+
+    print(f"   {'candidate':<18} {'R²':>14} {'RMSE':>14} {'fit s':>8}")
+    for row in selection['cv_results']:
+        print(f"   {row['candidate']:<18} {row['r2_mean']:7.4f} ±{row['r2_std']:.3f} "
+              f"{row['rmse_mean']:7.3f} ±{row['rmse_std']:.2f} {row['fit_seconds']:8.2f}")
+
+    save_model(selection, args.output)
+    print(f"✅ Best model '{selection['candidate']}' saved to {args.output} "
+          f"({selection['selection_seconds']}s)")
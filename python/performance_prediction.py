@@ -4,14 +4,175 @@ IntellGrade Performance Prediction Module
 Simple machine learning for student performance prediction
 """
 
+import os
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Union
 import json
 from datetime import datetime
 
+if TYPE_CHECKING:
+    # Only for annotations; pandas is imported where data is built
+    import pandas as pd
+
+# Written by model_selection.py
+DEFAULT_MODEL_PATH = os.getenv('PERFORMANCE_MODEL_PATH',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models',
+                                            'performance_model.joblib'))
+
+def model_feature_importance(model, feature_names: List[str]) -> Dict[str, float]:
+    """Coefficients for linear models, impurity importances for tree ensembles"""
+    values = getattr(model, 'coef_', None)
+    if values is None:
+        values = model.feature_importances_
+    return dict(zip(feature_names, np.ravel(values).tolist()))
+
+RISK_LEVELS = ('low', 'medium', 'high', 'critical')
+
+# Every recommendation the predictor makes, in the order they are listed;
+# PredictionSet keeps one bit per entry instead of the strings
+RECOMMENDATIONS = (
+    "Increase class attendance to improve performance",
+    "Complete all assignments on time",
+    "Increase study hours to at least 15 hours per week",
+    "Consider study efficiency - quality over quantity",
+    "Seek additional academic support and tutoring",
+    "Meet with course instructor to discuss improvement strategies",
+    "Consider reducing course load or taking prerequisite courses",
+    "Develop a detailed study schedule and stick to it",
+    "Participate actively in class discussions and group activities",
+    "Form study groups with classmates"
+)
+RECOMMENDATION_BITS = np.left_shift(1, np.arange(len(RECOMMENDATIONS)))
+
+class PredictionSet:
+    """
+    Predictions for many students as parallel arrays
+    
+    Behaves like the list of dicts batch_predict() used to return (len,
+    indexing, iteration), but a row's dict is only built when it is read.
+    Rows that could not be predicted have NaN scores, risk code -1 and their
+    error dict in errors.
+    """
+    
+    def __init__(self, predictor: 'PerformancePredictor', scores: np.ndarray, confidence: np.ndarray,
+                 risk_codes: np.ndarray, recommendations: np.ndarray,
+                 contributions: Optional[np.ndarray] = None, errors: Optional[Dict[int, Dict[str, any]]] = None):
+        self.predictor = predictor
+        self.scores = scores                    # Rounded to 2 decimals
+        self.confidence = confidence
+        self.risk_codes = risk_codes            # Index into RISK_LEVELS
+        self.recommendations = recommendations  # Bitmask over RECOMMENDATIONS
+        self.contributions = contributions      # Per-student feature contributions (linear models)
+        self.errors = errors or {}
+    
+    @classmethod
+    def from_dicts(cls, predictor: 'PerformancePredictor', predictions: List[Dict[str, any]]) -> 'PredictionSet':
+        """Rebuild the arrays from prediction dicts"""
+        bits = {text: 1 << bit for bit, text in enumerate(RECOMMENDATIONS)}
+        errors = {i: p for i, p in enumerate(predictions) if p.get('prediction') is None}
+        return cls(
+            predictor,
+            np.array([np.nan if i in errors else p['prediction'] for i, p in enumerate(predictions)], dtype=float),
+            np.array([p.get('confidence', 0.0) for p in predictions], dtype=float),
+            np.array([-1 if i in errors else RISK_LEVELS.index(p['risk_level'])
+                      for i, p in enumerate(predictions)], dtype=np.int8),
+            np.array([sum(bits.get(text, 0) for text in set(p.get('recommendations', [])))
+                      for p in predictions], dtype=np.int16),
+            errors=errors
+        )
+    
+    def spread(self, positions: List[int], size: int, errors: Dict[int, Dict[str, any]]) -> 'PredictionSet':
+        """This set's rows moved to positions in a set of size rows, the rest being errors"""
+        def placed(values, fill):
+            full = np.full((size,) + values.shape[1:], fill, dtype=values.dtype)
+            full[positions] = values
+            return full
+        
+        contributions = None if self.contributions is None else placed(self.contributions, np.nan)
+        return PredictionSet(self.predictor, placed(self.scores, np.nan), placed(self.confidence, 0.0),
+                             placed(self.risk_codes, -1), placed(self.recommendations, 0), contributions,
+                             {**self.errors, **errors})
+    
+    @property
+    def valid(self) -> np.ndarray:
+        return self.risk_codes >= 0
+    
+    def __len__(self) -> int:
+        return len(self.scores)
+    
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('prediction index out of range')
+        if index in self.errors:
+            return dict(self.errors[index])
+        
+        mask = int(self.recommendations[index])
+        contributions = None if self.contributions is None else self.contributions[index]
+        result = {
+            'prediction': float(self.scores[index]),
+            'confidence': float(self.confidence[index]),
+            'risk_level': RISK_LEVELS[self.risk_codes[index]],
+            'recommendations': [text for bit, text in enumerate(RECOMMENDATIONS) if mask >> bit & 1],
+            'feature_importance': self.predictor._get_feature_importance(contributions),
+            'model_performance': self.predictor.model_performance
+        }
+        if contributions is not None:
+            result['baseline_score'] = round(self.predictor.baseline, 2)
+        return result
+    
+    def records(self, student_ids: Optional[List[str]] = None) -> List[Dict[str, any]]:
+        """prediction, confidence and risk_level per row (with student_id when given), for API responses"""
+        valid = self.valid.tolist()
+        columns = zip(valid, self.scores.tolist(), self.confidence.tolist(), self.risk_codes.tolist())
+        records = [{
+            'prediction': score if ok else None,
+            'confidence': confidence if ok else 0.0,
+            'risk_level': RISK_LEVELS[code] if ok else 'unknown'
+        } for ok, score, confidence, code in columns]
+        if student_ids is not None:
+            records = [{'student_id': student_id, **record} for student_id, record in zip(student_ids, records)]
+        return records
+    
+    def summary(self) -> Dict[str, any]:
+        """Summary statistics over the predicted rows"""
+        valid = self.valid
+        if not valid.any():
+            return {
+                'total_students': 0,
+                'average_predicted_score': 0,
+                'risk_distribution': {},
+                'recommendations_summary': []
+            }
+        
+        scores = self.scores[valid]
+        risk_counts = np.bincount(self.risk_codes[valid], minlength=len(RISK_LEVELS))
+        
+        # Most frequent recommendations; ties go to the one that appeared first
+        given = (self.recommendations[valid, None] & RECOMMENDATION_BITS) != 0
+        frequency = given.sum(axis=0)
+        order = np.lexsort((np.arange(len(RECOMMENDATIONS)), given.argmax(axis=0), -frequency))
+        common_recommendations = [RECOMMENDATIONS[i] for i in order[:5] if frequency[i]]
+        
+        return {
+            'total_students': int(valid.sum()),
+            'average_predicted_score': round(float(scores.mean()), 2),
+            'min_predicted_score': round(float(scores.min()), 2),
+            'max_predicted_score': round(float(scores.max()), 2),
+            'std_predicted_score': round(float(scores.std()), 2),
+            'risk_distribution': dict(zip(RISK_LEVELS, risk_counts.tolist())),
+            'recommendations_summary': common_recommendations
+        }
+
 class PerformancePredictor:
-    def __init__(self):
+    def __init__(self, model_path: Optional[str] = None):
+        """Train on sample data, or load a model saved by model_selection.py from model_path"""
         self.model = None
         self.feature_names = [
             'previous_gpa', 'attendance_rate', 'assignment_completion',
@@ -19,12 +180,28 @@ class PerformancePredictor:
             'previous_course_performance', 'department_average'
         ]
         
-        # Initialize with sample data for demonstration
-        self.sample_data = self._generate_sample_data()
-        self._train_model()
+        # Sample data for demonstration, generated when training needs it
+        self._sample_data = None
+        if model_path:
+            self._load_model(model_path)
+        else:
+            self._train_model()
+    
+    @property
+    def sample_data(self) -> 'pd.DataFrame':
+        """Training data; a predictor loaded from a saved model never builds it (or imports pandas)"""
+        if self._sample_data is None:
+            self._sample_data = self._generate_sample_data()
+        return self._sample_data
     
-    def _generate_sample_data(self) -> pd.DataFrame:
+    @sample_data.setter
+    def sample_data(self, data: 'pd.DataFrame'):
+        self._sample_data = data
+    
+    def _generate_sample_data(self) -> 'pd.DataFrame':
         """Generate sample student performance data for training"""
+        import pandas as pd
+        
         np.random.seed(42)  # For reproducible results
         
         n_samples = 1000
@@ -63,7 +240,7 @@ class PerformancePredictor:
         from sklearn.preprocessing import StandardScaler
         
         # Prepare features and target
-        X = self.sample_data[self.feature_names]
+        X = self.sample_data[self.feature_names].to_numpy(dtype=float)
         y = self.sample_data['final_score']
         
         # Split data
@@ -85,7 +262,66 @@ class PerformancePredictor:
         self.model_performance = {
             'train_r2': train_score,
             'test_r2': test_score,
-            'feature_importance': dict(zip(self.feature_names, self.model.coef_))
+            'feature_importance': model_feature_importance(self.model, self.feature_names)
+        }
+        self._cache_importance()
+    
+    def _load_model(self, path: str):
+        """Use the model and scaler chosen by cross-validation"""
+        import joblib
+        
+        selection = joblib.load(path)
+        if selection['feature_names'] != self.feature_names:
+            raise ValueError(f"Model at {path} was trained on {selection['feature_names']}")
+        
+        self.model = selection['model']
+        self.scaler = selection['scaler']
+        best = selection['cv_results'][0]
+        self.model_performance = {
+            'train_r2': selection['train_r2'],
+            'test_r2': best['r2_mean'],
+            'test_r2_std': best['r2_std'],
+            'cv_folds': selection['folds'],
+            'feature_importance': model_feature_importance(self.model, self.feature_names)
+        }
+        self._cache_importance()
+    
+    def _cache_importance(self):
+        """Rounded global importance, the fallback explanation for non-linear models"""
+        self.global_importance = {name: round(value, 4)
+                                  for name, value in self.model_performance['feature_importance'].items()}
+        coef = getattr(self.model, 'coef_', None)
+        self._coef = None if coef is None else np.ravel(coef)
+        self.baseline = float(np.ravel(self.model.intercept_)[0]) if self._coef is not None else None
+    
+    def _contributions(self, features_scaled: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Per-student feature contributions, one row per student
+        
+        A linear model predicts its intercept (the score of a student with
+        average features) plus coefficient × scaled value for each feature, so
+        a row summed with self.baseline is that student's unclipped
+        prediction. Other models have no such decomposition and return None.
+        """
+        if self._coef is None:
+            return None
+        return features_scaled * self._coef
+    
+    def explain_batch(self, features: np.ndarray) -> Optional[Dict[str, any]]:
+        """
+        Contributions for a feature matrix (columns in feature_names order), columnar
+        
+        Returns:
+            baseline, feature_names and contributions as {feature: [value per student]},
+            or None for models without per-student contributions
+        """
+        contributions = self._contributions(self.scaler.transform(np.asarray(features, dtype=float)))
+        if contributions is None:
+            return None
+        return {
+            'baseline': round(self.baseline, 4),
+            'feature_names': self.feature_names,
+            'contributions': dict(zip(self.feature_names, contributions.round(4).T.tolist()))
         }
     
     def predict_performance(self, student_data: Dict[str, float]) -> Dict[str, any]:
@@ -99,169 +335,121 @@ class PerformancePredictor:
             Dictionary with prediction results
         """
         try:
-            # Validate input data
-            missing_features = [f for f in self.feature_names if f not in student_data]
-            if missing_features:
-                return {
-                    'error': f"Missing required features: {missing_features}",
-                    'prediction': None,
-                    'confidence': 0.0,
-                    'risk_level': 'unknown'
-                }
-            
-            # Prepare feature vector
-            features = np.array([student_data[f] for f in self.feature_names]).reshape(1, -1)
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Make prediction
-            predicted_score = self.model.predict(features_scaled)[0]
-            predicted_score = max(0, min(100, predicted_score))  # Clip to valid range
-            
-            # Calculate confidence based on feature values
-            confidence = self._calculate_confidence(student_data)
-            
-            # Determine risk level
-            risk_level = self._determine_risk_level(predicted_score, confidence)
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(student_data, predicted_score, risk_level)
-            
-            return {
-                'prediction': round(predicted_score, 2),
-                'confidence': confidence,
-                'risk_level': risk_level,
-                'recommendations': recommendations,
-                'feature_importance': self._get_feature_importance(student_data),
-                'model_performance': self.model_performance
-            }
-            
+            return self.batch_predict([student_data])[0]
         except Exception as e:
-            return {
-                'error': f"Prediction failed: {str(e)}",
-                'prediction': None,
-                'confidence': 0.0,
-                'risk_level': 'unknown'
-            }
+            return self._error(f"Prediction failed: {str(e)}")
     
-    def _calculate_confidence(self, student_data: Dict[str, float]) -> float:
-        """Calculate confidence in prediction based on data quality"""
-        confidence = 0.8  # Base confidence
+    def _error(self, message: str) -> Dict[str, any]:
+        return {
+            'error': message,
+            'prediction': None,
+            'confidence': 0.0,
+            'risk_level': 'unknown'
+        }
+    
+    def predict_matrix(self, features: np.ndarray) -> 'PredictionSet':
+        """Predict for a feature matrix (columns in feature_names order) with array operations only"""
+        features = np.asarray(features, dtype=float).reshape(-1, len(self.feature_names))
+        if not len(features):
+            return PredictionSet(self, np.empty(0), np.empty(0), np.empty(0, dtype=np.int8),
+                                 np.empty(0, dtype=np.int16))
         
-        # Adjust based on data completeness and reasonableness
-        if student_data['attendance_rate'] < 0.5:
-            confidence -= 0.1
-        if student_data['assignment_completion'] < 0.5:
-            confidence -= 0.1
-        if student_data['study_hours_per_week'] < 5:
-            confidence -= 0.1
-        if student_data['study_hours_per_week'] > 30:
-            confidence -= 0.05
-        
-        return max(0.3, min(0.95, confidence))
-    
-    def _determine_risk_level(self, predicted_score: float, confidence: float) -> str:
-        """Determine student risk level based on predicted score and confidence"""
-        if predicted_score >= 80:
-            return 'low'
-        elif predicted_score >= 70:
-            return 'medium'
-        elif predicted_score >= 60:
-            return 'high'
-        else:
-            return 'critical'
-    
-    def _generate_recommendations(self, student_data: Dict[str, float], 
-                                predicted_score: float, risk_level: str) -> List[str]:
-        """Generate personalized recommendations for the student"""
-        recommendations = []
-        
-        # Attendance recommendations
-        if student_data['attendance_rate'] < 0.8:
-            recommendations.append("Increase class attendance to improve performance")
-        
-        # Assignment recommendations
-        if student_data['assignment_completion'] < 0.8:
-            recommendations.append("Complete all assignments on time")
-        
-        # Study time recommendations
-        if student_data['study_hours_per_week'] < 15:
-            recommendations.append("Increase study hours to at least 15 hours per week")
-        elif student_data['study_hours_per_week'] > 25:
-            recommendations.append("Consider study efficiency - quality over quantity")
-        
-        # Performance-based recommendations
-        if predicted_score < 70:
-            recommendations.append("Seek additional academic support and tutoring")
-            recommendations.append("Meet with course instructor to discuss improvement strategies")
-        
-        if risk_level in ['high', 'critical']:
-            recommendations.append("Consider reducing course load or taking prerequisite courses")
-            recommendations.append("Develop a detailed study schedule and stick to it")
-        
-        # General recommendations
-        recommendations.append("Participate actively in class discussions and group activities")
-        recommendations.append("Form study groups with classmates")
-        
-        return recommendations
-    
-    def _get_feature_importance(self, student_data: Dict[str, float]) -> Dict[str, float]:
-        """Get feature importance for the specific student"""
-        importance = {}
-        for feature in self.feature_names:
-            importance[feature] = round(self.model_performance['feature_importance'][feature], 4)
-        return importance
-    
-    def batch_predict(self, students_data: List[Dict[str, float]]) -> List[Dict[str, any]]:
-        """Predict performance for multiple students"""
-        results = []
-        for student_data in students_data:
-            results.append(self.predict_performance(student_data))
-        return results
-    
-    def get_performance_summary(self, predictions: List[Dict[str, any]]) -> Dict[str, any]:
-        """Generate summary statistics from multiple predictions"""
-        valid_predictions = [p for p in predictions if p.get('prediction') is not None]
+        features_scaled = self.scaler.transform(features)
+        predicted_scores = np.clip(self.model.predict(features_scaled), 0, 100)  # Clip to valid range
+        columns = dict(zip(self.feature_names, features.T))
         
-        if not valid_predictions:
-            return {
-                'total_students': 0,
-                'average_predicted_score': 0,
-                'risk_distribution': {},
-                'recommendations_summary': []
-            }
+        confidence = self._calculate_confidence(columns)
+        risk_codes = self._determine_risk_level(predicted_scores, confidence)
+        recommendations = self._generate_recommendations(columns, predicted_scores, risk_codes)
         
-        scores = [p['prediction'] for p in valid_predictions]
-        risk_levels = [p['risk_level'] for p in valid_predictions]
+        return PredictionSet(self, predicted_scores.round(2), confidence, risk_codes, recommendations,
+                             self._contributions(features_scaled))
+    
+    def _calculate_confidence(self, student_data: Dict[str, np.ndarray]) -> np.ndarray:
+        """Calculate confidence in prediction based on data quality"""
+        confidence = np.full(len(student_data['attendance_rate']), 0.8)  # Base confidence
         
-        # Calculate risk distribution
-        risk_distribution = {}
-        for risk in ['low', 'medium', 'high', 'critical']:
-            risk_distribution[risk] = risk_levels.count(risk)
+        # Adjust based on data completeness and reasonableness
+        confidence -= np.where(student_data['attendance_rate'] < 0.5, 0.1, 0.0)
+        confidence -= np.where(student_data['assignment_completion'] < 0.5, 0.1, 0.0)
+        confidence -= np.where(student_data['study_hours_per_week'] < 5, 0.1, 0.0)
+        confidence -= np.where(student_data['study_hours_per_week'] > 30, 0.05, 0.0)
         
-        # Generate common recommendations
-        all_recommendations = []
-        for p in valid_predictions:
-            all_recommendations.extend(p.get('recommendations', []))
+        return confidence.clip(0.3, 0.95)
+    
+    def _determine_risk_level(self, predicted_score: np.ndarray, confidence: np.ndarray) -> np.ndarray:
+        """Risk codes (indexes into RISK_LEVELS): low from 80, medium from 70, high from 60, else critical"""
+        return (3 - (predicted_score >= 60).astype(np.int8) - (predicted_score >= 70)
+                - (predicted_score >= 80)).astype(np.int8)
+    
+    def _generate_recommendations(self, student_data: Dict[str, np.ndarray],
+                                predicted_score: np.ndarray, risk_codes: np.ndarray) -> np.ndarray:
+        """Recommendation bitmasks over RECOMMENDATIONS, one per student"""
+        study_hours = student_data['study_hours_per_week']
+        needs_support = predicted_score < 70
+        high_risk = risk_codes >= RISK_LEVELS.index('high')
+        conditions = (
+            student_data['attendance_rate'] < 0.8,
+            student_data['assignment_completion'] < 0.8,
+            study_hours < 15,
+            study_hours > 25,
+            needs_support,
+            needs_support,
+            high_risk,
+            high_risk,
+            # General recommendations
+            True,
+            True
+        )
+        masks = np.zeros(len(predicted_score), dtype=np.int16)
+        for bit, condition in enumerate(conditions):
+            masks |= np.where(condition, 1 << bit, 0).astype(np.int16)
+        return masks
+    
+    def _get_feature_importance(self, contributions: Optional[np.ndarray]) -> Dict[str, float]:
+        """The student's own feature contributions (points above or below baseline_score) when available"""
+        if contributions is None:
+            return dict(self.global_importance)
+        return dict(zip(self.feature_names, contributions.round(4).tolist()))
+    
+    def batch_predict(self, students_data: List[Dict[str, float]]) -> 'PredictionSet':
+        """
+        Predict performance for multiple students in one pass
         
-        # Count recommendation frequency
-        from collections import Counter
-        recommendation_counts = Counter(all_recommendations)
-        common_recommendations = [rec for rec, count in recommendation_counts.most_common(5)]
+        Students with missing, non-numeric or non-finite features get the usual error
+        dict in their place; the rest are scored together.
+        """
+        rows, positions, errors = [], [], {}
+        for i, student_data in enumerate(students_data):
+            missing_features = [f for f in self.feature_names if f not in student_data]
+            if missing_features:
+                errors[i] = self._error(f"Missing required features: {missing_features}")
+                continue
+            try:
+                row = [float(student_data[f]) for f in self.feature_names]
+            except (TypeError, ValueError) as e:
+                errors[i] = self._error(f"Prediction failed: {str(e)}")
+                continue
+            if not np.isfinite(row).all():
+                invalid = [f for f, value in zip(self.feature_names, row) if not np.isfinite(value)]
+                errors[i] = self._error(f"Non-finite values for features: {invalid}")
+                continue
+            rows.append(row)
+            positions.append(i)
         
-        return {
-            'total_students': len(valid_predictions),
-            'average_predicted_score': round(np.mean(scores), 2),
-            'min_predicted_score': round(min(scores), 2),
-            'max_predicted_score': round(max(scores), 2),
-            'std_predicted_score': round(np.std(scores), 2),
-            'risk_distribution': risk_distribution,
-            'recommendations_summary': common_recommendations
-        }
+        predictions = self.predict_matrix(np.array(rows, dtype=float).reshape(len(rows), len(self.feature_names)))
+        return predictions.spread(positions, len(students_data), errors) if errors else predictions
     
-    def update_model(self, new_data: pd.DataFrame):
+    def get_performance_summary(self, predictions: Union['PredictionSet', List[Dict[str, any]]]) -> Dict[str, any]:
+        """Generate summary statistics from multiple predictions"""
+        if not isinstance(predictions, PredictionSet):
+            predictions = PredictionSet.from_dicts(self, predictions)
+        return predictions.summary()
+    
+    def update_model(self, new_data: 'pd.DataFrame'):
         """Update model with new data"""
+        import pandas as pd
+        
         # Combine with existing data
         combined_data = pd.concat([self.sample_data, new_data], ignore_index=True)
         
@@ -272,7 +460,7 @@ class PerformancePredictor:
     def export_model_info(self) -> Dict[str, any]:
         """Export model information for storage"""
         return {
-            'model_type': 'LinearRegression',
+            'model_type': type(self.model).__name__,
             'feature_names': self.feature_names,
             'model_performance': self.model_performance,
             'training_date': datetime.now().isoformat(),
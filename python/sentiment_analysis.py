@@ -4,43 +4,164 @@ IntellGrade Sentiment Analysis Module
 Simple keyword-based sentiment analysis for student feedback
 """
 
+import os
 import re
 import json
-from typing import Dict, List, Tuple
+import pickle
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicons')
+DEFAULT_LEXICON = os.getenv('SENTIMENT_LEXICON', os.path.join(LEXICON_DIR, 'academic.json'))
+
+# Compiled lexicons, shared by every process that loads the same file contents
+LEXICON_CACHE_DIR = os.getenv('LEXICON_CACHE_DIR', os.path.join(LEXICON_DIR, '.compiled'))
+
+# How often (seconds) an analyzer checks its lexicon file for changes
+LEXICON_CHECK_INTERVAL = float(os.getenv('LEXICON_CHECK_INTERVAL', '5'))
+
+# Words, optionally with a contraction ("doesn't"), and the punctuation that ends a negation scope
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[.!?;:,]")
+SCOPE_BREAKS = frozenset('.!?;:,') | {'but', 'however', 'although', 'though', 'yet'}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase tokens; hyphenated words split into their parts, so 'well-explained' == 'well explained'"""
+    return TOKEN_PATTERN.findall(text.lower().replace('\u2019', "'"))
+
+class PhraseMatcher:
+    """
+    Token trie over the lexicon with longest-match lookup
+
+    Phrases are tokenized like the text, so multi-word and hyphenated entries
+    match as a unit and win over their own words ('easy to understand' over 'easy').
+    """
+
+    _TERMINAL = ''  # never a token, so safe as the end-of-phrase key
+
+    def __init__(self, root: Optional[Dict[str, dict]] = None):
+        self.root: Dict[str, dict] = root if root is not None else {}
+
+    def add(self, phrase: str, kind: str, weight: float = 1.0):
+        node = self.root
+        for token in tokenize(phrase):
+            node = node.setdefault(token, {})
+        node[self._TERMINAL] = (kind, weight, phrase)
+
+    def match(self, tokens: List[str], start: int) -> Tuple[int, Optional[Tuple[str, float, str]]]:
+        """Longest entry starting at tokens[start]: (tokens consumed, (kind, weight, phrase)) or (1, None)"""
+        node = self.root
+        best_length, best = 1, None
+        for position in range(start, len(tokens)):
+            node = node.get(tokens[position])
+            if node is None:
+                break
+            entry = node.get(self._TERMINAL)
+            if entry is not None:
+                best_length, best = position - start + 1, entry
+        return best_length, best
+
+class Lexicon:
+    """
+    A compiled lexicon file
+
+    Files are JSON: name, version, negation_window, positive and negative
+    ({phrase: weight}), intensifiers ({word: multiplier}) and negators (list).
+    """
+
+    def __init__(self, name: str, version: int, digest: str, negation_window: int, matcher: PhraseMatcher):
+        self.name = name
+        self.version = version
+        self.digest = digest
+        self.negation_window = negation_window
+        self.matcher = matcher
+
+    @property
+    def key(self) -> str:
+        """Identifies the exact lexicon contents, e.g. 'academic@1:3f2a9c1b0e7d'"""
+        return f"{self.name}@{self.version}:{self.digest[:12]}"
+
+    @classmethod
+    def compile(cls, data: Dict[str, any], digest: str) -> 'Lexicon':
+        matcher = PhraseMatcher()
+        for word in data.get('negators', []):
+            matcher.add(word, 'negator')
+        for word, weight in data.get('intensifiers', {}).items():
+            matcher.add(word, 'intensifier', float(weight))
+        for kind in ('positive', 'negative'):
+            for phrase, weight in data.get(kind, {}).items():
+                matcher.add(phrase, kind, float(weight))
+        return cls(data['name'], int(data['version']), digest, int(data.get('negation_window', 3)), matcher)
+
+    @classmethod
+    def load(cls, path: str) -> 'Lexicon':
+        """
+        Load a lexicon file, reusing the compiled copy for these exact contents
+
+        The compiled trie is pickled under LEXICON_CACHE_DIR by content hash, so
+        the API server and every worker process share one compilation.
+        """
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        cache_path = os.path.join(LEXICON_CACHE_DIR, f"{digest}.pickle")
+
+        try:
+            with open(cache_path, 'rb') as f:
+                name, version, negation_window, root = pickle.load(f)
+            return cls(name, version, digest, negation_window, PhraseMatcher(root))
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+        lexicon = cls.compile(json.loads(raw), digest)
+        try:
+            os.makedirs(LEXICON_CACHE_DIR, exist_ok=True)
+            # Written under a temporary name and renamed, so readers never see a partial file
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump((lexicon.name, lexicon.version, lexicon.negation_window, lexicon.matcher.root),
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"⚠️  Could not cache compiled lexicon: {e}")
+        return lexicon
 
 class SentimentAnalyzer:
-    def __init__(self):
-        # Define positive and negative keywords for academic context
-        self.positive_keywords = [
-            'excellent', 'great', 'good', 'amazing', 'wonderful', 'fantastic', 'outstanding',
-            'brilliant', 'superb', 'perfect', 'helpful', 'clear', 'understandable', 'interesting',
-            'engaging', 'inspiring', 'motivating', 'supportive', 'patient', 'knowledgeable',
-            'professional', 'organized', 'structured', 'comprehensive', 'thorough', 'detailed',
-            'practical', 'useful', 'valuable', 'enjoyable', 'fun', 'exciting', 'stimulating',
-            'challenging', 'rewarding', 'satisfying', 'fulfilling', 'educational', 'informative',
-            'well-taught', 'well-explained', 'well-organized', 'well-structured', 'well-prepared',
-            'approachable', 'friendly', 'encouraging', 'positive', 'constructive', 'effective',
-            'efficient', 'productive', 'successful', 'achievement', 'improvement', 'progress',
-            'development', 'growth', 'learning', 'understanding', 'comprehension', 'mastery'
-        ]
-        
-        self.negative_keywords = [
-            'bad', 'poor', 'terrible', 'awful', 'horrible', 'dreadful', 'disappointing',
-            'frustrating', 'confusing', 'unclear', 'difficult', 'hard', 'complex', 'complicated',
-            'boring', 'dull', 'monotonous', 'repetitive', 'tedious', 'annoying', 'irritating',
-            'unhelpful', 'useless', 'pointless', 'waste', 'time-consuming', 'slow', 'inefficient',
-            'disorganized', 'chaotic', 'messy', 'unstructured', 'unprepared', 'unprofessional',
-            'rude', 'unfriendly', 'hostile', 'aggressive', 'intimidating', 'threatening',
-            'discouraging', 'demotivating', 'depressing', 'stressful', 'overwhelming', 'exhausting',
-            'tiring', 'draining', 'frustrating', 'confusing', 'misleading', 'inaccurate',
-            'incorrect', 'wrong', 'false', 'untrue', 'incomplete', 'partial', 'superficial',
-            'shallow', 'basic', 'elementary', 'simple', 'easy', 'trivial', 'insignificant',
-            'unimportant', 'irrelevant', 'unnecessary', 'redundant', 'repetitive', 'monotonous'
-        ]
+    def __init__(self, lexicon_path: str = DEFAULT_LEXICON):
+        self.lexicon_path = lexicon_path
+        self.lexicon = Lexicon.load(lexicon_path)
+        self._lexicon_mtime = os.stat(lexicon_path).st_mtime_ns
+        self._checked_at = time.monotonic()
+        self._reload_lock = threading.Lock()
+    
+    @property
+    def version(self) -> str:
+        """Identifies the scoring rules in use, for caching results"""
+        return self._current_lexicon().key
+    
+    def _current_lexicon(self) -> Lexicon:
+        """
+        The lexicon to score with, reloading it if the file changed
         
-        # Academic context modifiers
-        self.intensifiers = ['very', 'extremely', 'really', 'quite', 'rather', 'somewhat', 'slightly']
-        self.negators = ['not', 'no', 'never', 'none', 'neither', 'nor', 'hardly', 'barely', 'scarcely']
+        The new lexicon is compiled before it replaces the old one in a single
+        assignment, so concurrent analyses see either version but never a mix.
+        A file that fails to load leaves the current lexicon in place.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= LEXICON_CHECK_INTERVAL and self._reload_lock.acquire(blocking=False):
+            try:
+                self._checked_at = now
+                mtime = os.stat(self.lexicon_path).st_mtime_ns
+                if mtime != self._lexicon_mtime:
+                    self._lexicon_mtime = mtime
+                    self.lexicon = Lexicon.load(self.lexicon_path)
+                    print(f"🔄 Reloaded sentiment lexicon {self.lexicon.key}")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Keeping sentiment lexicon {self.lexicon.key}: {e}")
+            finally:
+                self._reload_lock.release()
+        return self.lexicon
         
     def analyze_sentiment(self, text: str) -> Dict[str, any]:
         """
@@ -59,23 +180,12 @@ class SentimentAnalyzer:
                 'confidence': 0.0,
                 'positive_words': [],
                 'negative_words': [],
+                'engine': 'lexicon',
                 'reasoning': 'Empty or null text provided'
             }
         
-        # Clean and normalize text
-        cleaned_text = self._clean_text(text.lower())
-        
-        # Find positive and negative words
-        positive_words = self._find_words(cleaned_text, self.positive_keywords)
-        negative_words = self._find_words(cleaned_text, self.negative_keywords)
-        
-        # Calculate sentiment score
-        positive_score = self._calculate_word_score(cleaned_text, positive_words, self.positive_keywords)
-        negative_score = self._calculate_word_score(cleaned_text, negative_words, self.negative_keywords)
-        
-        # Apply negation detection
-        positive_score = self._apply_negation(cleaned_text, positive_score, positive_words)
-        negative_score = self._apply_negation(cleaned_text, negative_score, negative_words)
+        lexicon = self._current_lexicon()
+        positive_words, negative_words, positive_score, negative_score = self._score_tokens(lexicon, tokenize(text))
         
         # Calculate final score
         final_score = positive_score - negative_score
@@ -91,61 +201,59 @@ class SentimentAnalyzer:
             'negative_words': negative_words,
             'positive_score': positive_score,
             'negative_score': negative_score,
+            'lexicon': lexicon.key,
+            'engine': 'lexicon',
             'reasoning': self._generate_reasoning(sentiment, final_score, positive_words, negative_words)
         }
     
-    def _clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
-        # Remove special characters but keep spaces
-        text = re.sub(r'[^\w\s]', ' ', text)
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    
-    def _find_words(self, text: str, word_list: List[str]) -> List[str]:
-        """Find words from the given list in the text"""
-        found_words = []
-        words = text.split()
-        
-        for word in words:
-            if word in word_list:
-                found_words.append(word)
-        
-        return found_words
-    
-    def _calculate_word_score(self, text: str, found_words: List[str], word_list: List[str]) -> float:
-        """Calculate score for found words with intensity modifiers"""
-        score = 0.0
-        words = text.split()
+    def _score_tokens(self, lexicon: Lexicon, tokens: List[str]) -> Tuple[List[str], List[str], float, float]:
+        """
+        Match lexicon phrases left to right in a single pass
         
-        for i, word in enumerate(words):
-            if word in found_words:
-                base_score = 1.0
-                
-                # Check for intensifiers
-                if i > 0 and words[i-1] in self.intensifiers:
-                    base_score *= 1.5
-                elif i > 0 and words[i-1] in ['very', 'extremely']:
-                    base_score *= 2.0
-                
-                score += base_score
+        An intensifier directly before a sentiment phrase scales it; a negator
+        cancels the weight of each sentiment phrase starting within the next
+        negation_window tokens, unless punctuation or a contrast word ends the clause first.
         
-        return score
-    
-    def _apply_negation(self, text: str, score: float, words: List[str]) -> float:
-        """Apply negation detection to adjust scores"""
-        words_list = text.split()
-        negated_score = score
+        Returns:
+            Tuple of (positive phrases, negative phrases, positive score, negative score)
+        """
+        found = {'positive': [], 'negative': []}
+        scores = {'positive': 0.0, 'negative': 0.0}
+        negated = {'positive': 0.0, 'negative': 0.0}
+        negation_end = -1
+        multiplier = 1.0
+        matcher = lexicon.matcher
+        window = lexicon.negation_window
         
-        for i, word in enumerate(words_list):
-            if word in words:
-                # Check for negators before the word
-                for j in range(max(0, i-3), i):
-                    if words_list[j] in self.negators:
-                        negated_score -= 1.0  # Reduce positive score
-                        break
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            length, entry = matcher.match(tokens, i)
+            
+            if entry is None:
+                if token in SCOPE_BREAKS:
+                    negation_end = -1
+                elif token.endswith("n't"):
+                    negation_end = i + window
+                multiplier = 1.0
+            else:
+                kind, weight, phrase = entry
+                if kind == 'negator':
+                    negation_end = i + window
+                    multiplier = 1.0
+                elif kind == 'intensifier':
+                    multiplier = weight
+                else:
+                    found[kind].append(phrase)
+                    scores[kind] += multiplier * weight
+                    if i <= negation_end:
+                        negated[kind] += weight
+                    multiplier = 1.0
+            i += length
         
-        return max(0, negated_score)  # Ensure score doesn't go below 0
+        positive_score = max(0, scores['positive'] - negated['positive'])
+        negative_score = max(0, scores['negative'] - negated['negative'])
+        return found['positive'], found['negative'], positive_score, negative_score
     
     def _categorize_sentiment(self, score: float, positive_count: int, negative_count: int) -> Tuple[str, float]:
         """Categorize sentiment based on score and word counts"""
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Sentiment Cache
+Memoizes sentiment results by normalized comment text and engine version,
+in a bounded in-process LRU and optionally a SQLite file shared by processes
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sentiment_analysis import tokenize
+
+SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', '10000'))
+
+# Persistent store shared by the API and worker processes; unset to keep the cache in memory only
+SENTIMENT_CACHE_PATH = os.getenv('SENTIMENT_CACHE_PATH') or None
+
+# SQLite limits the number of bound parameters per statement
+STORE_CHUNK = 500
+
+def cache_key(text: str, version: str) -> bytes:
+    """
+    Hash of the text as the engines see it (lowercase tokens) and the engine version
+
+    Both engines only look at tokenize() output, so texts that differ in case,
+    spacing or hyphenation share one entry without changing any result.
+    """
+    normalized = ' '.join(tokenize(text or ''))
+    return hashlib.blake2b(f"{version}\0{normalized}".encode('utf-8'), digest_size=16).digest()
+
+class CachedAnalyzer:
+    """
+    Wraps a sentiment engine (anything with version and batch_analyze) with memoization
+
+    Entries carry the engine version in their key, so a reloaded lexicon or a
+    retrained model never serves results computed by its predecessor.
+    """
+
+    def __init__(self, engine, max_entries: int = SENTIMENT_CACHE_SIZE, store_path: Optional[str] = SENTIMENT_CACHE_PATH):
+        self.engine = engine
+        self.max_entries = max_entries
+        self.store_path = store_path
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    # Persistent store
+
+    def _store(self) -> Optional[sqlite3.Connection]:
+        if self.store_path is None:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.store_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS sentiment_cache (key BLOB PRIMARY KEY, result TEXT NOT NULL)')
+            self._local.conn = conn
+        return conn
+
+    def _load(self, keys: List[bytes]) -> Dict[bytes, Dict[str, any]]:
+        conn = self._store()
+        if conn is None or not keys:
+            return {}
+        found = {}
+        for start in range(0, len(keys), STORE_CHUNK):
+            chunk = keys[start:start + STORE_CHUNK]
+            rows = conn.execute(f"SELECT key, result FROM sentiment_cache WHERE key IN ({', '.join('?' * len(chunk))})",
+                                chunk)
+            found.update((key, json.loads(result)) for key, result in rows)
+        return found
+
+    def _save(self, results: Dict[bytes, Dict[str, any]]):
+        conn = self._store()
+        if conn is None or not results:
+            return
+        conn.executemany("INSERT OR REPLACE INTO sentiment_cache (key, result) VALUES (?, ?)",
+                         [(key, json.dumps(result)) for key, result in results.items()])
+
+    # In-process LRU
+
+    def _remember(self, key: bytes, result: Dict[str, any]):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _recall(self, key: bytes) -> Optional[Dict[str, any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    # Engine interface
+
+    @property
+    def version(self) -> str:
+        return self.engine.version
+
+    def batch_analyze(self, texts: List[str]) -> List[Dict[str, any]]:
+        """Results for every text; only texts seen by no cache reach the engine, once each"""
+        version = self.engine.version
+        keys = [cache_key(text, version) for text in texts]
+
+        results: Dict[bytes, Dict[str, any]] = {}
+        pending: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in pending:
+                continue
+            result = self._recall(key)
+            if result is not None:
+                results[key] = result
+            else:
+                pending[key] = text
+
+        stored = self._load(list(pending))
+        for key, result in stored.items():
+            self._remember(key, result)
+            del pending[key]
+        results.update(stored)
+
+        computed = dict(zip(pending, self.engine.batch_analyze(list(pending.values()))))
+        for key, result in computed.items():
+            self._remember(key, result)
+        self._save(computed)
+        results.update(computed)
+
+        self.store_hits += len(stored)
+        self.misses += len(computed)
+        self.hits += len(texts) - len(stored) - len(computed)
+        return [dict(results[key]) for key in keys]
+
+    def analyze_sentiment(self, text: str) -> Dict[str, any]:
+        return self.batch_analyze([text])[0]
+
+    def stats(self) -> Dict[str, any]:
+        """Hit counts since start-up; store hits are texts found only in the shared store"""
+        lookups = self.hits + self.store_hits + self.misses
+        return {
+            'engine': self.engine.version,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'store_hits': self.store_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.store_hits) / lookups, 4) if lookups else 0.0
+        }
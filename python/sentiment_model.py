@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Sentiment Model
+Optional trained alternative to the lexicon engine: hashed word and bigram
+features with a multinomial logistic regression, scored for a whole batch
+with one sparse matrix multiply
+"""
+
+import os
+import csv
+import sys
+import json
+import zlib
+import hashlib
+import time
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import minimize
+
+from sentiment_analysis import SentimentAnalyzer, tokenize
+from sentiment_cache import SENTIMENT_CACHE_SIZE, CachedAnalyzer
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+DEFAULT_MODEL = os.getenv('SENTIMENT_MODEL_PATH', os.path.join(MODEL_DIR, 'sentiment.npz'))
+
+# 'lexicon' (keyword/phrase matching) or 'model' (this module)
+SENTIMENT_ENGINE = os.getenv('SENTIMENT_ENGINE', 'lexicon')
+
+CLASSES = ('negative', 'neutral', 'positive')
+N_FEATURES = 2 ** 18
+
+# Part of the engine version; bumped when batch_analyze changes its output for the
+# same weights, so results memoized by sentiment_cache are recomputed
+SCORING_VERSION = 2
+
+def rating_label(rating: int) -> str:
+    """Weak label for feedback without a human label: the star rating's sentiment"""
+    return 'positive' if rating >= 4 else 'negative' if rating <= 2 else 'neutral'
+
+class HashingVectorizer:
+    """
+    Maps comments to a fixed-width sparse matrix without a vocabulary
+
+    Unigrams and bigrams are hashed with CRC32, which (unlike hash()) is the
+    same in every process, so a saved model scores identically everywhere.
+    One hash bit picks the sign to cancel collisions out on average; rows are
+    L2-normalized.
+    """
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self.n_features = n_features
+        self._codes: Dict[str, int] = {}
+
+    def _code(self, feature: str) -> int:
+        """Column + 1, negated for a negative sign (never 0)"""
+        digest = zlib.crc32(feature.encode('utf-8'))
+        code = digest % self.n_features + 1
+        return code if digest & 0x80000000 else -code
+
+    def transform(self, texts: List[str]) -> sparse.csr_matrix:
+        features: List[str] = []
+        indptr = [0]
+        for text in texts:
+            tokens = tokenize(text or '')
+            features.extend(tokens)
+            features.extend(map(' '.join, zip(tokens, tokens[1:])))
+            indptr.append(len(features))
+
+        # Feedback vocabulary is small, so hashes are memoized (up to a bound)
+        codes = self._codes
+        missing = {feature: self._code(feature) for feature in set(features).difference(codes)}
+        if len(codes) + len(missing) <= 1_000_000:
+            codes.update(missing)
+        else:
+            codes = {**codes, **missing}
+        signed_columns = np.fromiter(map(codes.__getitem__, features), dtype=np.int64, count=len(features))
+
+        matrix = sparse.csr_matrix(
+            (np.sign(signed_columns).astype(np.float64), np.abs(signed_columns) - 1, np.array(indptr, dtype=np.int64)),
+            shape=(len(texts), self.n_features)
+        )
+        matrix.sum_duplicates()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+def softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+class SentimentModel:
+    """Linear sentiment classifier with the same analyze interface as SentimentAnalyzer"""
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, metadata: Optional[Dict[str, any]] = None):
+        self.coef = coef
+        self.intercept = intercept
+        self.metadata = metadata or {}
+        self.vectorizer = HashingVectorizer(coef.shape[0])
+        digest = hashlib.blake2b(coef.tobytes() + intercept.tobytes(), digest_size=8).hexdigest()
+        self.version = f"model:{digest}:{SCORING_VERSION}"
+
+    @classmethod
+    def train(cls, texts: List[str], labels: List[str], l2: float = 1e-4, max_iter: int = 200,
+              n_features: int = N_FEATURES) -> 'SentimentModel':
+        """Fit by L-BFGS on the L2-regularized cross-entropy"""
+        X = HashingVectorizer(n_features).transform(texts)
+        y = np.array([CLASSES.index(label) for label in labels])
+        Y = np.zeros((len(y), len(CLASSES)))
+        Y[np.arange(len(y)), y] = 1.0
+
+        # Only columns that occur in the data can get non-zero weights
+        used = np.unique(X.indices)
+        X_used = X[:, used]
+        n, k = X_used.shape[0], len(CLASSES)
+
+        def loss(params):
+            W = params[:-k].reshape(-1, k)
+            b = params[-k:]
+            P = softmax(X_used @ W + b)
+            value = -np.log(P[np.arange(n), y] + 1e-12).mean() + 0.5 * l2 * (W * W).sum()
+            G = (P - Y) / n
+            grad = np.concatenate([(X_used.T @ G + l2 * W).ravel(), G.sum(axis=0)])
+            return value, grad
+
+        started = time.perf_counter()
+        result = minimize(loss, np.zeros(len(used) * k + k), jac=True, method='L-BFGS-B',
+                          options={'maxiter': max_iter})
+        coef = np.zeros((n_features, k), dtype=np.float32)
+        coef[used] = result.x[:-k].reshape(-1, k)
+        intercept = result.x[-k:].astype(np.float32)
+
+        return cls(coef, intercept, {
+            'trained_at': datetime.now().isoformat(),
+            'samples': n,
+            'iterations': int(result.nit),
+            'training_seconds': round(time.perf_counter() - started, 2),
+            'l2': l2
+        })
+
+    def save(self, path: str = DEFAULT_MODEL):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Only the rows with weights are stored; the rest of the hash space is zero
+        rows = np.flatnonzero(np.any(self.coef != 0, axis=1))
+        temp_path = f"{path}.tmp.npz"
+        np.savez_compressed(temp_path, rows=rows.astype(np.int32), weights=self.coef[rows],
+                            intercept=self.intercept, n_features=self.coef.shape[0],
+                            classes=np.array(CLASSES), metadata=np.array(json.dumps(self.metadata)))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL) -> 'SentimentModel':
+        with np.load(path) as saved:
+            if tuple(saved['classes']) != CLASSES:
+                raise ValueError(f"Model classes {tuple(saved['classes'])} do not match {CLASSES}")
+            coef = np.zeros((int(saved['n_features']), len(CLASSES)), dtype=np.float32)
+            coef[saved['rows']] = saved['weights']
+            return cls(coef, saved['intercept'], dict(json.loads(str(saved['metadata'])), path=path))
+
+    def _probabilities(self, features: sparse.csr_matrix) -> np.ndarray:
+        return softmax(np.asarray(features @ self.coef) + self.intercept)
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Class probabilities (negative, neutral, positive) per text"""
+        return self._probabilities(self.vectorizer.transform(texts))
+
+    def batch_analyze(self, texts: List[str]) -> List[Dict[str, any]]:
+        """
+        Analyze many texts with one sparse matrix multiply
+
+        Texts without tokens (empty or missing comments) have only the
+        intercepts to go on, so like the lexicon engine they are neutral
+        with score and confidence 0.
+        """
+        if not texts:
+            return []
+        features = self.vectorizer.transform(texts)
+        empty = (np.asarray(abs(features).sum(axis=1)).ravel() == 0).tolist()
+        probabilities = self._probabilities(features)
+        labels = probabilities.argmax(axis=1)
+        # Score runs from -1 (certainly negative) to 1 (certainly positive)
+        scores = (probabilities[:, 2] - probabilities[:, 0]).tolist()
+        confidences = probabilities[np.arange(len(texts)), labels].tolist()
+        rounded = probabilities.round(4).tolist()
+        return [{
+            'sentiment': 'neutral',
+            'score': 0.0,
+            'confidence': 0.0,
+            'probabilities': None,
+            'engine': 'model',
+            'reasoning': 'Empty or null text provided'
+        } if is_empty else {
+            'sentiment': CLASSES[label],
+            'score': score,
+            'confidence': confidence,
+            'probabilities': dict(zip(CLASSES, row)),
+            'engine': 'model',
+            'reasoning': f"Model predicts {CLASSES[label]} with probability {confidence:.2f}"
+        } for label, score, confidence, row, is_empty in zip(labels.tolist(), scores, confidences, rounded, empty)]
+
+    def analyze_sentiment(self, text: str) -> Dict[str, any]:
+        return self.batch_analyze([text])[0]
+
+def create_analyzer(engine: str = SENTIMENT_ENGINE, model_path: str = DEFAULT_MODEL):
+    """
+    The configured sentiment engine
+
+    Both engines provide analyze_sentiment() and batch_analyze() returning
+    sentiment, score and confidence. Falls back to the lexicon engine when
+    the model file is missing or unreadable. Results are memoized unless
+    SENTIMENT_CACHE_SIZE is 0.
+    """
+    analyzer = None
+    if engine == 'model':
+        try:
+            analyzer = SentimentModel.load(model_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Sentiment model unavailable ({e}); using the lexicon engine")
+    elif engine != 'lexicon':
+        raise ValueError(f"Unknown sentiment engine: {engine}")
+    analyzer = analyzer or SentimentAnalyzer()
+    return CachedAnalyzer(analyzer) if SENTIMENT_CACHE_SIZE > 0 else analyzer
+
+def read_labeled_csv(path: str) -> Tuple[List[str], List[str]]:
+    """Comments and labels from a CSV with a comment column and a label or rating column"""
+    texts, labels = [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            label = (row.get('label') or '').strip().lower()
+            if not label and row.get('rating'):
+                label = rating_label(int(row['rating']))
+            if label in CLASSES:
+                texts.append(row.get('comment') or '')
+                labels.append(label)
+    return texts, labels
+
+def accuracy(engine, texts: List[str], labels: List[str]) -> float:
+    predictions = [result['sentiment'] for result in engine.batch_analyze(texts)]
+    return float(np.mean([prediction == label for prediction, label in zip(predictions, labels)]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Train the sentiment model from labeled feedback')
+    parser.add_argument('csv', help='CSV with comment and label (positive/neutral/negative) or rating columns')
+    parser.add_argument('--output', default=DEFAULT_MODEL, help='Where to save the model')
+    parser.add_argument('--l2', type=float, default=1e-4, help='L2 regularization strength')
+    parser.add_argument('--max-iter', type=int, default=200, help='L-BFGS iterations')
+    parser.add_argument('--holdout', type=float, default=0.2, help='Share of rows kept for evaluation')
+    args = parser.parse_args()
+
+    texts, labels = read_labeled_csv(args.csv)
+    if len(texts) < 10:
+        print(f"❌ Need at least 10 labeled comments, found {len(texts)}")
+        sys.exit(1)
+
+    order = np.random.RandomState(42).permutation(len(texts))
+    split = int(len(texts) * (1 - args.holdout))
+    train_texts = [texts[i] for i in order[:split]]
+    train_labels = [labels[i] for i in order[:split]]
+    test_texts = [texts[i] for i in order[split:]]
+    test_labels = [labels[i] for i in order[split:]]
+
+    print(f"🧠 Training on {len(train_texts)} comments...")
+    model = SentimentModel.train(train_texts, train_labels, l2=args.l2, max_iter=args.max_iter)
+    print(f"   {model.metadata['iterations']} iterations in {model.metadata['training_seconds']}s")
+
+    if test_texts:
+        print(f"📊 Holdout accuracy ({len(test_texts)} comments): model {accuracy(model, test_texts, test_labels):.3f}, "
+              f"lexicon {accuracy(SentimentAnalyzer(), test_texts, test_labels):.3f}")
+
+    model.save(args.output)
+    print(f"✅ Model saved to {args.output}")
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Report Engine
+Builds lecturer reports with set-based queries and keeps rendered copies on disk
+"""
+
+import os
+import io
+import csv
+import html
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from archive import feedbacks_query, results_query
+from job_queue import job_handler
+from sentiment_worker import SENTIMENT_AGGREGATES
+
+REPORTS_DIR = os.getenv('REPORTS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports'))
+
+REPORT_FORMATS = {
+    'csv': 'text/csv',
+    'html': 'text/html',
+    'pdf': 'application/pdf'
+}
+
+# Stored in report_artifacts.session_key when a report covers every session
+ALL_SESSIONS = 'all'
+
+# Results of the courses a lecturer teaches, live and archived ({session_filter} is filled in per report)
+LECTURER_RESULTS = results_query(
+    "course_id IN (SELECT course_id FROM lecturer_courses WHERE lecturer_id = %s) {session_filter}")
+
+REPORT_TYPES = {
+    'performance': {
+        'title': 'Course Performance Report',
+        'description': 'Comprehensive analysis of student performance in all courses',
+        'query': f"""
+            SELECT c.code as course_code, c.title as course_title, r.session, r.semester,
+                   COUNT(*) as students,
+                   ROUND(AVG(r.score), 2) as average_score,
+                   MIN(r.score) as lowest_score,
+                   MAX(r.score) as highest_score,
+                   ROUND(STDDEV_POP(r.score), 2) as score_stddev,
+                   ROUND(100 * SUM(r.score >= 40) / COUNT(*), 1) as pass_rate,
+                   SUM(r.grade IN ('A+', 'A', 'A-')) as a_grades,
+                   SUM(r.grade IN ('B+', 'B', 'B-')) as b_grades,
+                   SUM(r.grade IN ('C+', 'C', 'C-')) as c_grades,
+                   SUM(r.grade IN ('D+', 'D')) as d_grades,
+                   SUM(r.grade = 'F') as f_grades
+            FROM {LECTURER_RESULTS} r
+            JOIN courses c ON r.course_id = c.id
+            GROUP BY c.id, c.code, c.title, r.session, r.semester
+            ORDER BY r.session DESC, r.semester DESC, c.code
+        """,
+        'session_filter': "AND session = %s",
+        # Live and archived results: the filters appear once in each branch
+        'param_copies': 2
+    },
+    'feedback': {
+        'title': 'Feedback Analysis Report',
+        'description': 'Detailed feedback analysis and sentiment overview',
+        'query': f"""
+            SELECT c.code as course_code, c.title as course_title, f.semester,
+                   {SENTIMENT_AGGREGATES},
+                   SUM(f.rating = 5) as five_star,
+                   SUM(f.rating = 4) as four_star,
+                   SUM(f.rating = 3) as three_star,
+                   SUM(f.rating = 2) as two_star,
+                   SUM(f.rating = 1) as one_star,
+                   -- The engines score on different scales (see migrations/0011_sentiment_engine.sql)
+                   ROUND(AVG(CASE WHEN f.sentiment_engine = 'model' THEN NULL ELSE f.sentiment_score END), 2)
+                       as average_sentiment_score,
+                   ROUND(AVG(CASE WHEN f.sentiment_engine = 'model' THEN f.sentiment_score END), 2)
+                       as average_model_sentiment
+            FROM {feedbacks_query('lecturer_id = %s {session_filter}')} f
+            JOIN courses c ON f.course_id = c.id
+            GROUP BY c.id, c.code, c.title, f.semester
+            ORDER BY f.semester DESC, c.code
+        """,
+        'session_filter': "AND semester LIKE CONCAT(%s, '-%%')",
+        # Live and archived feedback: the filters appear once in each branch
+        'param_copies': 2
+    },
+    'progress': {
+        'title': 'Student Progress Report',
+        'description': 'Individual student progress tracking and recommendations',
+        'query': f"""
+            SELECT u.id as student_id, u.name as student_name,
+                   COUNT(*) as courses_taken,
+                   SUM(c.unit) as total_units,
+                   ROUND(SUM(r.score * c.unit) / SUM(c.unit), 2) as weighted_average,
+                   MIN(r.score) as lowest_score,
+                   SUM(r.grade = 'F') as failed_courses,
+                   MAX(r.session) as latest_session,
+                   CASE WHEN SUM(r.score * c.unit) / SUM(c.unit) < 50 OR SUM(r.grade = 'F') > 0
+                        THEN 'Needs support' ELSE 'On track' END as status
+            FROM {LECTURER_RESULTS} r
+            JOIN courses c ON r.course_id = c.id
+            JOIN users u ON r.student_id = u.id
+            GROUP BY u.id, u.name
+            ORDER BY weighted_average, u.name
+        """,
+        'session_filter': "AND session = %s",
+        'param_copies': 2
+    }
+}
+
+def session_key(session_year: Optional[str]) -> str:
+    """Normalize the session a report covers"""
+    return session_year or ALL_SESSIONS
+
+def data_version(conn, lecturer_id: str, session_year: Optional[str] = None) -> str:
+    """
+    Fingerprint the results and feedbacks a lecturer's reports are built from
+
+    Any insert, update or delete of a relevant row changes the fingerprint,
+    which marks previously rendered artifacts as stale.
+    """
+    cursor = conn.cursor()
+
+    params = [lecturer_id]
+    session_filter = ''
+    if session_year:
+        session_filter = "AND session = %s"
+        params.append(session_year)
+    cursor.execute(f"""
+        SELECT COUNT(*), MAX(r.updated_at), SUM(r.score)
+        FROM {LECTURER_RESULTS.format(session_filter=session_filter)} r
+    """, tuple(params) * 2)
+    results_state = cursor.fetchone()
+
+    params = [lecturer_id]
+    session_filter = ''
+    if session_year:
+        session_filter = "AND semester LIKE CONCAT(%s, '-%%')"
+        params.append(session_year)
+    cursor.execute(f"""
+        SELECT COUNT(*), MAX(created_at), COUNT(sentiment_analyzed_at), MAX(sentiment_analyzed_at)
+        FROM {feedbacks_query(f"lecturer_id = %s {session_filter}")} f
+    """, tuple(params) * 2)
+    feedback_state = cursor.fetchone()
+    cursor.close()
+
+    fingerprint = repr((results_state, feedback_state)).encode('utf-8')
+    return hashlib.sha1(fingerprint).hexdigest()
+
+def build_report(conn, lecturer_id: str, report_type: str,
+                 session_year: Optional[str] = None) -> Tuple[List[str], List[tuple]]:
+    """Run the report query and return column names and rows"""
+    definition = REPORT_TYPES[report_type]
+    params = [lecturer_id]
+    session_filter = ''
+    if session_year:
+        session_filter = definition['session_filter']
+        params.append(session_year)
+
+    cursor = conn.cursor()
+    cursor.execute(definition['query'].format(session_filter=session_filter),
+                   tuple(params) * definition.get('param_copies', 1))
+    rows = cursor.fetchall()
+    columns = [column[0] for column in cursor.description]
+    cursor.close()
+    return columns, rows
+
+def _heading(column: str) -> str:
+    return column.replace('_', ' ').title()
+
+def _cell(value) -> str:
+    return '' if value is None else str(value)
+
+def render_csv(title: str, columns: List[str], rows: List[tuple]) -> bytes:
+    """Render report rows as CSV"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([_heading(column) for column in columns])
+    for row in rows:
+        writer.writerow([_cell(value) for value in row])
+    return buffer.getvalue().encode('utf-8')
+
+def render_html(title: str, columns: List[str], rows: List[tuple]) -> bytes:
+    """Render report rows as a standalone HTML page"""
+    header = ''.join(f"<th>{html.escape(_heading(column))}</th>" for column in columns)
+    body = ''.join(
+        '<tr>' + ''.join(f"<td>{html.escape(_cell(value))}</td>" for value in row) + '</tr>'
+        for row in rows
+    )
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    page = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 2rem; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border: 1px solid #dee2e6; padding: 0.4rem 0.6rem; text-align: left; }}
+th {{ background: #f8f9fa; }}
+</style>
+</head>
+<body>
+<h2>{html.escape(title)}</h2>
+<p>Generated {generated} &middot; {len(rows)} rows</p>
+<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>
+</body>
+</html>
+"""
+    return page.encode('utf-8')
+
+def render_pdf(title: str, columns: List[str], rows: List[tuple]) -> bytes:
+    """Render report rows as a PDF table (requires reportlab)"""
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+    except ImportError:
+        raise RuntimeError('PDF reports require the reportlab package (pip install reportlab)')
+
+    buffer = io.BytesIO()
+    document = SimpleDocTemplate(buffer, pagesize=landscape(A4), title=title)
+    table = Table([[_heading(column) for column in columns]] + [[_cell(value) for value in row] for row in rows],
+                  repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+    ]))
+    document.build([Paragraph(title, getSampleStyleSheet()['Heading2']), table])
+    return buffer.getvalue()
+
+RENDERERS = {
+    'csv': render_csv,
+    'html': render_html,
+    'pdf': render_pdf
+}
+
+def get_artifact(conn, lecturer_id: str, report_type: str, session_year: Optional[str],
+                 report_format: str) -> Optional[Dict[str, any]]:
+    """Return the stored artifact row, if any"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT * FROM report_artifacts
+        WHERE lecturer_id = %s AND report_type = %s AND session_key = %s AND format = %s
+    """, (lecturer_id, report_type, session_key(session_year), report_format))
+    artifact = cursor.fetchone()
+    cursor.close()
+    return artifact
+
+def get_fresh_artifact(conn, lecturer_id: str, report_type: str, session_year: Optional[str],
+                       report_format: str) -> Optional[Dict[str, any]]:
+    """Return the stored artifact only if it still matches the underlying data"""
+    artifact = get_artifact(conn, lecturer_id, report_type, session_year, report_format)
+    if not artifact or not os.path.exists(artifact['file_path']):
+        return None
+    if artifact['data_version'] != data_version(conn, lecturer_id, session_year):
+        return None
+    return artifact
+
+def generate_report(conn, lecturer_id: str, report_type: str, session_year: Optional[str] = None,
+                    report_format: str = 'html') -> Dict[str, any]:
+    """Build, render and store a report artifact"""
+    if report_type not in REPORT_TYPES:
+        raise ValueError(f"Unknown report type: {report_type}")
+    if report_format not in RENDERERS:
+        raise ValueError(f"Unknown report format: {report_format}")
+
+    # Taken before the query so changes made while rendering mark the artifact stale
+    version = data_version(conn, lecturer_id, session_year)
+    columns, rows = build_report(conn, lecturer_id, report_type, session_year)
+
+    title = REPORT_TYPES[report_type]['title']
+    if session_year:
+        title = f"{title} - {session_year}"
+    content = RENDERERS[report_format](title, columns, rows)
+
+    directory = os.path.join(REPORTS_DIR, lecturer_id)
+    os.makedirs(directory, exist_ok=True)
+    file_name = f"{report_type}_{session_key(session_year).replace('/', '-')}.{report_format}"
+    file_path = os.path.join(directory, file_name)
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, file_path)
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO report_artifacts
+            (lecturer_id, report_type, session_key, format, data_version, file_path, row_count, generated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON DUPLICATE KEY UPDATE data_version = VALUES(data_version), file_path = VALUES(file_path),
+            row_count = VALUES(row_count), generated_at = CURRENT_TIMESTAMP
+    """, (lecturer_id, report_type, session_key(session_year), report_format, version, file_path, len(rows)))
+    cursor.close()
+
+    return get_artifact(conn, lecturer_id, report_type, session_year, report_format)
+
+def list_reports(conn, lecturer_id: str) -> List[Dict[str, any]]:
+    """List report types with the most recent artifact generated for each"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT report_type, MAX(generated_at) as generated_at, COUNT(*) as artifacts
+        FROM report_artifacts
+        WHERE lecturer_id = %s
+        GROUP BY report_type
+    """, (lecturer_id,))
+    generated = {row['report_type']: row for row in cursor.fetchall()}
+    cursor.close()
+
+    return [{
+        'id': report_type,
+        'title': definition['title'],
+        'description': definition['description'],
+        'type': report_type,
+        'formats': list(REPORT_FORMATS),
+        'generatedAt': generated[report_type]['generated_at'].isoformat() if report_type in generated else None,
+        'artifacts': generated[report_type]['artifacts'] if report_type in generated else 0
+    } for report_type, definition in REPORT_TYPES.items()]
+
+@job_handler('reports.generate')
+def generate_report_job(ctx):
+    """Render a report artifact on a worker"""
+    payload = ctx.payload
+    artifact = get_fresh_artifact(ctx.conn, payload['lecturer_id'], payload['report_type'],
+                                  payload.get('session'), payload['format'])
+    if artifact is None:
+        artifact = generate_report(ctx.conn, payload['lecturer_id'], payload['report_type'],
+                                   payload.get('session'), payload['format'])
+    return {'artifact_id': artifact['id'], 'rows': artifact['row_count']}
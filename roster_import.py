@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Roster Import
+Creates user accounts for a new intake from a CSV roster. Rows are validated
+as they stream in, initial passwords are hashed across a process pool and
+accounts are written with multi-row inserts, one transaction per batch
+"""
+
+import os
+import sys
+import csv
+import secrets
+import argparse
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import bcrypt
+import mysql.connector
+
+from database import get_db_connection
+from job_queue import job_handler
+
+ROSTER_DIR = os.getenv('ROSTER_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rosters'))
+
+# Same cost as accounts created through the API
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+# Accounts per multi-row INSERT (and per transaction)
+INSERT_BATCH_SIZE = 1000
+
+# Per-row errors kept in the summary; the count covers all of them
+MAX_REPORTED_ERRORS = 1000
+
+ROLES = ('student', 'lecturer', 'admin')
+REQUIRED_COLUMNS = ('id', 'name', 'email')
+MAX_LENGTHS = {'id': 20, 'name': 100, 'email': 100}
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """bcrypt hash, as stored in users.password"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def read_roster(path: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """(line number, row) for each data row, with header names lower-cased"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+        missing = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"Roster is missing columns: {', '.join(missing)}")
+        for row in reader:
+            yield reader.line_num, row
+
+def validate_row(row: Dict[str, str], default_role: str = 'student') -> Tuple[Dict[str, str], List[str]]:
+    """The account a row describes and what is wrong with it"""
+    user = {column: (row.get(column) or '').strip() for column in ('id', 'name', 'email', 'role', 'password')}
+    user['email'] = user['email'].lower()
+    user['role'] = user['role'].lower() or default_role
+
+    errors = [f"{column} is required" for column in REQUIRED_COLUMNS if not user[column]]
+    errors += [f"{column} is longer than {length} characters"
+               for column, length in MAX_LENGTHS.items() if len(user[column]) > length]
+    if user['email'] and ('@' not in user['email'] or ' ' in user['email']):
+        errors.append(f"invalid email {user['email']}")
+    if '@' in user['id']:
+        # Login treats any username containing @ as an email
+        errors.append(f"id {user['id']} must not contain @")
+    if user['role'] not in ROLES:
+        errors.append(f"unknown role {user['role']}")
+    if None in row:
+        errors.append('more values than columns')
+    return user, errors
+
+def existing_accounts(cursor, users: List[Dict[str, str]]) -> Tuple[Set[str], Set[str]]:
+    """Ids and emails from a batch that already belong to accounts"""
+    ids = [user['id'] for user in users]
+    emails = [user['email'] for user in users]
+    cursor.execute(f"""
+        SELECT id, LOWER(email) FROM users
+        WHERE id IN ({', '.join(['%s'] * len(ids))}) OR email IN ({', '.join(['%s'] * len(emails))})
+    """, ids + emails)
+    rows = cursor.fetchall()
+    return {row[0].lower() for row in rows}, {row[1] for row in rows}
+
+def insert_users(conn, users: List[Dict[str, str]]) -> List[Tuple[Dict[str, str], str]]:
+    """
+    Insert a batch with one statement
+
+    If an account was created between the conflict check and the insert, the
+    batch is rolled back and retried row by row so only the clashing rows fail.
+
+    Returns:
+        (user, error) for each row that could not be inserted
+    """
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute(
+            f"INSERT INTO users (id, name, email, password, role) VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(users))}",
+            [value for user in users for value in (user['id'], user['name'], user['email'], user['hash'], user['role'])])
+        conn.commit()
+        return []
+    except mysql.connector.IntegrityError:
+        conn.rollback()
+    finally:
+        cursor.close()
+
+    failed = []
+    cursor = conn.cursor()
+    for user in users:
+        try:
+            cursor.execute("INSERT INTO users (id, name, email, password, role) VALUES (%s, %s, %s, %s, %s)",
+                           (user['id'], user['name'], user['email'], user['hash'], user['role']))
+        except mysql.connector.IntegrityError as err:
+            failed.append((user, err.msg))
+    cursor.close()
+    return failed
+
+def count_rows(path: str) -> int:
+    """Data rows in the roster, for progress reporting (quoted line breaks make it an estimate)"""
+    with open(path, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+def import_roster(path: str, default_password: Optional[str] = None, generate_passwords: bool = False,
+                  default_role: str = 'student', rounds: int = BCRYPT_ROUNDS, workers: Optional[int] = None,
+                  credentials_path: Optional[str] = None, dry_run: bool = False, progress=None) -> Dict[str, any]:
+    """
+    Import a CSV roster with columns id, name, email and optionally role and password
+
+    Rows without a password get default_password, or a random one when
+    generate_passwords is set; generated passwords are written with the
+    account id and email to credentials_path for distribution.
+
+    Hashing is the slow part (cost 12 takes around 300 ms of CPU per
+    password), so the pool hashes one batch while the previous one is inserted.
+
+    Args:
+        path: Roster CSV
+        workers: Hashing processes (defaults to the number of CPUs)
+        dry_run: Validate and check for existing accounts without hashing or inserting
+        progress: Optional callback(done, total)
+
+    Returns:
+        Row counts and the per-row errors as {line, id, errors}
+    """
+    if generate_passwords and not credentials_path and not dry_run:
+        raise ValueError('Generated passwords need a credentials file')
+
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('Database connection failed')
+
+    total = count_rows(path)
+    summary = {'rows': 0, 'imported': 0, 'error_count': 0, 'errors': []}
+    seen_ids, seen_emails = set(), set()
+
+    def reject(line: int, user_id: str, errors: List[str]):
+        summary['error_count'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line, 'id': user_id or None, 'errors': errors})
+
+    credentials_file = credentials = None
+    if generate_passwords and not dry_run:
+        os.makedirs(os.path.dirname(os.path.abspath(credentials_path)), exist_ok=True)
+        # Appended to, so passwords from an interrupted run are kept when it is retried
+        credentials_file = open(credentials_path, 'a', newline='', encoding='utf-8')
+        credentials = csv.writer(credentials_file)
+        if not credentials_file.tell():
+            credentials.writerow(['id', 'email', 'password'])
+
+    def load(batch: List[Dict[str, str]], hashes):
+        for user, hashed in zip(batch, hashes):
+            user['hash'] = hashed
+        failed = insert_users(conn, batch)
+        for user, error in failed:
+            reject(user['line'], user['id'], [error])
+        rejected = {id(user) for user, _ in failed}
+        for user in batch:
+            if id(user) not in rejected:
+                summary['imported'] += 1
+                if credentials and user['generated']:
+                    credentials.writerow([user['id'], user['email'], user['password']])
+            user['password'] = None
+        if credentials_file:
+            credentials_file.flush()
+
+    def check(batch: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Drop rows whose id or email already has an account"""
+        cursor = conn.cursor()
+        ids, emails = existing_accounts(cursor, batch)
+        cursor.close()
+        accepted = []
+        for user in batch:
+            errors = []
+            if user['id'].lower() in ids:
+                errors.append(f"account {user['id']} already exists")
+            if user['email'] in emails:
+                errors.append(f"email {user['email']} is already registered")
+            if errors:
+                reject(user['line'], user['id'], errors)
+            else:
+                accepted.append(user)
+        return accepted
+
+    processes = workers or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            batch, pending = [], None
+            rows = read_roster(path)
+
+            while True:
+                entry = next(rows, None)
+                if entry is not None:
+                    line, row = entry
+                    summary['rows'] += 1
+                    user, errors = validate_row(row, default_role)
+                    if user['id'].lower() in seen_ids and user['id']:
+                        errors.append(f"id {user['id']} appears earlier in the roster")
+                    if user['email'] in seen_emails and user['email']:
+                        errors.append(f"email {user['email']} appears earlier in the roster")
+                    seen_ids.add(user['id'].lower())
+                    seen_emails.add(user['email'])
+
+                    user['generated'] = not user['password'] and not default_password and generate_passwords
+                    if user['generated']:
+                        user['password'] = secrets.token_urlsafe(9)
+                    user['password'] = user['password'] or default_password
+                    if not user['password']:
+                        errors.append('password is required (or give a default or generate them)')
+
+                    if errors:
+                        reject(line, user['id'], errors)
+                    else:
+                        user['line'] = line
+                        batch.append(user)
+
+                if batch and (entry is None or len(batch) >= INSERT_BATCH_SIZE):
+                    batch = check(batch)
+                    if batch and not dry_run:
+                        # pool.map submits the whole batch now; its results are collected in load()
+                        hashes = pool.map(hash_password, [user['password'] for user in batch], repeat(rounds),
+                                          chunksize=max(len(batch) // (processes * 4), 1))
+                        if pending:
+                            load(*pending)
+                        pending = (batch, hashes)
+                    elif dry_run:
+                        summary['imported'] += len(batch)
+                    batch = []
+                    if progress:
+                        progress(summary['rows'], max(total, summary['rows']))
+                if entry is None:
+                    break
+
+            if pending:
+                load(*pending)
+                if progress:
+                    progress(summary['rows'], summary['rows'])
+
+        if credentials_file:
+            summary['credentials'] = credentials_path
+        return summary
+    finally:
+        if credentials_file:
+            credentials_file.close()
+        conn.close()
+
+@job_handler('roster.import')
+def roster_import_job(ctx):
+    """Import an uploaded roster on a worker"""
+    def progress(done, total):
+        ctx.set_progress(done / total * 100 if total else 100, f"{done} of {total} rows processed")
+
+    path = ctx.payload['path']
+    summary = import_roster(path, generate_passwords=True, default_role=ctx.payload.get('role', 'student'),
+                            credentials_path=os.path.join(ROSTER_DIR, f"credentials_job_{ctx.id}.csv"),
+                            progress=progress)
+    # The upload may hold initial passwords in plain text
+    os.remove(path)
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create user accounts from a CSV roster (id, name, email[, role, password])')
+    parser.add_argument('roster', help='Roster CSV')
+    passwords = parser.add_mutually_exclusive_group()
+    passwords.add_argument('--default-password', help='Initial password for rows without one')
+    passwords.add_argument('--credentials', help='Generate passwords for rows without one and write them here')
+    parser.add_argument('--role', default='student', choices=ROLES, help='Role for rows without one')
+    parser.add_argument('--rounds', type=int, default=BCRYPT_ROUNDS, help='bcrypt cost')
+    parser.add_argument('--workers', type=int, help='Hashing processes (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='Validate the roster without creating accounts')
+    args = parser.parse_args()
+
+    print(f"👥 {'Checking' if args.dry_run else 'Importing'} roster {args.roster}...")
+    try:
+        summary = import_roster(args.roster, args.default_password, bool(args.credentials), args.role, args.rounds,
+                                args.workers, args.credentials, args.dry_run,
+                                progress=lambda done, total: print(f"   {done}/{total} rows"))
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for error in summary['errors']:
+        print(f"   ⚠️  line {error['line']} ({error['id'] or 'no id'}): {'; '.join(error['errors'])}")
+    if summary['error_count'] > len(summary['errors']):
+        print(f"   ... {summary['error_count'] - len(summary['errors'])} more rows with errors")
+    verb = 'would be created' if args.dry_run else 'created'
+    print(f"✅ {summary['imported']} of {summary['rows']} accounts {verb}, {summary['error_count']} rows rejected")
+    if summary.get('credentials'):
+        print(f"🔑 Initial passwords written to {summary['credentials']}")
+    sys.exit(1 if summary['error_count'] else 0)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Row Sets
+Compact query results: rows stay plain tuples and share one column index,
+instead of a dictionary with its own copy of every key per row
+"""
+
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional, Sequence
+
+class RowSet:
+    """
+    Tuple rows plus a single name -> position index
+
+    Serialize with to_columnar() (one list per column) for large listings,
+    or to_dicts() where callers expect the usual list of row dictionaries.
+    """
+
+    __slots__ = ('columns', 'index', 'rows')
+
+    def __init__(self, columns: Sequence[str], rows: List[tuple]):
+        self.columns = tuple(columns)
+        self.index = {name: position for position, name in enumerate(self.columns)}
+        self.rows = rows
+
+    @classmethod
+    def fetch(cls, cursor, query: str, params: tuple = ()) -> 'RowSet':
+        """Run a query on a plain (tuple) cursor and keep its rows as they arrive"""
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        return cls(cursor.column_names, rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self.rows)
+
+    def column(self, name: str) -> List[any]:
+        """Every value of one column"""
+        position = self.index[name]
+        return [row[position] for row in self.rows]
+
+    def get(self, row: tuple, name: str, default: Optional[any] = None) -> any:
+        """Value of a named column in one of this set's rows"""
+        position = self.index.get(name)
+        return default if position is None else row[position]
+
+    def records(self) -> Iterator[tuple]:
+        """Rows as named tuples (attribute access, still no per-row dict)"""
+        record = namedtuple('Record', self.columns, rename=True)
+        return (record._make(row) for row in self.rows)
+
+    def to_dicts(self) -> List[Dict[str, any]]:
+        """Rows as dictionaries, matching cursor(dictionary=True)"""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+    def to_columnar(self) -> Dict[str, List[any]]:
+        """One list per column, so each key appears once in the serialized payload"""
+        if not self.rows:
+            return {name: [] for name in self.columns}
+        return {name: list(values) for name, values in zip(self.columns, zip(*self.rows))}
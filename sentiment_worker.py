@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Stored Sentiment
+Scores feedback comments once, stores the result on the feedbacks table and aggregates it
+"""
+
+import os
+import csv
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from database import get_db_connection
+from job_queue import job_handler, enqueue, PRIORITY_LOW
+from feedback_rollups import record_sentiment
+
+_analyzer = None
+
+def get_analyzer():
+    """
+    The lexicon or trained model chosen with SENTIMENT_ENGINE, created on first use
+
+    Loading it imports SciPy and compiles the lexicon, which the API server
+    (importing this module for SENTIMENT_AGGREGATES) never needs.
+    """
+    global _analyzer
+    if _analyzer is None:
+        from sentiment_model import create_analyzer
+        _analyzer = create_analyzer()
+    return _analyzer
+
+def warm_up():
+    """Load the analyzer and run it once so the first job does not pay for it"""
+    get_analyzer().batch_analyze(['Clear and helpful lectures'])
+
+def cache_stats():
+    """Hit rate of the sentiment result cache in this process (None when disabled)"""
+    return _analyzer.stats() if hasattr(_analyzer, 'stats') else None
+
+# Overall sentiment per feedback: the rating decides, and the stored comment
+# sentiment breaks the tie for neutral (3 star) ratings
+SENTIMENT_AGGREGATES = """
+    COUNT(f.id) as total,
+    AVG(f.rating) as average_rating,
+    SUM(CASE WHEN f.rating >= 4 OR (f.rating = 3 AND f.sentiment_label = 'positive') THEN 1 ELSE 0 END) as positive,
+    SUM(CASE WHEN f.rating <= 2 OR (f.rating = 3 AND f.sentiment_label = 'negative') THEN 1 ELSE 0 END) as negative
+"""
+
+def sentiment_summary(row):
+    """Build sentiment breakdown from a SENTIMENT_AGGREGATES row"""
+    total = int(row['total'] or 0)
+    positive = int(row['positive'] or 0)
+    negative = int(row['negative'] or 0)
+    neutral = total - positive - negative
+    
+    return {
+        'positive': positive,
+        'neutral': neutral,
+        'negative': negative,
+        'total': total,
+        'positivePercentage': round((positive / total) * 100, 1) if total > 0 else 0,
+        'neutralPercentage': round((neutral / total) * 100, 1) if total > 0 else 0,
+        'negativePercentage': round((negative / total) * 100, 1) if total > 0 else 0
+    }
+
+def score_feedback_rows(conn, rows):
+    """Analyze feedback rows and persist sentiment for those not yet scored"""
+    if not rows:
+        return 0
+
+    analyses = get_analyzer().batch_analyze([row['comment'] or '' for row in rows])
+    params = [
+        (analysis['sentiment'], round(analysis['score'], 2), round(analysis['confidence'], 3),
+         analysis.get('engine', 'lexicon'), row['id'])
+        for row, analysis in zip(rows, analyses)
+    ]
+
+    cursor = conn.cursor()
+    conn.start_transaction()
+    try:
+        # Lock the rows still pending so each label reaches the rollups exactly once
+        cursor.execute(f"""
+            SELECT id FROM feedbacks
+            WHERE id IN ({', '.join(['%s'] * len(params))}) AND sentiment_analyzed_at IS NULL
+            FOR UPDATE
+        """, tuple(param[-1] for param in params))
+        pending = {row[0] for row in cursor.fetchall()}
+        params = [param for param in params if param[-1] in pending]
+
+        if params:
+            cursor.executemany("""
+                UPDATE feedbacks
+                SET sentiment_label = %s, sentiment_score = %s, sentiment_confidence = %s,
+                    sentiment_engine = %s, sentiment_analyzed_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+            """, params)
+            record_sentiment(cursor, [param[-1] for param in params])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return len(params)
+
+def score_feedbacks(conn, feedback_ids):
+    """Load the given feedbacks and score the ones still pending"""
+    if not feedback_ids:
+        return 0
+
+    cursor = conn.cursor(dictionary=True)
+    placeholders = ', '.join(['%s'] * len(feedback_ids))
+    cursor.execute(f"""
+        SELECT id, comment FROM feedbacks
+        WHERE id IN ({placeholders}) AND sentiment_analyzed_at IS NULL
+    """, tuple(feedback_ids))
+    rows = cursor.fetchall()
+    cursor.close()
+
+    return score_feedback_rows(conn, rows)
+
+def backfill_batch(conn, start_after='', batch_size=500):
+    """
+    Score one batch of unscored feedbacks after the given id
+
+    Returns:
+        Tuple of (rows scored, last id seen); last id is None when done
+    """
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id, comment FROM feedbacks
+        WHERE id > %s AND sentiment_analyzed_at IS NULL
+        ORDER BY id
+        LIMIT %s
+    """, (start_after, batch_size))
+    rows = cursor.fetchall()
+    cursor.close()
+
+    if not rows:
+        return 0, None
+
+    return score_feedback_rows(conn, rows), rows[-1]['id']
+
+def backfill(start_after='', batch_size=500):
+    """Score every existing feedback that has no stored sentiment yet"""
+    conn = get_db_connection()
+    if not conn:
+        return 0
+
+    total = 0
+    cursor_id = start_after
+    try:
+        while True:
+            scored, cursor_id = backfill_batch(conn, cursor_id, batch_size)
+            if cursor_id is None:
+                break
+            total += scored
+            # The last id is printed so an interrupted run can be resumed with --start-after
+            print(f"✅ Scored {total} feedbacks (last id: {cursor_id})")
+    finally:
+        conn.close()
+
+    return total
+
+def export_training_data(path, batch_size=5000):
+    """Write comment/rating pairs for python/sentiment_model.py training"""
+    conn = get_db_connection()
+    if not conn:
+        return 0
+
+    count = 0
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT comment, rating FROM feedbacks WHERE comment IS NOT NULL AND comment <> ''")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['comment', 'rating'])
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                count += len(rows)
+        cursor.close()
+    finally:
+        conn.close()
+
+    return count
+
+@job_handler('sentiment.score')
+def score_job(ctx):
+    """Score freshly submitted feedbacks"""
+    return {'scored': score_feedbacks(ctx.conn, ctx.payload.get('feedback_ids', [])), 'cache': cache_stats()}
+
+@job_handler('sentiment.backfill')
+def backfill_job(ctx):
+    """Score one backfill batch, then queue the next batch from where it stopped"""
+    batch_size = ctx.payload.get('batch_size', 500)
+    scored, last_id = backfill_batch(ctx.conn, ctx.payload.get('start_after', ''), batch_size)
+    if last_id is not None:
+        ctx.enqueue('sentiment.backfill', {'start_after': last_id, 'batch_size': batch_size})
+    return {'scored': scored, 'last_id': last_id, 'cache': cache_stats()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backfill stored sentiment for existing feedbacks')
+    parser.add_argument('--batch-size', type=int, default=500, help='Feedbacks scored per transaction')
+    parser.add_argument('--start-after', default='', help='Resume after this feedback id')
+    parser.add_argument('--enqueue', action='store_true', help='Run the backfill on the job workers instead')
+    parser.add_argument('--export-training', metavar='CSV', help='Write comments and ratings for model training')
+    args = parser.parse_args()
+
+    if args.export_training:
+        count = export_training_data(args.export_training)
+        print(f"📝 Exported {count} comments to {args.export_training}")
+        sys.exit(0)
+
+    if args.enqueue:
+        job_id = enqueue('sentiment.backfill', {'start_after': args.start_after, 'batch_size': args.batch_size},
+                         priority=PRIORITY_LOW)
+        print(f"📬 Backfill queued as job {job_id}")
+        sys.exit(0)
+
+    print("🧠 Backfilling feedback sentiment...")
+    count = backfill(args.start_after, args.batch_size)
+    print(f"🎉 Backfill complete: {count} feedbacks scored")
+    stats = cache_stats()
+    if stats:
+        print(f"📊 Sentiment cache: {stats['hit_rate']:.1%} hit rate ({stats['hits']} memory, "
+              f"{stats['store_hits']} store, {stats['misses']} computed)")
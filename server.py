@@ -6,6 +6,7 @@ Run this script to start a local server for the IntellGrade application
 
 import http.server
 import socketserver
+import importlib.util
 import os
 import sys
 import webbrowser
@@ -53,15 +54,9 @@ class IntellGradeServer:
             print(f"❌ Unexpected error: {e}")
 
 def check_dependencies():
-    """Check if required Python packages are available"""
+    """Check if required Python packages are available (without importing them)"""
     required_packages = ['numpy', 'pandas', 'sklearn']
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
+    missing_packages = [package for package in required_packages if importlib.util.find_spec(package) is None]
     
     if missing_packages:
         print("⚠️  Warning: Some Python packages are missing for AI features:")
@@ -119,20 +119,23 @@ def run_database_schema():
             'autocommit': True
         }
         
+        from migrate import baseline, split_statements
+        
         connection = mysql.connector.connect(**config)
         cursor = connection.cursor()
         
         # Split SQL into individual statements
-        statements = schema_sql.split(';')
+        statements = split_statements(schema_sql)
         
         for statement in statements:
-            statement = statement.strip()
-            if statement and not statement.startswith('--'):
-                try:
-                    cursor.execute(statement)
-                except mysql.connector.Error as err:
-                    if "already exists" not in str(err).lower():
-                        print(f"⚠️  Warning: {err}")
+            try:
+                cursor.execute(statement)
+            except mysql.connector.Error as err:
+                if "already exists" not in str(err).lower():
+                    print(f"⚠️  Warning: {err}")
+        
+        # The schema file is the latest schema; later upgrades run through migrate.py
+        baseline(connection)
         
         cursor.close()
         connection.close()
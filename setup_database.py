@@ -9,6 +9,8 @@ import bcrypt
 import os
 from dotenv import load_dotenv
 
+from migrate import baseline, split_statements
+
 # Load environment variables
 load_dotenv()
 
@@ -34,10 +36,9 @@ def setup_database():
         
         print("🗄️  Creating database and tables...")
         # Split and execute SQL commands
-        commands = sql_commands.split(';')
+        commands = split_statements(sql_commands)
         
         for command in commands:
-            command = command.strip()
             if command:
                 try:
                     cursor.execute(command)
@@ -56,6 +57,9 @@ def setup_database():
         test_connection = mysql.connector.connect(**test_config)
         test_cursor = test_connection.cursor()
         
+        # The schema file is the latest schema; later upgrades run through migrate.py
+        baseline(test_connection)
+        
         # Check if tables exist
         test_cursor.execute("SHOW TABLES")
         tables = test_cursor.fetchall()
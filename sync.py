@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Delta Sync
+Cursor helpers for ?since= listings: clients receive only rows created,
+updated or deleted since their last sync
+"""
+
+import sys
+import argparse
+from typing import List, Optional
+
+from database import get_db_connection, MAX_REPLICA_LAG
+from job_queue import job_handler
+
+# Every delta re-sends this many seconds before the cursor, so rows committed
+# late (long transactions, or not yet replicated when the previous sync read
+# from a replica) are never missed. Clients merge by id, so the overlap is harmless.
+SYNC_OVERLAP = MAX_REPLICA_LAG + 5
+
+# Tombstones are kept this long; older cursors get a full listing instead
+TOMBSTONE_RETENTION_DAYS = 30
+
+def parse_since(value: Optional[str]) -> Optional[int]:
+    """The ?since= cursor as an integer, or None for a full listing"""
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('Invalid sync cursor')
+
+def current_cursor(cursor) -> int:
+    """Cursor for the next sync, taken from the database clock"""
+    cursor.execute("SELECT UNIX_TIMESTAMP()")
+    return int(cursor.fetchone()[0])
+
+def cursor_expired(since: int, now: int) -> bool:
+    """Whether tombstones needed to sync from this cursor may have been pruned"""
+    return since < now - TOMBSTONE_RETENTION_DAYS * 86400
+
+def changed_since(since: int) -> int:
+    """Lower bound for updated_at comparisons (FROM_UNIXTIME(%s))"""
+    return since - SYNC_OVERLAP
+
+def deleted_since(cursor, entity: str, since: int, student_id: Optional[str] = None,
+                  include_archived: bool = True) -> List[str]:
+    """
+    Ids of rows of one entity removed from the live tables since the cursor
+
+    Args:
+        entity: 'result' or 'feedback'
+        student_id: Only rows belonging to this student
+        include_archived: Also report rows moved to the archive tables, for
+            listings that only show live rows
+    """
+    filters = ["entity = %s", "deleted_at >= FROM_UNIXTIME(%s)"]
+    params = [entity, changed_since(since)]
+    if student_id is not None:
+        filters.append("student_id = %s")
+        params.append(student_id)
+    if not include_archived:
+        filters.append("reason = 'deleted'")
+
+    cursor.execute(f"SELECT DISTINCT row_id FROM sync_tombstones WHERE {' AND '.join(filters)}", tuple(params))
+    return [row[0] for row in cursor.fetchall()]
+
+def prune_tombstones(conn) -> int:
+    """Drop tombstones older than the retention period"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM sync_tombstones WHERE deleted_at < CURRENT_TIMESTAMP - INTERVAL %s DAY",
+                   (TOMBSTONE_RETENTION_DAYS,))
+    count = cursor.rowcount
+    cursor.close()
+    return count
+
+@job_handler('sync.prune_tombstones')
+def prune_tombstones_job(ctx):
+    """Drop expired tombstones on a worker"""
+    return {'pruned': prune_tombstones(ctx.conn)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Delta sync maintenance')
+    parser.add_argument('--prune', action='store_true', help='Drop expired tombstones')
+    args = parser.parse_args()
+
+    if not args.prune:
+        parser.print_help()
+        sys.exit(0)
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit(1)
+    print(f"🧹 Pruned {prune_tombstones(conn)} tombstones older than {TOMBSTONE_RETENTION_DAYS} days")
+    conn.close()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The ML modules import each other from python/ as top-level modules
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'python')]
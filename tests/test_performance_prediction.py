@@ -0,0 +1,45 @@
+import math
+
+import pytest
+
+from performance_prediction import PerformancePredictor
+
+@pytest.fixture(scope='module')
+def predictor():
+    return PerformancePredictor()
+
+@pytest.fixture
+def student(predictor):
+    return {feature: 0.8 for feature in predictor.feature_names}
+
+def test_invalid_rows_get_errors_and_the_rest_are_scored(predictor, student):
+    missing = dict(student)
+    missing.pop(predictor.feature_names[0])
+    batch = [
+        student,
+        dict(student, attendance_rate=float('nan')),
+        missing,
+        dict(student, study_hours_per_week='lots'),
+        dict(student, assignment_completion=float('inf')),
+        student,
+    ]
+
+    predictions = list(predictor.batch_predict(batch))
+
+    assert len(predictions) == len(batch)
+    for index in (0, 5):
+        assert 'error' not in predictions[index]
+        assert math.isfinite(predictions[index]['prediction'])
+    assert predictions[0]['prediction'] == predictions[5]['prediction']
+    for index in (1, 2, 3, 4):
+        assert predictions[index]['prediction'] is None
+        assert predictions[index]['risk_level'] == 'unknown'
+    assert 'attendance_rate' in predictions[1]['error']
+    assert 'Missing required features' in predictions[2]['error']
+    assert 'assignment_completion' in predictions[4]['error']
+
+def test_single_prediction_with_nan_returns_error(predictor, student):
+    prediction = predictor.predict_performance(dict(student, attendance_rate=float('nan')))
+
+    assert prediction['prediction'] is None
+    assert 'attendance_rate' in prediction['error']
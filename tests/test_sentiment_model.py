@@ -0,0 +1,17 @@
+from sentiment_analysis import SentimentAnalyzer
+from sentiment_model import SentimentModel
+
+def test_comments_without_tokens_are_neutral():
+    # Unbalanced classes give the intercepts a clear favourite
+    texts = ['great lecturer', 'loved the course', 'very helpful', 'terrible class']
+    model = SentimentModel.train(texts, ['positive', 'positive', 'positive', 'negative'])
+
+    results = model.batch_analyze(['', '   ', None, 'great lecturer'])
+
+    lexicon = SentimentAnalyzer().analyze_sentiment('')
+    for result in results[:3]:
+        assert (result['sentiment'], result['score'], result['confidence']) == \
+            (lexicon['sentiment'], lexicon['score'], lexicon['confidence'])
+        assert result['engine'] == 'model'
+    assert results[3]['sentiment'] == 'positive'
+    assert lexicon['engine'] == 'lexicon'
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Batch Transcripts
+Generates transcripts for a whole cohort into a single archive
+"""
+
+import os
+import sys
+import html
+import zipfile
+import argparse
+from datetime import datetime
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from archive import ALL_RESULTS
+from database import get_db_connection
+from grading import GRADE_POINTS, calculate_grade
+from job_queue import job_handler
+
+TRANSCRIPTS_DIR = os.getenv('TRANSCRIPTS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'transcripts'))
+
+# Students rendered per round trip to the process pool
+RENDER_BATCH_SIZE = 500
+
+# Column order of the rows streamed by stream_cohort_results
+STUDENT_ID, STUDENT_NAME, STUDENT_EMAIL, SESSION, SEMESTER, COURSE_CODE, COURSE_TITLE, UNIT, SCORE, GRADE = range(10)
+
+def _cohort_filter(student_ids: Optional[List[str]], session_year: Optional[str]) -> Tuple[str, list]:
+    """SQL condition selecting the cohort: explicit ids, or everyone with results in a session"""
+    if student_ids:
+        return f"r.student_id IN ({', '.join(['%s'] * len(student_ids))})", list(student_ids)
+    if session_year:
+        return f"r.student_id IN (SELECT DISTINCT student_id FROM {ALL_RESULTS} s WHERE s.session = %s)", [session_year]
+    raise ValueError('A cohort needs student_ids or a session')
+
+def count_cohort(conn, student_ids: Optional[List[str]] = None, session_year: Optional[str] = None) -> int:
+    """Number of students in the cohort"""
+    condition, params = _cohort_filter(student_ids, session_year)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(DISTINCT r.student_id) FROM {ALL_RESULTS} r WHERE {condition}", tuple(params))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+def stream_cohort_results(conn, student_ids: Optional[List[str]] = None, session_year: Optional[str] = None,
+                          fetch_size: int = 2000) -> Iterator[tuple]:
+    """
+    Stream every result of every student in the cohort with one query
+
+    Rows arrive ordered by student, so they can be grouped without holding
+    the whole cohort in memory. The connection is busy until the stream ends.
+    """
+    condition, params = _cohort_filter(student_ids, session_year)
+    cursor = conn.cursor(buffered=False)
+    cursor.execute(f"""
+        SELECT u.id, u.name, u.email, r.session, r.semester, c.code, c.title, c.unit, r.score, r.grade
+        FROM {ALL_RESULTS} r
+        JOIN users u ON r.student_id = u.id
+        JOIN courses c ON r.course_id = c.id
+        WHERE {condition}
+        ORDER BY r.student_id, r.session, r.semester, c.code
+    """, tuple(params))
+
+    try:
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+def weighted_gpa(rows: List[tuple]) -> float:
+    """Unit-weighted grade points (0-4 scale) of the given result rows, as in the feature store"""
+    total_units = sum(row[UNIT] for row in rows)
+    if not total_units:
+        return 0.0
+    points = sum(GRADE_POINTS[calculate_grade(float(row[SCORE]))] * row[UNIT] for row in rows)
+    return round(points / total_units, 2)
+
+def build_transcript(rows: List[tuple]) -> Dict[str, any]:
+    """Group one student's results into semesters with weighted GPAs"""
+    first = rows[0]
+    semesters = []
+    for (session_year, semester), semester_rows in groupby(rows, key=lambda row: (row[SESSION], row[SEMESTER])):
+        semester_rows = list(semester_rows)
+        semesters.append({
+            'session': session_year,
+            'semester': semester,
+            'courses': [{
+                'course_code': row[COURSE_CODE],
+                'course_title': row[COURSE_TITLE],
+                'unit': row[UNIT],
+                'score': float(row[SCORE]),
+                'grade': row[GRADE]
+            } for row in semester_rows],
+            'semester_credits': sum(row[UNIT] for row in semester_rows),
+            'semester_gpa': weighted_gpa(semester_rows)
+        })
+
+    return {
+        'student': {'id': first[STUDENT_ID], 'name': first[STUDENT_NAME], 'email': first[STUDENT_EMAIL]},
+        'summary': {
+            'total_credits': sum(row[UNIT] for row in rows),
+            'completed_courses': len(rows),
+            'overall_gpa': weighted_gpa(rows),
+            'total_semesters': len(semesters)
+        },
+        'results': semesters
+    }
+
+def iter_transcripts(rows: Iterator[tuple]) -> Iterator[Dict[str, any]]:
+    """Turn a student-ordered result stream into one transcript per student"""
+    for _, student_rows in groupby(rows, key=lambda row: row[STUDENT_ID]):
+        yield build_transcript(list(student_rows))
+
+def render_transcript(transcript: Dict[str, any]) -> Tuple[str, bytes]:
+    """Render a transcript as a standalone HTML document"""
+    student = transcript['student']
+    summary = transcript['summary']
+
+    sections = []
+    for semester in transcript['results']:
+        rows = ''.join(
+            f"<tr><td>{html.escape(course['course_code'])}</td><td>{html.escape(course['course_title'])}</td>"
+            f"<td>{course['unit']}</td><td>{course['score']:.2f}</td><td>{html.escape(course['grade'] or '')}</td></tr>"
+            for course in semester['courses']
+        )
+        sections.append(f"""
+<h3>{html.escape(semester['session'])} - Semester {html.escape(semester['semester'])}</h3>
+<table>
+<thead><tr><th>Code</th><th>Course</th><th>Units</th><th>Score</th><th>Grade</th></tr></thead>
+<tbody>{rows}</tbody>
+</table>
+<p>Semester credits: {semester['semester_credits']} &middot; Semester GPA: {semester['semester_gpa']:.2f}</p>""")
+
+    document = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>Transcript - {html.escape(student['name'])}</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 2rem; }}
+table {{ border-collapse: collapse; width: 100%; margin-bottom: 0.5rem; }}
+th, td {{ border: 1px solid #dee2e6; padding: 0.4rem 0.6rem; text-align: left; }}
+th {{ background: #f8f9fa; }}
+</style>
+</head>
+<body>
+<h2>Academic Transcript</h2>
+<p><strong>{html.escape(student['name'])}</strong> ({html.escape(student['id'])}) &middot; {html.escape(student['email'])}</p>
+{''.join(sections)}
+<h3>Summary</h3>
+<p>Total credits: {summary['total_credits']} &middot; Courses completed: {summary['completed_courses']}
+&middot; Cumulative GPA: {summary['overall_gpa']:.2f}</p>
+<p><small>Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}</small></p>
+</body>
+</html>
+"""
+    return f"{student['id']}.html", document.encode('utf-8')
+
+def generate_cohort_archive(archive_path: str, student_ids: Optional[List[str]] = None,
+                            session_year: Optional[str] = None, workers: Optional[int] = None,
+                            progress=None) -> int:
+    """
+    Render transcripts for a cohort in parallel and write them to a zip archive
+
+    Args:
+        archive_path: Where to write the zip file
+        student_ids: Explicit list of students, or
+        session_year: Every student with results in this session
+        workers: Process pool size (defaults to the number of CPUs)
+        progress: Optional callback(done, total)
+
+    Returns:
+        Number of transcripts written
+    """
+    # A full cohort scan is a heavy read, so it goes to a replica when one is available
+    conn = get_db_connection(read_only=True)
+    if not conn:
+        raise RuntimeError('Database connection failed')
+
+    try:
+        total = count_cohort(conn, student_ids, session_year)
+        written = 0
+        temp_path = f"{archive_path}.tmp"
+
+        with ProcessPoolExecutor(max_workers=workers) as pool, \
+                zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            batch = []
+            transcripts = iter_transcripts(stream_cohort_results(conn, student_ids, session_year))
+
+            while True:
+                transcript = next(transcripts, None)
+                if transcript is not None:
+                    batch.append(transcript)
+                if batch and (transcript is None or len(batch) >= RENDER_BATCH_SIZE):
+                    for file_name, content in pool.map(render_transcript, batch, chunksize=25):
+                        archive.writestr(file_name, content)
+                    written += len(batch)
+                    batch = []
+                    if progress:
+                        progress(written, total)
+                if transcript is None:
+                    break
+
+        os.replace(temp_path, archive_path)
+        return written
+    finally:
+        conn.close()
+
+@job_handler('transcripts.batch')
+def batch_transcripts_job(ctx):
+    """Render a cohort's transcripts on a worker"""
+    os.makedirs(TRANSCRIPTS_DIR, exist_ok=True)
+    archive_path = os.path.join(TRANSCRIPTS_DIR, f"transcripts_job_{ctx.id}.zip")
+
+    def progress(done, total):
+        ctx.set_progress(done / total * 100 if total else 100, f"{done} of {total} transcripts rendered")
+
+    count = generate_cohort_archive(archive_path, ctx.payload.get('student_ids'), ctx.payload.get('session'),
+                                    progress=progress)
+    return {'archive': archive_path, 'transcripts': count}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate transcripts for a cohort into a zip archive')
+    parser.add_argument('--session', help='Include every student with results in this session')
+    parser.add_argument('--students', nargs='*', help='Explicit student ids')
+    parser.add_argument('--output', default='transcripts.zip', help='Archive to write')
+    parser.add_argument('--workers', type=int, help='Render processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if not args.session and not args.students:
+        parser.error('either --session or --students is required')
+
+    print("📜 Generating cohort transcripts...")
+    count = generate_cohort_archive(args.output, args.students, args.session, args.workers,
+                                    progress=lambda done, total: print(f"   {done}/{total} transcripts"))
+    print(f"✅ {count} transcripts written to {args.output}")
+    sys.exit(0)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+IntellGrade Job Worker
+Runs queued background jobs (sentiment scoring, regrades, reports, transcripts) outside the API server
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import importlib
+import multiprocessing
+
+from job_queue import run_worker, JOB_HANDLERS
+
+# Modules that register @job_handler functions
+JOB_MODULES = [
+    'sentiment_worker',
+    'grading',
+    'reports',
+    'transcripts',
+    'archive',
+    'analytics',
+    'sync',
+    'feedback_rollups',
+    'feature_store',
+    'roster_import',
+]
+
+# Models loaded before a worker takes its first job, e.g. PRELOAD_MODELS=sentiment,performance;
+# by default each loads on first use
+PRELOAD_MODELS = [name.strip() for name in os.getenv('PRELOAD_MODELS', '').split(',') if name.strip()]
+
+# Model name -> module whose warm_up() loads it
+MODEL_MODULES = {
+    'sentiment': 'sentiment_worker',
+    'performance': 'feature_store',
+}
+
+def load_handlers():
+    """Import every job module so its handlers are registered"""
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+def preload_models(models):
+    """Load and exercise the given models; each process keeps what it loaded"""
+    unknown = [name for name in models if name not in MODEL_MODULES]
+    if unknown:
+        raise ValueError(f"Unknown models in PRELOAD_MODELS: {', '.join(unknown)}")
+    for name in models:
+        started = time.perf_counter()
+        importlib.import_module(MODEL_MODULES[name]).warm_up()
+        print(f"🔥 Preloaded {name} model in {time.perf_counter() - started:.2f}s")
+
+def worker_process(index, job_types, poll_interval, stop_event):
+    """Entry point for one worker process"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    load_handlers()
+    # Forked processes inherit the parent's preloaded models; spawned ones load their own
+    if multiprocessing.get_start_method() != 'fork':
+        preload_models(PRELOAD_MODELS)
+    run_worker(job_types=job_types, poll_interval=poll_interval, stop_event=stop_event)
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Run IntellGrade background job workers')
+    parser.add_argument('--processes', type=int, default=max(1, multiprocessing.cpu_count() // 2),
+                        help='Number of worker processes')
+    parser.add_argument('--job-types', nargs='*', help='Only run these job types')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when idle')
+    args = parser.parse_args()
+
+    load_handlers()
+    # Loaded before forking, the models' memory is shared by all worker processes
+    preload_models(PRELOAD_MODELS)
+
+    print("=" * 60)
+    print("⚙️  IntellGrade Job Worker Starting...")
+    print("=" * 60)
+    print(f"👷 Processes: {args.processes}")
+    print(f"📋 Job types: {', '.join(args.job_types or sorted(JOB_HANDLERS))}")
+    print("⏹️  Press Ctrl+C to stop")
+    print("=" * 60)
+
+    stop_event = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=worker_process, args=(i, args.job_types, args.poll_interval, stop_event),
+                                name=f'job-worker-{i}')
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping workers after their current job...")
+        stop_event.set()
+        for process in processes:
+            process.join()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())